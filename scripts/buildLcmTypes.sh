@@ -5,3 +5,4 @@ cd ../src/lcm-defs
 lcm-gen -pj *.lcm
 javac -cp /usr/local/share/java/lcm.jar marof_lcm/*.java
 jar cf marof_lcm.jar marof_lcm/*.class
+PYTHONPATH="$PYTHONPATH:.." python -m marof.codec.codecGen marof_lcm_codec.py *.lcm
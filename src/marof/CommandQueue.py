@@ -0,0 +1,130 @@
+from collections import deque
+import threading
+
+from timing import getMonotonicSeconds
+
+class CommandQueue(object):
+    """ A bounded queue of commands that modify a target object, filled by other threads and
+    drained by the thread that owns the target. Commands are either callables or attribute
+    writes. A write to an attribute that already has a write queued replaces the queued value
+    instead of taking another place in the queue, so only the latest value is applied, at the
+    place of the first write, and a burst of writes cannot fill the queue.
+
+    Adding commands and taking them for a drain hold a lock for a few operations only. The
+    commands are run without the lock, so they can add commands for the next drain.
+
+    :param target: the object the attribute writes are applied to
+    :param maxSize: default 256, the maximum number of queued commands
+    """
+
+    def __init__(self, target, maxSize=256):
+        assert maxSize > 0, 'Max size is negative or 0'
+        self._target = target
+        self._maxSize = maxSize
+        self._queue = deque() # (attribute name or None, callable or None)
+        self._values = {} # the latest value of each queued attribute write
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._lastDrainTime = 0.0
+        self._maxDrainTime = 0.0
+
+    def put(self, command):
+        """ Add a callable to be called with no arguments at the next drain.
+
+        :param command: the callable
+        :returns: True if the command was queued, False if the queue is full
+        """
+        assert callable(command), 'Command is not callable'
+        with self._lock:
+            if len(self._queue) >= self._maxSize:
+                self._dropped += 1
+                return False
+            self._queue.append((None, command))
+            return True
+
+    def set(self, attr, value):
+        """ Add a write of value to the attribute of the target at the next drain. If a write to
+        the attribute is already queued, its value is replaced, so only the last value written
+        before a drain is applied.
+
+        :param attr: the attribute name string
+        :param value: the value to write
+        :returns: True if the write was queued, False if the queue is full
+        """
+        with self._lock:
+            values = self._values
+            if attr in values:
+                values[attr] = value
+                self._coalesced += 1
+                return True
+            if len(self._queue) >= self._maxSize:
+                self._dropped += 1
+                return False
+            values[attr] = value
+            self._queue.append((attr, None))
+            return True
+
+    def drain(self):
+        """ Run the commands queued before the call in the order they were added.
+
+        :returns: the number of commands run
+        """
+        if len(self._queue) == 0:
+            self._lastDrainTime = 0.0
+            return 0
+
+        start = getMonotonicSeconds()
+        with self._lock:
+            entries = list(self._queue)
+            self._queue.clear()
+            values = self._values
+            self._values = {}
+
+        target = self._target
+        for (attr, command) in entries:
+            if attr is None:
+                command()
+            else:
+                setattr(target, attr, values[attr])
+
+        self._executed += len(entries)
+        drainTime = getMonotonicSeconds() - start
+        self._lastDrainTime = drainTime
+        if drainTime > self._maxDrainTime:
+            self._maxDrainTime = drainTime
+        return len(entries)
+
+    def __len__(self):
+        return len(self._queue)
+
+    @property
+    def maxSize(self):
+        """ The maximum number of queued commands. """
+        return self._maxSize
+
+    @property
+    def executed(self):
+        """ The number of commands that have been run. """
+        return self._executed
+
+    @property
+    def coalesced(self):
+        """ The number of attribute writes replaced by a later write. """
+        return self._coalesced
+
+    @property
+    def dropped(self):
+        """ The number of commands rejected because the queue was full. """
+        return self._dropped
+
+    @property
+    def lastDrainTime(self):
+        """ The time taken by the last drain in seconds. """
+        return self._lastDrainTime
+
+    @property
+    def maxDrainTime(self):
+        """ The longest time taken by a drain in seconds. """
+        return self._maxDrainTime
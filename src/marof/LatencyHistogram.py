@@ -0,0 +1,108 @@
+from math import sqrt
+
+class LatencyHistogram(object):
+    """ A histogram of latencies in integer microseconds held in fixed memory. Like an HDR
+    histogram, the values below 2^precisionBits are counted exactly and larger values are counted
+    in buckets whose width grows with the value, so every value is known to within
+    1/2^(precisionBits-1) of itself. The mean and standard deviation (jitter) are kept exactly.
+
+    :param maxValue: default 60000000, the largest value that is counted. Larger values are
+                     counted as maxValue.
+    :param precisionBits: default 7, the number of bits of the values that are kept
+    """
+
+    def __init__(self, maxValue=60000000, precisionBits=7):
+        assert maxValue > 0, 'Max value is negative or 0'
+        assert precisionBits > 1, 'Precision bits is less than 2'
+        self._maxValue = int(maxValue)
+        self._bits = precisionBits
+        self._subCount = 1 << precisionBits
+        self._halfCount = self._subCount >> 1
+        self._counts = [0]*(self._index(self._maxValue) + 1)
+        self.reset()
+
+    def reset(self):
+        """ Forget all recorded values. """
+        for i in xrange(len(self._counts)):
+            self._counts[i] = 0
+        self._count = 0
+        self._sum = 0
+        self._sumSquares = 0
+        self._min = 0
+        self._max = 0
+
+    def record(self, value):
+        """ Count a value.
+
+        :param value: the latency in microseconds. Negative values are counted as 0.
+        """
+        value = int(value)
+        if value < 0:
+            value = 0
+        elif value > self._maxValue:
+            value = self._maxValue
+        self._counts[self._index(value)] += 1
+        if self._count == 0 or value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+        self._count += 1
+        self._sum += value
+        self._sumSquares += value*value
+
+    def percentile(self, percent):
+        """ Get the value below which a percentage of the recorded values fall.
+
+        :param percent: the percentage between 0 and 100
+        :returns: the value in microseconds, or 0 if no values were recorded
+        """
+        if self._count == 0:
+            return 0
+        rank = max(1, int(round(percent/100.0*self._count)))
+        total = 0
+        for (i, count) in enumerate(self._counts):
+            total += count
+            if total >= rank:
+                return min(self._highestValue(i), self._max)
+        return self._max
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def min(self):
+        return self._min
+
+    @property
+    def max(self):
+        return self._max
+
+    @property
+    def mean(self):
+        if self._count == 0:
+            return 0.0
+        return self._sum/float(self._count)
+
+    @property
+    def stdev(self):
+        """ The standard deviation of the values, the jitter of the latency. """
+        if self._count == 0:
+            return 0.0
+        mean = self.mean
+        return sqrt(max(0.0, self._sumSquares/float(self._count) - mean*mean))
+
+    def _index(self, value):
+        """ The bucket of a value. """
+        if value < self._subCount:
+            return value
+        magnitude = value.bit_length() - self._bits
+        return self._subCount + (magnitude - 1)*self._halfCount + (value >> magnitude) - self._halfCount
+
+    def _highestValue(self, index):
+        """ The largest value counted in a bucket. """
+        if index < self._subCount:
+            return index
+        (magnitude, sub) = divmod(index - self._subCount, self._halfCount)
+        magnitude += 1
+        return ((sub + self._halfCount + 1) << magnitude) - 1
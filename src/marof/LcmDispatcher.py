@@ -0,0 +1,143 @@
+import os
+import errno
+import fcntl
+import select
+import threading
+
+class LcmDispatcher(object):
+    """ Handles the messages of one or more LCM instances on a single thread. The thread blocks on
+    the LCM file descriptors with epoll (or poll where epoll is not available) until a message
+    arrives, and then drains the pending messages of every instance the poll reported as
+    readable, up to maxBatch messages per instance, without blocking. The poll is level
+    triggered, so an instance with more pending messages is reported again by the next poll and
+    a busy instance cannot starve the others. A pipe wakes the thread up when the dispatcher is
+    stopped or the instances change, so no polling timeout is needed.
+
+    :param maxBatch: default 64, the most messages of one instance handled per poll
+    """
+
+    def __init__(self, maxBatch=64):
+        self._instances = {} # LCM instances by file descriptor
+        self._references = {} # number of times each file descriptor was added
+        self._lock = threading.Lock()
+        self._stopRequested = False
+        self._isRunning = False
+
+        (self._wakeRead, self._wakeWrite) = os.pipe()
+        for fd in (self._wakeRead, self._wakeWrite):
+            fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+
+        if hasattr(select, 'epoll'):
+            self._poller = select.epoll()
+            self._eventMask = select.EPOLLIN | select.EPOLLPRI
+        else:
+            self._poller = select.poll()
+            self._eventMask = select.POLLIN | select.POLLPRI
+        self._poller.register(self._wakeRead, self._eventMask)
+        assert maxBatch > 0, 'Batch size is negative or 0'
+        self._maxBatch = maxBatch
+
+    def __del__(self):
+        for fd in (self._wakeRead, self._wakeWrite):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def add(self, lc):
+        """ Handle the messages of an LCM instance. An instance shared by several users can be
+        added once by each of them, and is handled until each of them has removed it.
+
+        :param lc: the LCM instance
+        """
+        fd = lc.fileno()
+        with self._lock:
+            if fd in self._instances:
+                self._references[fd] += 1
+                return
+            self._instances[fd] = lc
+            self._references[fd] = 1
+            self._poller.register(fd, self._eventMask)
+        self._wakeup()
+
+    def remove(self, lc):
+        """ Stop handling the messages of an LCM instance. When the last instance is removed the
+        dispatcher stops.
+
+        :param lc: the LCM instance
+        """
+        fd = lc.fileno()
+        with self._lock:
+            if fd not in self._instances:
+                return
+            self._references[fd] -= 1
+            if self._references[fd] > 0:
+                return
+            del self._instances[fd]
+            del self._references[fd]
+            self._poller.unregister(fd)
+        self._wakeup()
+
+    def run(self):
+        """ Handle messages on the current thread. This method blocks until stop() is called or
+        all instances are removed.
+        """
+        self._isRunning = True
+        poll = self._poller.poll
+        wakeRead = self._wakeRead
+        instances = self._instances
+        maxBatch = self._maxBatch
+        while not self._stopRequested and len(instances) > 0:
+            try:
+                events = poll(-1)
+            except (IOError, OSError, select.error), e:
+                if e.args[0] == errno.EINTR:
+                    continue # interrupted by a signal, check if we should stop
+                raise
+            for (fd, _) in events:
+                if fd == wakeRead:
+                    self._clearWakeup()
+                    continue
+                lc = instances.get(fd)
+                if lc is None:
+                    continue
+                lc.handle() # readable, so a message is pending and handle() does not block
+                handled = 1
+                while handled < maxBatch and lc.handle_timeout(0) > 0:
+                    handled += 1
+        self._stopRequested = False
+        self._isRunning = False
+
+    def start(self):
+        """ Handle messages on a new daemon thread.
+
+        :returns: the thread
+        """
+        thread = threading.Thread(target=self.run)
+        thread.setDaemon(True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        """ Stop handling messages. Can be called from any thread or a signal handler. """
+        self._stopRequested = True
+        self._wakeup()
+
+    @property
+    def isRunning(self):
+        return self._isRunning
+
+    def _wakeup(self):
+        try:
+            os.write(self._wakeWrite, 'x')
+        except OSError, e:
+            if e.errno != errno.EAGAIN: # the pipe is full, so a wake up is already pending
+                raise
+
+    def _clearWakeup(self):
+        try:
+            while os.read(self._wakeRead, 512):
+                pass
+        except OSError, e:
+            if e.errno != errno.EAGAIN:
+                raise
@@ -0,0 +1,137 @@
+import signal
+
+import lcm
+
+from LcmDispatcher import LcmDispatcher
+from MarofModuleHandler import MarofModuleHandler
+from transport import HybridTransport, InProcTransport, LcmTransport
+
+class MarofHost(object):
+    """ Runs several modules in one process. The modules share one LCM instance and one
+    LcmDispatcher thread, and each module still has its own MarofModuleHandler so MODULE_CONFIG
+    and HANDLER_CONFIG messages are honoured per module name.
+
+    The modules publish through a HybridTransport. Messages published by a module of the host are
+    handed to the subscribers within the host as message objects, without encoding them or 
+    sending them through multicast, and are also published on LCM for remote peers. Subscribers
+    should decode with marof.decodeMessage(), which accepts both message objects and encoded data,
+    and must not keep or modify the message object. The in-process subscribers are called on the
+    thread of the publishing module and match the channel name exactly.
+
+    Example::
+
+        host = MarofHost()
+        host.addModule(imu)
+        host.addModule(pid, {"DESIRED_STATE": pid.desiredHandler,
+                             "CURRENT_STATE": pid.currentHandler})
+        host.start() # blocks until SIGINT or all handlers are stopped
+    """
+
+    def __init__(self):
+        self._lcm = lcm.LCM()
+        self._dispatcher = LcmDispatcher()
+        self._dispatcher.add(self._lcm) # keep dispatching while handlers come and go
+        self._transport = HybridTransport(InProcTransport(), LcmTransport(self._lcm))
+        self._handlers = []
+        self._autoStart = []
+
+    def addModule(self, module, subscriptions=None, start=True):
+        """ Load a module into the host.
+
+        :param module: the MarofModule
+        :param subscriptions: default None, a dictionary of subscriber functions by channel
+        :param start: default True, start the module when the host starts. If False, the module
+                      can be started with a MODULE_CONFIG message.
+        :returns: the MarofModuleHandler of the module
+        """
+        assert module.name not in [h.module.name for h in self._handlers], 'Module name is not unique'
+        module.setTransport(self._transport)
+        handler = MarofModuleHandler(module, host=self)
+        if subscriptions is not None:
+            for (channel, function) in subscriptions.items():
+                handler.subscribe(channel, function)
+        self._handlers.append(handler)
+        if start:
+            self._autoStart.append(handler)
+        return handler
+
+    def removeHandler(self, handler):
+        """ Forget a handler that was released. Called by MarofModuleHandler. When no handlers
+        are left the host stops.
+
+        :param handler: the MarofModuleHandler
+        """
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+            handler.module.setTransport(None)
+        if len(self._handlers) == 0:
+            self._dispatcher.stop()
+
+    def subscribe(self, channel, function):
+        """ Subscribe to a channel, both within the host and on LCM.
+
+        :param channel: the channel string
+        :param function: the function to subscribe to
+        :returns: the subscription, to pass to unsubscribe()
+        """
+        return self._transport.subscribe(channel, function)
+
+    def unsubscribe(self, subscription):
+        """ Remove a subscription.
+
+        :param subscription: the subscription returned by subscribe()
+        """
+        self._transport.unsubscribe(subscription)
+
+    def publish(self, channel, lcmMsg):
+        """ Publish a message to the subscribers within the host and on LCM.
+
+        :param channel: the channel string
+        :param lcmMsg: the LCM message to publish
+        """
+        self._transport.publish(channel, lcmMsg)
+
+    def start(self):
+        """ Start the modules and handle messages on the current thread. This method blocks until
+        SIGINT or until all handlers are stopped by HANDLER_CONFIG messages.
+        """
+        signal.signal(signal.SIGINT, self._handleSigint) # replace the handlers of the modules
+        for handler in self._autoStart:
+            handler.startModule()
+        print "Starting host with modules", ", ".join([h.module.name for h in self._handlers])
+        self._dispatcher.run()
+        self._release()
+        print "Stopped host"
+
+    def stop(self):
+        """ Stop all modules and the host. """
+        self._dispatcher.stop()
+
+    @property
+    def lcm(self):
+        """ The LCM instance shared by the modules. """
+        return self._lcm
+
+    @property
+    def transport(self):
+        """ The HybridTransport shared by the modules. """
+        return self._transport
+
+    @property
+    def dispatcher(self):
+        """ The LcmDispatcher shared by the modules. """
+        return self._dispatcher
+
+    @property
+    def modules(self):
+        """ The modules loaded in the host. """
+        return [handler.module for handler in self._handlers]
+
+    def _handleSigint(self, signal, frame):
+        self.stop()
+
+    def _release(self):
+        """ Stop the modules and release their handlers. """
+        for handler in list(self._handlers):
+            handler.stop()
+        self._dispatcher.remove(self._lcm)
@@ -1,31 +1,55 @@
 import abc
-from time import time, sleep
+from time import time
 import threading
 import signal
-import Queue
 
-import lcm
-
-from timing import getMicroSeconds, getSeconds
+from Scheduler import Scheduler
+from CommandQueue import CommandQueue
+from LatencyHistogram import LatencyHistogram
+from messages import reusableMessage
+from transport import LcmTransport
+from timing import getMonotonicSeconds, getFastMicroSeconds
 
 class MarofModule(object):
     """ Parent class of all MARoF modules.
     
     :param name: The name string of the module. Should be unique.
     :param updateInterval: the interval to update the module in seconds
+    :param scheduler: default None, the Scheduler that times the updates. If None, a Scheduler
+                      with the update interval and the CATCH_UP overrun policy is used.
+    :param statsInterval: default 10, the interval in seconds to publish the latency statistics
+                          of the module on the MODULE_STATS channel. If 0, they are not published.
     """
     __metaclass__ = abc.ABCMeta
     
-    def __init__(self, name, updateInterval):
+    STATS_CHANNEL = "MODULE_STATS"
+    
+    def __init__(self, name, updateInterval, scheduler=None, statsInterval=10.0):
         """ Initialize the module """
         assert updateInterval >= 0, 'Update interval is negative'
         self._name = name
         self._updateInterval = updateInterval
-        self._lcm = lcm.LCM()
+        if scheduler is None:
+            scheduler = Scheduler(updateInterval)
+        assert scheduler.interval == updateInterval, 'Scheduler interval is not the update interval'
+        self._scheduler = scheduler
+        self._transport = None # created when first needed, so modules in a MarofHost do not open one
+        self._messages = {} # the reusable message to publish by channel
         self._stopEvent = threading.Event()
         self._isRunning = False
         self._isPaused = False
-        self._modQueue = Queue.Queue() # queue for commands that modify the module
+        self._commands = CommandQueue(self) # queue for commands that modify the module
+        assert statsInterval >= 0, 'Stats interval is negative'
+        self._statsInterval = statsInterval
+        self._nextStatsTime = None
+        self._lastStepTime = 0.0
+        self._lastPublishTime = 0.0
+        self._latencies = (("lateness", LatencyHistogram()), # latencies in microseconds
+                           ("step", LatencyHistogram()),
+                           ("publish", LatencyHistogram()),
+                           ("drain", LatencyHistogram()))
+        (self._latenessHistogram, self._stepHistogram, self._publishHistogram,
+         self._drainHistogram) = [histogram for (_, histogram) in self._latencies]
         signal.signal(signal.SIGINT, self._handleSigint)
     
     def start(self):
@@ -50,49 +74,136 @@ class MarofModule(object):
         self._isPaused = False
     
     def publish(self, channel, lcmMsg):
-        """ Publish a message on the given channel. 
+        """ Publish a message on the given channel through the module's transport.
         
         :param channel: the channel string
         :param lcmMsg: the LCM message to publish
         """
-        self._lcm.publish(channel, lcmMsg.encode())
+        self.transport.publish(channel, lcmMsg)
+    
+    def pooledMessage(self, channel, lcmType):
+        """ Get the message object the module reuses to publish on a channel, so publishing
+        every update allocates no message objects. Fixed size messages are encoded with one
+        precompiled struct, see marof.reusableMessage(). Get the message
+        once, for example in the constructor, and fill and publish it in publishUpdate():: 
+        
+            self._commandMsg = self.pooledMessage(self.name, motorCommand_t)
+            ...
+            msg = self._commandMsg
+            msg.time = getFastMicroSeconds()
+            msg.speedPercent = self._speed
+            self.publish(self.name, msg)
+        
+        Subscribers receive the same object from an InProcTransport every time, so, as with
+        every message, they must not keep it.
+        
+        :param channel: the channel string
+        :param lcmType: the LCM type class of the messages on the channel
+        :returns: the message object, created on the first call for the channel
+        """
+        msg = self._messages.get(channel)
+        if msg is None:
+            msg = reusableMessage(lcmType)
+            self._messages[channel] = msg
+        assert isinstance(msg, lcmType), 'The channel is published with another type'
+        return msg
+    
+    def setTransport(self, transport):
+        """ Set the transport used to publish messages. MarofHost.addModule() sets the transport
+        of the host, and an InProcTransport can be set to run modules together without LCM.
+        
+        :param transport: the Transport, or None to use an LcmTransport owned by the module
+        """
+        self._transport = transport
     
     def runLater(self, command):
         """ Add a command to be run after the current step and publish method. This is for thread
         safety while handling asynchronous messages. 
         
-        :param command: the command string to be evaluated later
+        :param command: the callable to be called later with no arguments
+        :returns: True if the command was queued, False if the queue is full
         """
-        self._modQueue.put(command)
+        return self._commands.put(command)
+    
+    def setLater(self, attr, value):
+        """ Set an attribute of the module after the current step and publish method. This is for
+        thread safety while handling asynchronous messages. If the attribute is set again before
+        the commands are run, only the latest value is applied.
+        
+        :param attr: the attribute name string
+        :param value: the value to set
+        :returns: True if the command was queued, False if the queue is full
+        """
+        return self._commands.set(attr, value)
     
     def _run(self):
         """ Run the module. Calls the step method. This method blocks. """
 
         print "Starting module", self._name, "with update interval:", self._updateInterval
-        nextStart = (getSeconds() + 1) * 1000000
+        scheduler = self._scheduler
+        scheduler.reset()
+        if self._updateInterval > 0:
+            scheduler.start(1 - time() % 1) # start on the next whole second
+        self._nextStatsTime = getMonotonicSeconds() + self._statsInterval
         while self._isRunning:
+            overruns = scheduler.overruns
+            lateness = scheduler.wait()
+            self._latenessHistogram.record(lateness*1e6)
+            if scheduler.overruns != overruns:
+                print "Warning: Module", self._name, "took too long during step, started", \
+                      "%.3f ms late, last step %.3f ms, publish %.3f ms, drain %.3f ms" % \
+                      (lateness*1000, self._lastStepTime*1000, self._lastPublishTime*1000,
+                       self._commands.lastDrainTime*1000)
             self._moduleStep()
-                
-            if self._updateInterval == 0:
-                continue
-
-            nextStart = nextStart + int(self._updateInterval*1000000)
-            sleepTime = (nextStart - getMicroSeconds())/1000000.0
-            if sleepTime > 0:
-                sleep(sleepTime)
-            else:
-                print "Warning: Module", self._name, " took too long during step"
+            if self._statsInterval > 0 and getMonotonicSeconds() >= self._nextStatsTime:
+                self._nextStatsTime += self._statsInterval
+                self.publishStats()
                 
         print "\nStopped module", self._name
     
     def _moduleStep(self):
+        start = getMonotonicSeconds()
         if not self._isPaused:
             self.step()
+            stepped = getMonotonicSeconds()
             self.publishUpdate()
+            published = getMonotonicSeconds()
+            self._lastStepTime = stepped - start
+            self._lastPublishTime = published - stepped
+            self._stepHistogram.record(self._lastStepTime*1e6)
+            self._publishHistogram.record(self._lastPublishTime*1e6)
             
         # Run commands outside the step and publish methods to modify the module safely
-        while not self._modQueue.empty():
-            exec(self._modQueue.get())
+        self._commands.drain()
+        self._drainHistogram.record(self._commands.lastDrainTime*1e6)
+    
+    def publishStats(self):
+        """ Publish the latency statistics of the module since the last publish on the
+        MODULE_STATS channel and reset them. Called every statsInterval seconds while the module
+        runs.
+        """
+        # Imported here, so marof can be imported without the generated LCM types
+        from marof_lcm import moduleStats_t
+        scheduler = self._scheduler
+        msg = moduleStats_t()
+        msg.time = getFastMicroSeconds()
+        msg.name = self._name
+        msg.ticks = scheduler.ticks
+        msg.overruns = scheduler.overruns
+        msg.missedTicks = scheduler.missedTicks
+        msg.droppedCommands = self._commands.dropped
+        msg.numTimers = len(self._latencies)
+        msg.timers = [name for (name, _) in self._latencies]
+        histograms = [histogram for (_, histogram) in self._latencies]
+        msg.count = [h.count for h in histograms]
+        msg.mean = [h.mean for h in histograms]
+        msg.stdev = [h.stdev for h in histograms]
+        msg.p50 = [float(h.percentile(50)) for h in histograms]
+        msg.p99 = [float(h.percentile(99)) for h in histograms]
+        msg.max = [float(h.max) for h in histograms]
+        for h in histograms:
+            h.reset()
+        self.publish(self.STATS_CHANNEL, msg)
     
     def _handleSigint(self, signal, frame):
         self.stop()
@@ -115,10 +226,41 @@ class MarofModule(object):
         """ The update interval in seconds. """
         return self._updateInterval
     
+    @property
+    def scheduler(self):
+        """ The Scheduler that times the updates and records their lateness. """
+        return self._scheduler
+    
+    @property
+    def latencies(self):
+        """ A dictionary of the LatencyHistogram of the lateness of the updates and the times
+        taken by step(), publishUpdate() and the commands, by the names 'lateness', 'step',
+        'publish' and 'drain'. The histograms count microseconds since the last publishStats().
+        """
+        return dict(self._latencies)
+    
+    @property
+    def statsInterval(self):
+        """ The interval in seconds to publish the latency statistics, or 0 if they are not
+        published. """
+        return self._statsInterval
+    
+    @property
+    def commands(self):
+        """ The CommandQueue filled by runLater() and setLater(). """
+        return self._commands
+    
+    @property
+    def transport(self):
+        """ The Transport used to publish messages. """
+        if self._transport is None:
+            self._transport = LcmTransport()
+        return self._transport
+    
     @property
     def lcmTX(self):
-        """ The lcm object used to transmit."""
-        return self._lcm
+        """ The lcm object used to transmit, or None if the transport does not use LCM."""
+        return self.transport.lcm
     
     @abc.abstractmethod
     def publishUpdate(self):
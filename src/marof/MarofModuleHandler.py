@@ -1,28 +1,45 @@
 import threading
-import select
 import signal
 import time
 import lcm
 
-from marof_lcm import config_t
+from LcmDispatcher import LcmDispatcher
+from messages import decodeMessage
 
 class MarofModuleHandler(object):
     """ Responsible for configuring a module through LCM. This includes starting and stopping. 
     
     :param module: the MarofModule for which to handle messages.
+    :param dispatcher: default None, the LcmDispatcher that handles the messages. Handlers of
+                       several modules can share a dispatcher so they are serviced by one thread.
+                       If None, the handler creates its own dispatcher.
+    :param host: default None, the MarofHost the module is loaded in. The handler then uses the
+                 LCM instance and dispatcher of the host, and subscriptions also receive the 
+                 messages published by the other modules of the host.
     """
     
-    def __init__(self, module):
+    def __init__(self, module, dispatcher=None, host=None):
         self._module = module
+        self._host = host
+        self._isReleased = False
+        self._subscriptions = []
+        self._hostSubscriptions = []
         
-        self._lcm = lcm.LCM()
-        self._lcm.subscribe("MODULE_CONFIG", self._handleModuleConfig)
-        self._lcm.subscribe("HANDLER_CONFIG", self._handleHandlerConfig)
+        if host is not None:
+            self._lcm = host.lcm
+            dispatcher = host.dispatcher
+        else:
+            self._lcm = lcm.LCM()
+        self._subscriptions.append(self._lcm.subscribe("MODULE_CONFIG", self._handleModuleConfig))
+        self._subscriptions.append(self._lcm.subscribe("HANDLER_CONFIG", self._handleHandlerConfig))
         
         self._moduleThread = threading.Thread(target=self._module.start)
         self._moduleThread.setDaemon(True)
         
-        self._stopEvent = threading.Event() # to stop the handler thread
+        if dispatcher is None:
+            dispatcher = LcmDispatcher()
+        self._dispatcher = dispatcher
+        self._dispatcher.add(self._lcm)
         signal.signal(signal.SIGINT, self._handleSigint) # Close the thread upon Python exit
         
     def __del__(self):
@@ -34,14 +51,22 @@ class MarofModuleHandler(object):
         :param channel: the channel string
         :param function: the function to subscribe to
         """
-        self._lcm.subscribe(channel, function)
+        if self._host is not None:
+            self._hostSubscriptions.append(self._host.subscribe(channel, function))
+        else:
+            self._lcm.subscribe(channel, function)
         
     def start(self):
         """ Start the handler on the current thread. This function will block until SIGINT or 
-        a config message stops it. All subscriptions should to be registered first. 
+        a config message stops it. All subscriptions should to be registered first. When the
+        dispatcher is shared, start only one of the handlers or run the dispatcher directly.
         """
         self._run()
     
+    def stop(self):
+        """ Stop the module and release the handler's subscriptions. """
+        self._release()
+    
     def startModule(self):
         """ Start the module on another thread. """
         self._moduleThread.start()
@@ -52,15 +77,38 @@ class MarofModuleHandler(object):
         """ The module property. """
         return self._module
     
+    @property
+    def dispatcher(self):
+        """ The LcmDispatcher that handles the messages. """
+        return self._dispatcher
+    
     def _handleSigint(self, signal, frame):
-        """ Handle the SIGINT signal. """
+        """ Handle the SIGINT signal. Stops the dispatcher, which may be shared with other
+        handlers, so start() returns even if other LCM instances are still dispatched. """
         self._release()
+        self._dispatcher.stop()
         
     def _release(self):
         """ Stop the module and handling thread. """
         self._module.stop()
-        self._moduleThread.join()
-        self._stopEvent.set()
+        if self._moduleThread.isAlive():
+            self._moduleThread.join()
+        self._releaseLcm()
+    
+    def _releaseLcm(self):
+        """ Remove the subscriptions of the handler and stop dispatching its messages. """
+        if self._isReleased:
+            return
+        self._isReleased = True
+        for subscription in self._subscriptions:
+            self._lcm.unsubscribe(subscription)
+        self._subscriptions = []
+        if self._host is not None:
+            for subscription in self._hostSubscriptions:
+                self._host.unsubscribe(subscription)
+            self._hostSubscriptions = []
+            self._host.removeHandler(self)
+        self._dispatcher.remove(self._lcm)
     
     def _handleModuleConfig(self, channel, data):
         """ Handle a module configuration message. 
@@ -68,7 +116,10 @@ class MarofModuleHandler(object):
         :param channel: the channel string
         :param data: the data sent on the channel
         """
-        config = config_t().decode(data)
+        # Imported here, so marof can be imported without the generated LCM types
+        from marof_lcm import config_t
+        from marof_lcm import config_t
+        config = decodeMessage(config_t, data)
         if config.name == self._module.name: # check if the message is for this module
             if config.command == 'start':
                 if not self._module.isRunning:
@@ -86,21 +137,14 @@ class MarofModuleHandler(object):
         :param channel: the channel string
         :param data: the data sent on the channel
         """
-        config = config_t().decode(data)
+        config = decodeMessage(config_t, data)
         if config.name == self._module.name:
             if config.command == 'stop':
                 self._module.stop() # stop the module, or else there is no handler left to stop it
-                self._stopEvent.set()
+                self._releaseLcm()
         
     def _run(self):
-        """ Handle LCM messages until _stopEvent is set. """
+        """ Handle LCM messages until the dispatcher stops. """
         print "Starting handler for module", self._module.name
-        while not self._stopEvent.is_set():
-            # wait until LCM has a message ready to read
-            try:
-                rc = select.select([self._lcm.fileno()], [], [self._lcm.fileno()], 0.05)
-            except select.error:
-                continue # ignore the error
-            if len(rc[0]) > 0 or len(rc[2]) > 0:
-                self._lcm.handle()
+        self._dispatcher.run()
         print "Stopped handler for module", self._module.name
@@ -0,0 +1,131 @@
+from time import sleep
+
+from timing import getMonotonicSeconds
+
+class Scheduler(object):
+    """ Schedules the periodic ticks of a module using absolute deadlines on a monotonic clock, so
+    the period does not drift with the time taken by each step or with changes to the system time.
+    The wait before a deadline sleeps for most of the remaining time and spins for the last
+    spinTime seconds to reduce the wake up jitter of sleep().
+
+    When a tick starts after its deadline the overrun policy decides the next deadline:
+
+    * CATCH_UP: keep the original deadlines and run the late ticks back to back.
+    * SKIP: drop the ticks whose whole interval has passed and keep the phase of the deadlines.
+    * PHASE_RESET: start the tick now and schedule the following ticks relative to it.
+
+    :param interval: the interval between ticks in seconds, 0 runs the ticks without waiting
+    :param overrunPolicy: default CATCH_UP, one of the policy variables from this class
+    :param spinTime: default 0.0003 sec, the time before a deadline to busy wait instead of sleep
+    :param clock: default getMonotonicSeconds, a function returning the time in seconds
+    """
+    CATCH_UP = 'catchUp'
+    SKIP = 'skip'
+    PHASE_RESET = 'phaseReset'
+    OVERRUN_POLICIES = (CATCH_UP, SKIP, PHASE_RESET)
+
+    def __init__(self, interval, overrunPolicy=CATCH_UP, spinTime=0.0003, clock=getMonotonicSeconds):
+        assert interval >= 0, 'Interval is negative'
+        assert overrunPolicy in self.OVERRUN_POLICIES, 'Invalid overrun policy'
+        assert spinTime >= 0, 'Spin time is negative'
+        self._interval = interval
+        self._overrunPolicy = overrunPolicy
+        self._spinTime = spinTime
+        self._clock = clock
+        self._deadline = None
+        self.reset()
+
+    def reset(self):
+        """ Clear the statistics and schedule the first tick at the next wait(). """
+        self._deadline = None
+        self._ticks = 0
+        self._overruns = 0
+        self._missedTicks = 0
+        self._lateness = 0.0
+        self._maxLateness = 0.0
+
+    def start(self, delay=0.0):
+        """ Schedule the first tick.
+
+        :param delay: default 0 sec, the time from now until the first tick
+        """
+        self._deadline = self._clock() + delay
+
+    def wait(self):
+        """ Block until the next tick is due and schedule the one after it.
+
+        :returns: the lateness of the tick in seconds
+        """
+        interval = self._interval
+        if self._deadline is None: # not started, so the first tick is now
+            self.start()
+            now = deadline = self._deadline
+        else:
+            deadline = self._deadline
+            now = self._clock()
+
+        waited = now < deadline
+        if waited:
+            remaining = deadline - now
+            if remaining > self._spinTime:
+                sleep(remaining - self._spinTime)
+            now = self._clock()
+            while now < deadline:
+                now = self._clock()
+
+        # Measure the lateness from the original deadline, before the overrun policy moves it
+        lateness = now - deadline
+        if not waited and lateness > 0 and interval > 0:
+            self._overruns += 1
+            if self._overrunPolicy == self.SKIP:
+                missed = int(lateness/interval)
+                self._missedTicks += missed
+                deadline += missed*interval
+            elif self._overrunPolicy == self.PHASE_RESET:
+                deadline = now
+
+        self._deadline = deadline + interval
+        self._ticks += 1
+        self._lateness = lateness
+        if lateness > self._maxLateness:
+            self._maxLateness = lateness
+        return lateness
+
+    @property
+    def interval(self):
+        """ The interval between ticks in seconds. """
+        return self._interval
+
+    @property
+    def overrunPolicy(self):
+        return self._overrunPolicy
+
+    @overrunPolicy.setter
+    def overrunPolicy(self, overrunPolicy):
+        assert overrunPolicy in self.OVERRUN_POLICIES, 'Invalid overrun policy'
+        self._overrunPolicy = overrunPolicy
+
+    @property
+    def lateness(self):
+        """ The time in seconds the last tick started after its deadline. """
+        return self._lateness
+
+    @property
+    def maxLateness(self):
+        """ The largest lateness in seconds since the last reset. """
+        return self._maxLateness
+
+    @property
+    def ticks(self):
+        """ The number of ticks since the last reset. """
+        return self._ticks
+
+    @property
+    def overruns(self):
+        """ The number of ticks whose deadline passed before wait() was called. """
+        return self._overruns
+
+    @property
+    def missedTicks(self):
+        """ The number of ticks dropped by the SKIP policy. """
+        return self._missedTicks
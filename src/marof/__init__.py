@@ -1,4 +1,12 @@
 
+from Scheduler import Scheduler
+from CommandQueue import CommandQueue
+from LatencyHistogram import LatencyHistogram
+from transport import Transport, InProcTransport, LcmTransport, HybridTransport
 from MarofModule import MarofModule
+from LcmDispatcher import LcmDispatcher
 from MarofModuleHandler import MarofModuleHandler
-from timing import getMicroSeconds, getMilliSeconds, getSeconds
+from MarofHost import MarofHost
+from messages import decodeMessage, EncodedMessage, MessageEncoder, isFixedSize, reusableMessage
+from timing import getMicroSeconds, getMilliSeconds, getSeconds, getMonotonicSeconds
+from timing import EpochClock, getFastMicroSeconds, getFastMilliSeconds, getFastSeconds
@@ -0,0 +1,56 @@
+import struct
+
+from numpy import empty, frombuffer
+
+class FastMessage(object):
+    """ The parent class of the fixed size LCM types generated by codecGen. A generated type can
+    be used instead of the lcm-gen class of the same name: the encoded messages are the same,
+    fingerprint included, but every message is encoded and decoded with one call of a
+    precompiled struct.Struct instead of field by field. Many messages can be decoded at once
+    into a NumPy structured array with decodeArray().
+
+    The generated types set the class attributes:
+
+    - _packed_fingerprint: the 8 byte fingerprint that starts the encoded messages
+    - _struct: the struct.Struct of the fingerprint and the fields
+    - wireDtype: the NumPy dtype of an encoded message, the big endian field 'fingerprint'
+      followed by the big endian fields
+    - dtype: the NumPy dtype of the fields in native byte order
+    """
+    __slots__ = ()
+
+    _packed_fingerprint = None
+    _struct = None
+    wireDtype = None
+    dtype = None
+
+    @classmethod
+    def _get_packed_fingerprint(cls):
+        return cls._packed_fingerprint
+
+    def get_hash(self):
+        """ Get the LCM hash of the struct. """
+        return struct.unpack('>Q', self._packed_fingerprint)[0]
+
+    @classmethod
+    def decodeArray(cls, payloads):
+        """ Decode many encoded messages into a structured array with one row per message, for
+        example the messages of a channel read from a log.
+
+        :param payloads: the sequence of encoded messages, each a string of exactly one message
+        :returns: the structured array of dtype
+        :raises ValueError: if a message has the wrong size or fingerprint
+        """
+        if not isinstance(payloads, (list, tuple)):
+            payloads = list(payloads)
+        size = cls._struct.size
+        if any(len(payload) != size for payload in payloads):
+            raise ValueError("Decode error")
+        data = ''.join(payloads)
+        wire = frombuffer(data, dtype=cls.wireDtype)
+        if (wire['fingerprint'] != struct.unpack('>Q', cls._packed_fingerprint)[0]).any():
+            raise ValueError("Decode error")
+        records = empty(len(wire), dtype=cls.dtype)
+        for name in cls.dtype.names:
+            records[name] = wire[name]
+        return records
@@ -0,0 +1,3 @@
+from lcmParser import LcmMember, LcmStruct, parseLcm, parseLcmFile
+from FastMessage import FastMessage
+from codecGen import generateCodecs, writeCodecs, loadCodecs
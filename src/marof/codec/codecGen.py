@@ -0,0 +1,144 @@
+"""
+Generates fast codecs for the fixed size structs of .lcm files. The generated module holds a
+FastMessage subclass for every struct whose fields are all numbers or booleans, named like the
+lcm-gen class, and can be imported instead of it. Structs with arrays, strings or struct fields
+are skipped, use the lcm-gen classes for them.
+
+Usage::
+
+    python -m marof.codec.codecGen OUTPUT.py FILE.lcm...
+"""
+import imp
+import os
+import struct
+import sys
+
+from marof.messages import messageFormat
+from lcmParser import parseLcmFile
+
+# NumPy type codes of the fixed size types, without the byte order
+_DTYPES = {'int8_t': 'i1', 'int16_t': 'i2', 'int32_t': 'i4', 'int64_t': 'i8', 'byte': 'u1',
+           'float': 'f4', 'double': 'f8', 'boolean': '?'}
+
+_DEFAULTS = {'float': '0.0', 'double': '0.0', 'boolean': 'False'}
+
+_HEADER = '''"""
+LCM types generated by marof.codec.codecGen from %s.
+DO NOT MODIFY BY HAND.
+"""
+from struct import Struct
+
+from numpy import dtype
+
+from marof.codec import FastMessage
+
+_new = object.__new__
+'''
+
+_TYPE = '''
+_%(name)s_struct = Struct(%(format)r)
+_%(name)s_pack = _%(name)s_struct.pack
+_%(name)s_unpack = _%(name)s_struct.unpack_from
+_%(name)s_fingerprint = %(fingerprint)r
+
+class %(name)s(FastMessage):
+    """ %(name)s of %(package)s, generated from %(source)s. """
+    __slots__ = %(slots)r
+    __typenames__ = %(typenames)r
+    __dimensions__ = %(dimensions)r
+%(constants)s
+    _packed_fingerprint = _%(name)s_fingerprint
+    _struct = _%(name)s_struct
+    wireDtype = dtype(%(wireDtype)r)
+    dtype = dtype(%(dtype)r)
+
+    def __init__(self):
+%(init)s
+
+    def encode(self):
+        return _%(name)s_pack(_%(name)s_fingerprint, %(values)s)
+
+    @staticmethod
+    def decode(data):
+        if hasattr(data, 'read'):
+            data = data.read(%(size)d)
+        msg = _new(%(name)s)
+        (fingerprint, %(targets)s) = _%(name)s_unpack(data)
+        if fingerprint != _%(name)s_fingerprint:
+            raise ValueError("Decode error")
+        return msg
+'''
+
+def generateCodecs(filenames):
+    """ Generate the source of a module with the codecs of the fixed size structs of .lcm files.
+
+    :param filenames: the list of .lcm file names
+    :returns: a tuple (source string, list of the names of the skipped structs)
+    """
+    parts = [_HEADER % ', '.join(os.path.basename(f) for f in filenames)]
+    skipped = []
+    for filename in filenames:
+        for lcmStruct in parseLcmFile(filename):
+            if not lcmStruct.isFixedSize:
+                skipped.append(lcmStruct.name)
+                continue
+            parts.append(_generateType(lcmStruct, os.path.basename(filename)))
+    return (''.join(parts), skipped)
+
+def _generateType(lcmStruct, source):
+    members = lcmStruct.members
+    names = [m.name for m in members]
+    typenames = [m.typename for m in members]
+    fields = [(m.name, '>' + _DTYPES[m.typename]) for m in members]
+    fmt = messageFormat(typenames)
+    return _TYPE % {
+        'name': lcmStruct.name,
+        'package': lcmStruct.package or 'no package',
+        'source': source,
+        'format': fmt,
+        'fingerprint': lcmStruct.fingerprint,
+        'slots': names,
+        'typenames': typenames,
+        'dimensions': [None]*len(members),
+        'constants': ''.join('\n    %s = %s' % (name, value)
+                             for (_, name, value) in lcmStruct.constants) + '\n',
+        'wireDtype': [('fingerprint', '>u8')] + fields,
+        'dtype': [(name, _DTYPES[t]) for (name, t) in zip(names, typenames)],
+        'init': '\n'.join('        self.%s = %s' % (m.name, _DEFAULTS.get(m.typename, '0'))
+                          for m in members),
+        'values': ', '.join('self.' + name for name in names),
+        'size': struct.calcsize(fmt),
+        'targets': ', '.join('msg.' + name for name in names)}
+
+def writeCodecs(filenames, outputFile):
+    """ Generate the codecs of the fixed size structs of .lcm files into a module file.
+
+    :param filenames: the list of .lcm file names
+    :param outputFile: the name of the Python file to write
+    :returns: the list of the names of the skipped structs
+    """
+    (source, skipped) = generateCodecs(filenames)
+    with open(outputFile, 'w') as f:
+        f.write(source)
+    return skipped
+
+def loadCodecs(filenames, moduleName='marof_lcm_codec'):
+    """ Generate the codecs of the fixed size structs of .lcm files and load them as a module
+    without writing a file.
+
+    :param filenames: the list of .lcm file names
+    :param moduleName: default 'marof_lcm_codec', the name of the module
+    :returns: the module
+    """
+    (source, _) = generateCodecs(filenames)
+    module = imp.new_module(moduleName)
+    exec compile(source, '<%s>' % moduleName, 'exec') in module.__dict__
+    return module
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print "Usage: python -m marof.codec.codecGen OUTPUT.py FILE.lcm..."
+        sys.exit(1)
+    skipped = writeCodecs(sys.argv[2:], sys.argv[1])
+    if len(skipped) > 0:
+        print "Skipped the structs that are not fixed size:", ', '.join(skipped)
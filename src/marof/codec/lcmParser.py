@@ -0,0 +1,208 @@
+"""
+Reads the LCM type definitions of .lcm files and computes their fingerprints like lcm-gen.
+"""
+import re
+import struct
+
+from marof.messages import FORMATS
+
+PRIMITIVE_TYPES = ('int8_t', 'int16_t', 'int32_t', 'int64_t', 'byte', 'float', 'double',
+                   'string', 'boolean')
+
+_COMMENT = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+_TOKEN = re.compile(r'\s*([A-Za-z_][A-Za-z0-9_.]*|[-+]?[0-9][0-9A-Za-z_.+\-]*|[{}\[\];,=])')
+
+_MASK = (1 << 64) - 1
+
+class LcmMember(object):
+    """ A field of an LCM struct.
+
+    :param typename: the LCM type name, for example 'double'
+    :param name: the field name
+    :param dimensions: default None, the list of the array sizes, each a number string for a
+                       fixed size or the name of the field holding the size
+    """
+
+    def __init__(self, typename, name, dimensions=None):
+        self._typename = typename
+        self._name = name
+        self._dimensions = [] if dimensions is None else list(dimensions)
+
+    @property
+    def typename(self):
+        return self._typename
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def dimensions(self):
+        return list(self._dimensions)
+
+    @property
+    def isPrimitive(self):
+        return self._typename in PRIMITIVE_TYPES
+
+    @property
+    def isFixedSize(self):
+        """ True if the member is a number or boolean, not an array, string or struct. """
+        return self._typename in FORMATS and len(self._dimensions) == 0
+
+class LcmStruct(object):
+    """ An LCM struct definition.
+
+    :param package: the package name, or '' if the file has none
+    :param name: the struct name, for example 'orientation_t'
+    :param members: the list of LcmMember objects in the order of the definition
+    :param constants: default None, a list of tuples (typename, name, value string)
+    """
+
+    def __init__(self, package, name, members, constants=None):
+        self._package = package
+        self._name = name
+        self._members = list(members)
+        self._constants = [] if constants is None else list(constants)
+
+    @property
+    def package(self):
+        return self._package
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def members(self):
+        return list(self._members)
+
+    @property
+    def constants(self):
+        return list(self._constants)
+
+    @property
+    def isFixedSize(self):
+        """ True if all members are fixed size, so every message has the same size. """
+        return all(m.isFixedSize for m in self._members)
+
+    @property
+    def hash(self):
+        """ The hash of the struct computed like lcm-gen, as an unsigned 64 bit number. The
+        package and struct names are not part of it. """
+        v = 0x12345678
+        for member in self._members:
+            v = _hashString(v, member.name)
+            if member.isPrimitive:
+                v = _hashString(v, member.typename)
+            v = _hashUpdate(v, len(member.dimensions))
+            for size in member.dimensions:
+                v = _hashUpdate(v, 0 if size.isdigit() else 1) # constant or variable size
+                v = _hashString(v, size)
+        return v & _MASK
+
+    @property
+    def fingerprint(self):
+        """ The 8 byte fingerprint that starts the encoded messages of the struct. Only structs
+        without members of other struct types are supported. """
+        assert all(m.isPrimitive for m in self._members), 'The struct has struct members'
+        h = self.hash
+        return struct.pack('>Q', ((h << 1) & _MASK) + (h >> 63))
+
+def _hashUpdate(v, c):
+    """ Add a character to the hash, in the signed 64 bit arithmetic of lcm-gen. """
+    if c > 127:
+        c -= 256 # a signed char
+    v = (((v << 8) ^ (v >> 55)) + c) & _MASK
+    return v - (1 << 64) if v >> 63 else v
+
+def _hashString(v, s):
+    v = _hashUpdate(v, len(s) & 0xff)
+    for c in s:
+        v = _hashUpdate(v, ord(c))
+    return v
+
+def parseLcm(text):
+    """ Read the structs of LCM type definitions.
+
+    :param text: the contents of an .lcm file
+    :returns: the list of LcmStruct objects
+    :raises ValueError: if the text is not a valid definition
+    """
+    tokens = _tokenize(_COMMENT.sub(' ', text))
+    structs = []
+    package = ''
+    i = 0
+    while i < len(tokens):
+        if tokens[i] == 'package':
+            package = tokens[i + 1]
+            i = _expect(tokens, i + 2, ';')
+        elif tokens[i] == 'struct':
+            name = tokens[i + 1]
+            i = _expect(tokens, i + 2, '{')
+            (members, constants) = ([], [])
+            while i < len(tokens) and tokens[i] != '}':
+                if tokens[i] == 'const':
+                    i = _parseConstants(tokens, i + 1, constants)
+                else:
+                    i = _parseMembers(tokens, i, members)
+            i = _expect(tokens, i, '}')
+            structs.append(LcmStruct(package, name, members, constants))
+        else:
+            raise ValueError("Unexpected '%s' in LCM definition" % tokens[i])
+    return structs
+
+def parseLcmFile(filename):
+    """ Read the structs of an .lcm file.
+
+    :param filename: the name of the file
+    :returns: the list of LcmStruct objects
+    """
+    with open(filename, 'r') as f:
+        return parseLcm(f.read())
+
+def _tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ValueError("Invalid character '%s' in LCM definition" % text[position])
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+def _expect(tokens, i, token):
+    """ Check the token at i and return the index after it. """
+    if i >= len(tokens) or tokens[i] != token:
+        raise ValueError("Expected '%s' in LCM definition" % token)
+    return i + 1
+
+def _parseMembers(tokens, i, members):
+    """ Read 'type name[size]..., name...;' and return the index after it. """
+    typename = tokens[i]
+    i += 1
+    while True:
+        name = tokens[i]
+        i += 1
+        dimensions = []
+        while tokens[i] == '[':
+            dimensions.append(tokens[i + 1])
+            i = _expect(tokens, i + 2, ']')
+        members.append(LcmMember(typename, name, dimensions))
+        if tokens[i] != ',':
+            return _expect(tokens, i, ';')
+        i += 1
+
+def _parseConstants(tokens, i, constants):
+    """ Read 'type name = value, ...;' after 'const' and return the index after it. """
+    typename = tokens[i]
+    i += 1
+    while True:
+        name = tokens[i]
+        i = _expect(tokens, i + 1, '=')
+        constants.append((typename, name, tokens[i]))
+        i += 1
+        if tokens[i] != ',':
+            return _expect(tokens, i, ';')
+        i += 1
@@ -2,7 +2,7 @@ from math import fabs, copysign
 from PidController import PidController
 from marof_lcm import motorCommand_t, desiredState_t, currentState_t
 from marof import MarofModuleHandler
-from marof import getMicroSeconds
+from marof import getFastMicroSeconds, decodeMessage
 
 class HeadingPid(PidController):
     """ A heading PID controller """
@@ -11,6 +11,7 @@ class HeadingPid(PidController):
         super(HeadingPid, self).__init__(name, updateInterval, kp, ki, kd)
         self.setLimits(-100, 100)
         self._forwardSpeed = forwardSpeed
+        self._commandMsg = self.pooledMessage(self.name, motorCommand_t)
     
     def stateDifference(self, desired, current):
         diff = (desired - current) % 360
@@ -21,19 +22,19 @@ class HeadingPid(PidController):
         return diff
     
     def publishUpdate(self):
-        msg = motorCommand_t()
-        msg.time = getMicroSeconds()
+        msg = self._commandMsg
+        msg.time = getFastMicroSeconds()
         msg.speedPercent = self._forwardSpeed
         msg.turnPercent = self.output
         self.publish(self.name, msg)
         
     def desiredHandler(self, channel, encoded):
-        msg = desiredState_t().decode(encoded)
+        msg = decodeMessage(desiredState_t, encoded)
         if msg.waypointMode == 0:
-            self.runLater("self.desiredState =" + str(msg.heading))
+            self.setLater("desiredState", msg.heading)
     
     def currentHandler(self, channel, encoded):
-        msg = currentState_t().decode(encoded)
+        msg = decodeMessage(currentState_t, encoded)
         self.currentState = msg.heading
 
 if __name__=="__main__":
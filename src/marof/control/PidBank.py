@@ -0,0 +1,148 @@
+from numpy import array, append, clip, flatnonzero, mod
+from marof_lcm import pidBank_t
+from marof import MarofModule
+from marof import getFastMicroSeconds
+
+class PidBank(MarofModule):
+    """ Runs many PID loops in one module. The gains, limits, states and integrators of the loops
+    are held in NumPy arrays, so all loops are stepped with a few array operations per update and
+    all outputs are published in one pidBank_t message on the channel of the module name.
+
+    Each loop uses the same control law as PidController. A loop with a period, for example 360
+    for a heading in degrees, wraps its state differences like HeadingPid. Subclasses can
+    override stateDifference() for other differences, working on arrays of all loops.
+
+    Example::
+
+        bank = PidBank("PID_BANK", 0.1)
+        heading = bank.addLoop("heading", 5, 0.1, 3, period=360)
+        speed = bank.addLoop("speed", 2, 0.5, 0, 0, 100)
+        bank.setDesiredState(heading, 90)
+
+    :param name: the name of the module
+    :param updateInterval: the interval to update the loops in seconds
+    """
+
+    def __init__(self, name, updateInterval):
+        super(PidBank, self).__init__(name, updateInterval)
+        self._names = []
+        self._kp = array([])
+        self._ki = array([])
+        self._kd = array([])
+        self._minOutput = array([])
+        self._maxOutput = array([])
+        self._period = array([])
+        self._wrapped = flatnonzero(self._period) # indices of the loops with a period
+        self._currentState = array([])
+        self._desiredState = array([])
+        self._lastInput = array([])
+        self._errorSum = array([])
+        self._output = array([])
+
+    def addLoop(self, name, kp, ki, kd, minOutput=-100, maxOutput=100, period=None):
+        """ Add a PID loop. Loops should be added before the module is started.
+
+        :param name: the name of the loop, unique within the bank
+        :param kp: the proportional gain
+        :param ki: the integral gain
+        :param kd: the derivative gain
+        :param minOutput: default -100, the minimum output
+        :param maxOutput: default 100, the maximum output
+        :param period: default None, the period of the state for wrapped differences
+        :returns: the index of the loop
+        """
+        assert name not in self._names, 'Loop name is not unique'
+        assert minOutput < maxOutput, "min must be less than max"
+        assert period is None or period > 0, 'Period is negative or 0'
+        self._names.append(name)
+        self._kp = append(self._kp, kp)
+        self._ki = append(self._ki, ki * self.updateInterval) # update interval is represented in ki and kd gains
+        self._kd = append(self._kd, kd / self.updateInterval)
+        self._minOutput = append(self._minOutput, minOutput)
+        self._maxOutput = append(self._maxOutput, maxOutput)
+        self._period = append(self._period, 0 if period is None else period)
+        self._wrapped = flatnonzero(self._period)
+        for attr in ('_currentState', '_desiredState', '_lastInput', '_errorSum', '_output'):
+            setattr(self, attr, append(getattr(self, attr), 0.0))
+        return len(self._names) - 1
+
+    def loopIndex(self, name):
+        """ Get the index of a loop.
+
+        :param name: the name of the loop
+        :returns: the index of the loop
+        """
+        return self._names.index(name)
+
+    def setGains(self, loop, kp, ki, kd):
+        self._kp[loop] = kp
+        self._ki[loop] = ki * self.updateInterval
+        self._kd[loop] = kd / self.updateInterval
+
+    def setLimits(self, loop, minOut, maxOut):
+        assert minOut < maxOut, "min must be less than max"
+        self._minOutput[loop] = minOut
+        self._maxOutput[loop] = maxOut
+        self._output[loop] = min(max(self._output[loop], minOut), maxOut)
+        self._errorSum[loop] = min(max(self._errorSum[loop], minOut), maxOut)
+
+    def setCurrentState(self, loop, state):
+        self._currentState[loop] = state
+
+    def setDesiredState(self, loop, state):
+        self._desiredState[loop] = state
+
+    @property
+    def names(self):
+        """ The names of the loops in index order. """
+        return list(self._names)
+
+    @property
+    def currentState(self):
+        return self._currentState
+
+    @property
+    def desiredState(self):
+        return self._desiredState
+
+    @property
+    def output(self):
+        """ The array of the last outputs calculated in the step function. """
+        return self._output
+
+    def stateDifference(self, desired, current):
+        """ Gets the differences between the arrays of states of all loops. """
+        diff = desired - current
+        wrapped = self._wrapped
+        if len(wrapped) > 0:
+            period = self._period[wrapped]
+            diffWrapped = mod(diff[wrapped], period)
+            diffWrapped -= period*(diffWrapped > 0.5*period)
+            diff[wrapped] = diffWrapped
+        return diff
+
+    def step(self):
+        if self._isPaused: return
+        current = self._currentState.copy() # the handlers may change the states during the step
+        desired = self._desiredState.copy()
+
+        # P Error
+        error = self.stateDifference(desired, current)
+        # I Error - Multiply gain here to prevent jump when changing PID constants.
+        self._errorSum += self._ki * error
+        clip(self._errorSum, self._minOutput, self._maxOutput, out=self._errorSum) # prevent windup
+        # D Error - Use input difference to remove derivative kick.
+        errorDiff = self.stateDifference(current, self._lastInput)
+
+        # Compute the next commands
+        output = error * self._kp + self._errorSum - errorDiff * self._kd
+        self._output = clip(output, self._minOutput, self._maxOutput, out=output)
+        self._lastInput = current
+
+    def publishUpdate(self):
+        msg = pidBank_t()
+        msg.time = getFastMicroSeconds()
+        msg.numLoops = len(self._names)
+        msg.names = list(self._names)
+        msg.output = self._output.tolist()
+        self.publish(self.name, msg)
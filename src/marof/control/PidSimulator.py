@@ -0,0 +1,153 @@
+from numpy import asarray, broadcast_arrays, broadcast_to, clip, dot, empty, full, inf, maximum, mod
+from numpy import abs as npabs
+from marof.model import StateSpace
+
+class PidSimulator(object):
+    """ Simulates the closed loop of the PidController control law and a discrete single-input
+    single-output StateSpace plant for many gain and disturbance combinations at once. Each
+    combination is one element of a batch dimension, so the whole batch is stepped with a few
+    NumPy operations per time step.
+
+    The control law is the same as PidController.step(): the integral term is clamped to the
+    output limits to prevent windup, the derivative acts on the measurement to remove the
+    derivative kick and the ki and kd gains are scaled by the sampling interval of the plant. The
+    disturbance is added to the command at the plant input.
+
+    Example::
+
+        (kp, kd) = numpy.meshgrid(numpy.linspace(1, 10, 100), numpy.linspace(0, 5, 100))
+        sim = PidSimulator(plant, -100, 100, period=360)
+        stats = sim.run(kp.ravel(), 0.1, kd.ravel(), setpoint=90, duration=20)
+        best = numpy.argmin(stats['settlingTime'])
+
+    :param plant: the discrete StateSpace model of the plant, with D equal to zero
+    :param minOutput: default -100, the minimum command
+    :param maxOutput: default 100, the maximum command
+    :param period: default None, the period of the state, for example 360 for a heading in
+                   degrees. The differences are wrapped like HeadingPid.stateDifference().
+    """
+
+    def __init__(self, plant, minOutput=-100, maxOutput=100, period=None):
+        assert isinstance(plant, StateSpace), "The plant must be a StateSpace"
+        assert plant.discrete, "The plant must be discrete"
+        assert minOutput < maxOutput, "min must be less than max"
+        self._A = asarray(plant.A, dtype=float)
+        self._B = asarray(plant.B, dtype=float)
+        self._C = asarray(plant.C, dtype=float)
+        assert self._B.shape[1] == 1 and self._C.shape[0] == 1, "The plant must have one input and one output"
+        assert not asarray(plant.D).any(), "The plant must have D equal to zero"
+        self._Ts = plant.Ts
+        self._minOutput = minOutput
+        self._maxOutput = maxOutput
+        self._period = period
+
+    def stateDifference(self, desired, current):
+        """ Gets the difference between the arrays of states. """
+        diff = desired - current
+        if self._period is None:
+            return diff
+        diff = mod(diff, self._period)
+        diff[diff > 0.5*self._period] -= self._period
+        return diff
+
+    def run(self, kp, ki, kd, setpoint, duration, disturbance=0, x0=None, tolerance=0.02):
+        """ Simulate the closed loop for every combination of the parameters. The gains,
+        setpoint and disturbance are broadcast against each other to give the batch of
+        combinations.
+
+        :param kp: the proportional gains
+        :param ki: the integral gains
+        :param kd: the derivative gains
+        :param setpoint: the desired states
+        :param duration: the simulated time in seconds
+        :param disturbance: default 0, the disturbances added to the command. An array with one
+                            row per time step gives disturbances that change over time.
+        :param x0: default None, the initial state of the plant. If None, the plant starts at
+                   zero.
+        :param tolerance: default 0.02, the settling band as a fraction of the initial error
+        :returns: a dictionary of arrays with one value per combination:
+                  'settlingTime' the time in seconds after which the error stays within the
+                  settling band, inf if it did not settle;
+                  'overshoot' the largest overshoot in percent of the initial error;
+                  'saturation' the fraction of time steps with the command at a limit;
+                  'finalError' the error at the end of the simulation
+        """
+        T = self._Ts
+        steps = int(round(duration/T))
+        assert steps > 0, "The duration is shorter than the sampling interval"
+        disturbance = asarray(disturbance, dtype=float)
+        varying = disturbance.ndim == 2 # one row of disturbances per time step
+        assert not varying or disturbance.shape[0] >= steps, "The disturbance has too few rows"
+        (kp, ki, kd, setpoint, constant) = broadcast_arrays(
+            *[asarray(v, dtype=float).ravel() for v in
+              (kp, ki, kd, setpoint, disturbance[0] if varying else disturbance)])
+        batch = len(kp)
+        disturbance = broadcast_to(disturbance, (disturbance.shape[0], batch)) if varying else constant
+        ki = ki * T # update interval is represented in ki and kd gains
+        kd = kd / T
+
+        n = self._A.shape[0]
+        x = empty((batch, n))
+        x[:] = 0 if x0 is None else asarray(x0, dtype=float).ravel()
+        xNext = empty((batch, n))
+        At = self._A.T.copy()
+        b = self._B[:, 0].copy()
+        c = self._C[0].copy()
+        minOutput = self._minOutput
+        maxOutput = self._maxOutput
+
+        current = dot(x, c)
+        lastInput = current.copy()
+        errorSum = full(batch, 0.0)
+        initialError = npabs(self.stateDifference(setpoint, current))
+        band = tolerance*initialError
+        lastOutside = full(batch, -1)
+        overshoot = full(batch, 0.0)
+        saturated = full(batch, 0)
+        direction = self.stateDifference(setpoint, current) >= 0
+
+        for k in xrange(steps):
+            # P Error
+            error = self.stateDifference(setpoint, current)
+            # I Error with windup prevention
+            errorSum += ki * error
+            clip(errorSum, minOutput, maxOutput, out=errorSum)
+            # D Error on the measurement
+            errorDiff = self.stateDifference(current, lastInput)
+            output = error * kp + errorSum - errorDiff * kd
+            clip(output, minOutput, maxOutput, out=output)
+            saturated += (output <= minOutput) | (output >= maxOutput)
+
+            # statistics of the state at step k
+            lastOutside[npabs(error) > band] = k
+            maximum(overshoot, (-error)*(2*direction - 1), out=overshoot)
+
+            # plant
+            lastInput = current
+            u = output + (disturbance[k] if varying else disturbance)
+            dot(x, At, out=xNext)
+            xNext += u[:, None]*b
+            (x, xNext) = (xNext, x)
+            current = dot(x, c)
+
+        error = self.stateDifference(setpoint, current)
+        lastOutside[npabs(error) > band] = steps
+        settlingTime = (lastOutside + 1)*T
+        settlingTime[lastOutside >= steps] = inf
+        initialError[initialError == 0] = 1.0
+        return {'settlingTime': settlingTime,
+                'overshoot': 100.0*overshoot/initialError,
+                'saturation': saturated/float(steps),
+                'finalError': error}
+
+    @property
+    def Ts(self):
+        return self._Ts
+
+    @property
+    def minOutput(self):
+        return self._minOutput
+
+    @property
+    def maxOutput(self):
+        return self._maxOutput
@@ -0,0 +1,4 @@
+# Only the modules that work without the generated LCM types, so the offline tools such as
+# PidSimulator can be used without marof_lcm. Import the controllers from their modules, for
+# example from marof.control.HeadingPid import HeadingPid
+from PidSimulator import PidSimulator
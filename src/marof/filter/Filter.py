@@ -1,4 +1,5 @@
 import abc
+from numpy import array, asarray
 
 class Filter(object):
     """ A filter for use with the Sensor class.
@@ -15,4 +16,15 @@ class Filter(object):
         :param currentInput: the input to the filter step, could be a list
         :returns: the filter output with the same size as the input
         """
-        return
\ No newline at end of file
+        return
+    
+    def stepBlock(self, samples):
+        """ Perform a filter step for each row of samples, continuing from the state left by the
+        previous steps. Each column is filtered as a separate channel. This implementation calls
+        step() for each row; linear filters override it to filter the whole block at once.
+        
+        :param samples: an N x K array of N samples of K channels, or an array of N samples
+        :returns: the filter output with the same shape as samples
+        """
+        samples = asarray(samples, dtype=float)
+        return array([self.step(sample) for sample in samples]).reshape(samples.shape)
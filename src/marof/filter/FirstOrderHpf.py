@@ -25,7 +25,10 @@ class FirstOrderHpf(Filter):
     :param samplingInterval: default 0.1 sec, the sampling interval in seconds
     :param gain: default 1, the gain of the filter
     
-    ..  todo:: Implement multiple inputs, maybe with numpy, lists, or tuples
+    The input of step() can be a number or a NumPy array of channels. Note that step() computes
+    :math:`K \alpha (y[k-1] + x[k] - y[k-1])`, which is :math:`K \alpha x[k]` up to rounding,
+    and is kept as it is so its output does not change. stepBlock() therefore steps through the
+    samples one by one instead of using lfilter, whose rounding would differ.
     """
     
     def __init__(self, cutoff=1, samplingInterval=0.1, gain=1):
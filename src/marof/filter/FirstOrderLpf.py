@@ -1,4 +1,6 @@
 from math import pi
+from numpy import asarray, newaxis, zeros
+from scipy.signal import lfilter
 from marof.filter import Filter
 
 class FirstOrderLpf(Filter):
@@ -33,7 +35,8 @@ class FirstOrderLpf(Filter):
     :param samplingInterval: default 0.1 sec, the sampling interval in seconds
     :param gain: default 1, the gain of the filter
     
-    ..  todo:: Implement multiple inputs, maybe with numpy, lists, or tuples
+    The input of step() can be a number or a NumPy array of channels, and stepBlock() filters
+    many samples of many channels in one call with the same state.
     """
     
     def __init__(self, cutoff=1, samplingInterval=0.1, gain=1):
@@ -52,3 +55,18 @@ class FirstOrderLpf(Filter):
         self._lastOutput = self._gain*(self._a * currentInput + (1.0 - self._a) * self._lastOutput)
         return self._lastOutput
     
+    def stepBlock(self, samples):
+        samples = asarray(samples, dtype=float)
+        if len(samples) == 0:
+            return samples.copy()
+        if self._lastOutput is None:
+            self._lastOutput = samples[0]
+        
+        # y[k] = g a x[k] + g (1 - a) y[k-1], with the state holding g (1 - a) y[k-1]
+        feedback = self._gain*(1.0 - self._a)
+        # The state broadcasts like in step(), for example a number after step() with a number
+        zi = feedback*(zeros(samples.shape[1:]) + self._lastOutput)[newaxis]
+        (output, _) = lfilter([self._gain*self._a], [1.0, -feedback], samples, axis=0, zi=zi)
+        self._lastOutput = output[-1]
+        return output
+    
@@ -0,0 +1,177 @@
+from numpy import absolute, array, asarray, flatnonzero, ndim, ones, newaxis, vstack, zeros
+from scipy.signal import tf2sos, ss2tf, sosfilt, sosfilt_zi, butter, iirnotch
+from marof.filter import Filter
+from marof.model import TransferFunction, StateSpace
+
+class LinearFilter(Filter):
+    r""" A discrete linear time-invariant filter given by a transfer function or a state space
+    model. The filter runs as a cascade of second-order sections for numerical stability, each
+    section being
+
+    ..  math::
+        H_i(z) = \frac{b_{0i} + b_{1i} z^{-1} + b_{2i} z^{-2}}{1 + a_{1i} z^{-1} + a_{2i} z^{-2}}
+
+    implemented in transposed direct form II. Like the first-order filters, the filter starts in
+    the steady state of its first input. The input of step() can be a number or a NumPy array of
+    channels, and stepBlock() filters many samples of many channels in one call with the same
+    state.
+
+    :param model: a discrete TransferFunction or single-input single-output StateSpace
+    """
+
+    def __init__(self, model):
+        super(LinearFilter, self).__init__()
+        if isinstance(model, TransferFunction):
+            assert model.Ts > 0, 'The transfer function is not discrete'
+            sections = _transferSections(model.numerator, model.denominator)
+        elif isinstance(model, StateSpace):
+            assert model.discrete, 'The state space model is not discrete'
+            (num, den) = ss2tf(asarray(model.A), asarray(model.B),
+                               asarray(model.C), asarray(model.D))
+            assert num.shape[0] == 1, 'The state space model has more than one output'
+            sections = _transferSections(num[0], den)
+        else:
+            raise TypeError("The model must be a TransferFunction or StateSpace")
+        self._setSections(sections, model.Ts)
+
+    @classmethod
+    def fromSections(cls, sections, samplingInterval):
+        """ Create a filter from second-order sections.
+
+        :param sections: an n x 6 array of sections (b0, b1, b2, 1, a1, a2)
+        :param samplingInterval: the sampling interval in seconds
+        :returns: the LinearFilter
+        """
+        filt = cls.__new__(cls)
+        Filter.__init__(filt)
+        filt._setSections(sections, samplingInterval)
+        return filt
+
+    @classmethod
+    def butterworth(cls, order, cutoff, samplingInterval, btype='lowpass'):
+        """ Create a Butterworth filter.
+
+        :param order: the order of the filter
+        :param cutoff: the cutoff frequency in Hz at -3 dB, or a tuple (low, high) for the
+                       'bandpass' and 'bandstop' types
+        :param samplingInterval: the sampling interval in seconds
+        :param btype: default 'lowpass', one of 'lowpass', 'highpass', 'bandpass' or 'bandstop'
+        :returns: the LinearFilter
+        """
+        nyquist = 0.5/samplingInterval
+        sections = butter(order, asarray(cutoff, dtype=float)/nyquist, btype, output='sos')
+        return cls.fromSections(sections, samplingInterval)
+
+    @classmethod
+    def notch(cls, frequency, quality, samplingInterval):
+        """ Create a second-order notch filter that removes a single frequency.
+
+        :param frequency: the frequency to remove in Hz
+        :param quality: the quality factor, the frequency divided by the -3 dB bandwidth
+        :param samplingInterval: the sampling interval in seconds
+        :returns: the LinearFilter
+        """
+        nyquist = 0.5/samplingInterval
+        (num, den) = iirnotch(frequency/nyquist, quality)
+        return cls.fromSections(tf2sos(num, den), samplingInterval)
+
+    @classmethod
+    def movingAverage(cls, length, samplingInterval):
+        """ Create a filter that outputs the mean of the last length inputs.
+
+        :param length: the number of inputs to average
+        :param samplingInterval: the sampling interval in seconds
+        :returns: the LinearFilter
+        """
+        assert length > 0, 'length is negative or 0'
+        if length == 1:
+            return cls.fromSections([[1.0, 0, 0, 1.0, 0, 0]], samplingInterval)
+        return cls.fromSections(tf2sos(ones(length)/length, [1.0]), samplingInterval)
+
+    @property
+    def sections(self):
+        """ The n x 6 array of second-order sections (b0, b1, b2, 1, a1, a2). """
+        return self._sections
+
+    @property
+    def samplingInterval(self):
+        return self._samplingInterval
+
+    def reset(self):
+        """ Forget the state, so the filter starts in the steady state of the next input. """
+        self._state = None
+
+    def step(self, currentInput):
+        if self._state is None:
+            self._state = self._steadyState(currentInput)
+        x = currentInput
+        for (coefficients, z) in zip(self._coefficients, self._state):
+            (b0, b1, b2, a1, a2) = coefficients
+            y = b0*x + z[0]
+            z[0] = b1*x - a1*y + z[1]
+            z[1] = b2*x - a2*y
+            x = y
+        return x
+
+    def stepBlock(self, samples):
+        samples = asarray(samples, dtype=float)
+        if len(samples) == 0:
+            return samples.copy()
+        if self._state is None:
+            self._state = self._steadyState(samples[0])
+        zi = array(self._state, dtype=float)
+        # The state broadcasts like in step(), for example numbers after step() with a number
+        zi = zi.reshape(zi.shape + (1,)*(samples.ndim + 1 - zi.ndim)) + zeros(samples.shape[1:])
+        (output, zf) = sosfilt(self._sections, samples, axis=0, zi=zi)
+        self._state = self._toState(zf, ndim(samples[0]) == 0)
+        return output
+
+    def _setSections(self, sections, samplingInterval):
+        sections = array(sections, dtype=float)
+        assert sections.ndim == 2 and sections.shape[1] == 6, 'Sections must be an n x 6 array'
+        sections = sections/sections[:, 3:4] # normalize so a0 is 1
+        self._sections = sections
+        self._samplingInterval = samplingInterval
+        self._coefficients = [(float(s[0]), float(s[1]), float(s[2]), float(s[4]), float(s[5]))
+                              for s in sections]
+        self._state = None
+
+    def _steadyState(self, firstInput):
+        """ The state of the filter after a constant input of firstInput. """
+        zi = sosfilt_zi(self._sections)
+        if ndim(firstInput) == 0:
+            return self._toState(zi*float(firstInput), True)
+        firstInput = asarray(firstInput, dtype=float)
+        zi = zi.reshape(zi.shape + (1,)*firstInput.ndim)
+        return self._toState(zi*firstInput[newaxis, newaxis], False)
+
+    def _toState(self, zi, scalar):
+        """ Convert an n x 2 x ... state array into the lists used by step(). """
+        if scalar:
+            return [[float(z[0]), float(z[1])] for z in zi]
+        return [[z[0].copy(), z[1].copy()] for z in zi]
+
+def _transferSections(numerator, denominator):
+    """ Get the second-order sections of a transfer function whose coefficients are in
+    decreasing powers of z. tf2sos reads the coefficients as powers of 1/z and ignores the
+    leading zeros of the numerator, so the delay of a strictly proper transfer function is
+    removed before and added back as sections of pure delay.
+
+    :param numerator: the coefficients of the numerator
+    :param denominator: the coefficients of the denominator
+    :returns: the n x 6 array of sections
+    """
+    numerator = asarray(numerator, dtype=float)
+    denominator = asarray(denominator, dtype=float)
+    assert denominator[0] != 0, 'The leading coefficient of the denominator is 0'
+    # ss2tf leaves rounding errors instead of zeros in the leading coefficients
+    nonzero = flatnonzero(absolute(numerator) > 1e-12*absolute(numerator).max())
+    assert len(nonzero) > 0, 'The numerator is 0'
+    numerator = numerator[nonzero[0]:]
+    delay = len(denominator) - len(numerator)
+    assert delay >= 0, 'The transfer function is not proper'
+    sections = tf2sos(numerator, denominator)
+    delays = [[0, 0, 1.0, 1.0, 0, 0]]*(delay//2) + [[0, 1.0, 0, 1.0, 0, 0]]*(delay%2)
+    if len(delays) == 0:
+        return sections
+    return vstack([sections, delays])
@@ -1,3 +1,4 @@
 from Filter import Filter
 from FirstOrderLpf import FirstOrderLpf
 from FirstOrderHpf import FirstOrderHpf
+from LinearFilter import LinearFilter
@@ -1,4 +1,4 @@
-import sys, signal, threading, select
+import sys, signal
 
 from OpenGL.GL import *
 from PyQt4.QtCore import SIGNAL, Qt
@@ -7,8 +7,8 @@ from PyQt4.QtGui import (QApplication, QMainWindow, QWidget, QLineEdit, QPushBut
 from PyQt4.QtOpenGL import QGLWidget
 
 import lcm
-from marof import getMicroSeconds
-from marof_lcm import orientation_t
+from marof import getMicroSeconds, LcmDispatcher, decodeMessage
+from marof_lcm import imu_t
 
 class GLOrientation(QGLWidget):
     """ Display the orientation of a vehicle. """
@@ -147,32 +147,21 @@ class MarofGui(QMainWindow):
         self._speed = 0.0
         self._turn = 0.0
         self._lcm = lcm.LCM()
-        self._lcm.subscribe("ORIENTATION", self.handleOrientation)
+        self._lcm.subscribe("IMU", self.handleOrientation)
         self.createMainFrame()
         signal.signal(signal.SIGINT, signal.SIG_DFL)
-        # Stop the program if CTRL-C is received
-        self._stopEvent = threading.Event()
         
-        self.handlerThread = threading.Thread(target=self.pollLcm)
-        self.handlerThread.setDaemon(True)
-        self.handlerThread.start()
+        self._dispatcher = LcmDispatcher()
+        self._dispatcher.add(self._lcm)
+        self.handlerThread = self._dispatcher.start()
         
     def _cleanup(self):
-        self._stopEvent.set()
+        self._dispatcher.stop()
         self.handlerThread.join()
-        
-    def pollLcm(self):
-        while not self._stopEvent.isSet():
-            try:
-                rc = select.select([self._lcm.fileno()], [], [self._lcm.fileno()], 0.05)
-            except:
-                break
-            if len(rc[0]) > 0 or len(rc[2]) > 0:
-                self._lcm.handle()
                 
     def handleOrientation(self, channel, encoded):
         print "got"
-        msg = orientation_t().decode(encoded)
+        msg = decodeMessage(imu_t, encoded)
         self.glOrientation.setOrientation(msg.roll, msg.pitch, msg.heading)
         self.emit(SIGNAL("redraw()"))
         
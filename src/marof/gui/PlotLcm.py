@@ -1,7 +1,7 @@
 """
 Code adapted from Eli Bendersky (eliben@gmail.com)
 """
-import sys, select, signal, threading, time
+import sys, signal, threading, time
 from PyQt4.QtCore import SIGNAL, Qt
 from PyQt4.QtGui import (QApplication, QMainWindow, QMessageBox, QFileDialog, QWidget, QLineEdit,
                          QPushButton, QCheckBox, QLabel, QSlider, QHBoxLayout, QVBoxLayout, QAction,
@@ -11,13 +11,25 @@ from matplotlib.backends.backend_qt4agg import FigureCanvasQTAgg
 from matplotlib.backends.backend_qt4agg import NavigationToolbar2QTAgg
 from matplotlib.figure import Figure
 
+from operator import attrgetter
+
 import lcm
-from marof_lcm import * # Import everything so that we can decode any type
+import marof_lcm # the LCM types are found by name in this module
+from marof import LcmDispatcher, decodeMessage
+from RingBuffer import RingBuffer
 
 class PlotLcm(QMainWindow):
-    """ A class to plot an LCM type over time. """
+    """ A class to plot an LCM type over time. 
+    
+    :param parent: default None, the parent widget
+    :param capacity: default 10000, the number of values kept for each plot
+    :param maxPoints: default 2000, the maximum number of points drawn for each plot
+    :param redrawInterval: default 0.05, the interval to redraw the plots in seconds
+    :param blit: default True, only redraw the lines over a saved background, unless the data
+                 leaves the axis limits
+    """
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, capacity=10000, maxPoints=2000, redrawInterval=0.05, blit=True):
         QMainWindow.__init__(self, parent)
         self.setWindowTitle('LCM Plotter')
 
@@ -25,9 +37,18 @@ class PlotLcm(QMainWindow):
         self.createMainFrame()
         
         # Each channel has data and axis associated with it. 
-        # Dictionary key is the channel name and property.
+        # Dictionary key is the channel name, type and property.
+        self.capacity = capacity
+        self.maxPoints = maxPoints
+        self.redrawInterval = redrawInterval
+        self.blit = blit
         self.data = {}
         self.axes = {}
+        self.lines = {}
+        self.backgrounds = None # the axes without the lines, saved after every full draw
+        self.channelKeys = {} # the keys of the data of each channel
+        self.extractors = {} # the decoding of each channel, built by compileChannel()
+        self.startTime = time.time()
         self.lastPlot = None
         
         # Stop the program if CTRL-C is received
@@ -35,10 +56,11 @@ class PlotLcm(QMainWindow):
         signal.signal(signal.SIGINT, self.handleSigint)
         
         self._lcm = lcm.LCM()
-        self.handlerThread = threading.Thread(target=self.pollLcm)
-        self.handlerThread.setDaemon(True)
-        self.handlerThread.start()
+        self._dispatcher = LcmDispatcher()
+        self._dispatcher.add(self._lcm)
+        self.handlerThread = self._dispatcher.start()
         
+        self.canvas.mpl_connect('draw_event', self.onCanvasDraw)
         self.connect(self, SIGNAL('redraw()'), self.on_draw) # Create redraw signal
         self.drawingThread = threading.Thread(target=self.drawLoop)
         self.drawingThread.setDaemon(True)
@@ -46,6 +68,7 @@ class PlotLcm(QMainWindow):
         
     def _cleanup(self):
         self._stopEvent.set()
+        self._dispatcher.stop()
         self.handlerThread.join()
         self.drawingThread.join()
         
@@ -53,22 +76,42 @@ class PlotLcm(QMainWindow):
         self._cleanup()
         QApplication.quit()
         
-    def pollLcm(self):
-        while not self._stopEvent.isSet():
-            rc = select.select([self._lcm.fileno()], [], [self._lcm.fileno()], 0.05)
-            if len(rc[0]) > 0 or len(rc[2]) > 0:
-                self._lcm.handle()
-            
     def drawLoop(self):
         while not self._stopEvent.isSet():
             self.emit(SIGNAL("redraw()"))
-            time.sleep(0.5)
+            time.sleep(self.redrawInterval)
             
     def handleMessage(self, channel, msg):
-        for (lcmChannel, lcmType, lcmProperty) in self.data.keys():
-            if lcmChannel == channel:
-                data = eval(lcmType + ".decode(msg)." + lcmProperty)
-                self.data[(lcmChannel, lcmType, lcmProperty)].append(data)
+        now = time.time() - self.startTime
+        for (lcmType, getter, buffers) in self.extractors.get(channel, ()):
+            values = getter(decodeMessage(lcmType, msg))
+            if len(buffers) == 1:
+                buffers[0].append(now, values)
+            else:
+                for (buf, value) in zip(buffers, values):
+                    buf.append(now, value)
+    
+    def compileChannel(self, channel):
+        """ Build the extractors of a channel. Each message is decoded once for each LCM type
+        plotted on the channel, and all plotted properties of the type are read with one
+        attrgetter.
+        """
+        keysByType = {}
+        for key in self.channelKeys[channel]:
+            keysByType.setdefault(key[1], []).append(key)
+        extractors = []
+        for (lcmType, keys) in keysByType.items():
+            getter = attrgetter(*[lcmProperty for (_, _, lcmProperty) in keys])
+            extractors.append((getattr(marof_lcm, lcmType), getter, 
+                               tuple(self.data[key] for key in keys)))
+        # Replace the tuple instead of changing it so handleMessage() can iterate without a lock
+        self.extractors[channel] = tuple(extractors)
+    
+    def numericProperties(self, lcmType):
+        """ Get the number and boolean fields of an LCM type in the order of the struct. """
+        msg = getattr(marof_lcm, lcmType)()
+        return [field for field in msg.__slots__ 
+                if type(getattr(msg, field)) in (int, long, float, bool)]
         
     def save_plot(self):
         file_choices = "PNG (*.png)|*.png"
@@ -77,7 +120,11 @@ class PlotLcm(QMainWindow):
                         'Save file', '', 
                         file_choices))
         if path:
+            for line in self.lines.values():
+                line.set_animated(False) # animated lines are left out of saved figures
             self.canvas.print_figure(path, dpi=self.dpi)
+            for line in self.lines.values():
+                line.set_animated(self.blit)
             self.statusBar().showMessage('Saved to %s' % path, 2000)
     
     def on_about(self):
@@ -86,39 +133,97 @@ class PlotLcm(QMainWindow):
         QMessageBox.about(self, "About the demo", msg.strip())
     
     def on_draw(self):
-        """ Redraws the figure
+        """ Redraws the figure. The lines are updated with the new data, and when blitting only
+        the lines are drawn unless the data left the axis limits.
         """
-        for (channel, lcmType, lcmProperty) in self.axes.keys():
-            axis = self.axes[(channel, lcmType, lcmProperty)]
-            axis.clear()
+        rescaled = False
+        for (key, line) in self.lines.items():
+            (times, values) = self.data[key].decimated(self.maxPoints)
+            line.set_data(times, values)
+            if len(times) > 0 and self.updateLimits(self.axes[key], times, values):
+                rescaled = True
+        
+        if rescaled or not self.blit or self.backgrounds is None:
+            self.canvas.draw() # onCanvasDraw() saves the backgrounds and draws the lines
+            return
+        for (key, line) in self.lines.items():
+            axis = self.axes[key]
+            self.canvas.restore_region(self.backgrounds[key])
+            axis.draw_artist(line)
+            self.canvas.blit(axis.bbox)
+    
+    def on_grid(self):
+        for axis in self.axes.values():
             axis.grid(self.gridCheckBox.isChecked())
-            axis.plot(self.data[(channel, lcmType, lcmProperty)])
-            axis.set_title(channel + ": " + lcmProperty)
-            
         self.canvas.draw()
     
+    def onCanvasDraw(self, event):
+        """ Save the backgrounds for blitting after a full draw, for example after a resize,
+        and draw the lines on them. """
+        if not self.blit:
+            return
+        self.backgrounds = dict((key, self.canvas.copy_from_bbox(axis.bbox)) 
+                                for (key, axis) in self.axes.items())
+        for (key, line) in self.lines.items():
+            self.axes[key].draw_artist(line)
+    
+    def updateLimits(self, axis, times, values):
+        """ Rescale an axis if the data left its limits. Some room is left after the latest
+        time and around the values so the axis is not rescaled on every redraw.
+        
+        :returns: True if the axis was rescaled
+        """
+        (tMin, tMax) = (times[0], times[-1])
+        (vMin, vMax) = (values.min(), values.max())
+        (xMin, xMax) = axis.get_xlim()
+        (yMin, yMax) = axis.get_ylim()
+        if tMin >= xMin and tMax <= xMax and vMin >= yMin and vMax <= yMax:
+            return False
+        timeSpan = max(tMax - tMin, 1.0)
+        axis.set_xlim(tMin, tMax + 0.2*timeSpan)
+        valueSpan = vMax - vMin if vMax > vMin else max(abs(vMax), 1.0)
+        axis.set_ylim(vMin - 0.1*valueSpan, vMax + 0.1*valueSpan)
+        return True
+    
     def addPlot(self):
         channel = str(self.channelTextbox.text()).strip()
         lcmType = str(self.typeTextbox.text()).strip()
         lcmProperty = str(self.propertyTextbox.text()).strip()
         
-        if not self.checkInputs(channel, lcmType, lcmProperty):
+        if lcmProperty == "*": # all numeric properties of the type
+            if not self.checkInputs(channel, lcmType, None):
+                return
+            properties = self.numericProperties(lcmType)
+        else:
+            properties = [lcmProperty]
+        keys = [(channel, lcmType, p) for p in properties if self.checkInputs(channel, lcmType, p)]
+        if len(keys) == 0:
             return
         
-        self.data[(channel, lcmType, lcmProperty)] = []
+        for key in keys:
+            self.data[key] = RingBuffer(self.capacity)
         n = len(self.data)
         i = 0
         self.fig.clear() # Clear the old plot first
-        for key in self.data.keys():
+        for plotKey in self.data.keys():
             i = i + 1
-            self.axes[key] = self.fig.add_subplot(n, 1, i)
+            axis = self.fig.add_subplot(n, 1, i)
+            axis.set_title(plotKey[0] + ": " + plotKey[2])
+            axis.grid(self.gridCheckBox.isChecked())
+            (self.lines[plotKey],) = axis.plot([], [], animated=self.blit)
+            self.axes[plotKey] = axis
+        self.backgrounds = None
+        self.canvas.draw()
         
-        self.lastPlot = (channel, lcmType, lcmProperty)
-        self._lcm.subscribe(channel, self.handleMessage)
+        self.lastPlot = keys[-1]
+        if channel not in self.channelKeys:
+            self._lcm.subscribe(channel, self.handleMessage)
+        self.channelKeys[channel] = self.channelKeys.get(channel, ()) + tuple(keys)
+        self.compileChannel(channel)
         
     def clearPlots(self):
-        for key in self.data.keys():
-            self.data[key] = []
+        for buf in self.data.values():
+            buf.clear()
     
     def checkInputs(self, channel, lcmType, lcmProperty):
         # Error checking cause nobody is perfect...
@@ -126,22 +231,20 @@ class PlotLcm(QMainWindow):
             print "Warning: No channel given"
             return False
         
-        try:
-            __import__("marof_lcm." + lcmType)
-        except ImportError:
+        lcmClass = getattr(marof_lcm, lcmType, None)
+        if lcmClass is None or not hasattr(lcmClass, "decode"):
             print "Warning: The LCM type is not in scope"
             return False
-        else:
-            try:
-                eval("getattr(" + lcmType + ", lcmProperty)")
-            except Exception:
-                print "Warning: The LCM property for this type does not exist"
-                return False
+        if lcmProperty is None:
+            return True
+        if lcmProperty not in getattr(lcmClass, "__slots__", ()):
+            print "Warning: The LCM property for this type does not exist"
+            return False
         
         # Clear the data and don't create a new axis if there is already data for this        
         if self.data.has_key((channel, lcmType, lcmProperty)):
             print "This data already exists:", channel
-            self.data[(channel, lcmType, lcmProperty)] = []
+            self.data[(channel, lcmType, lcmProperty)].clear()
             return False
         
         return True
@@ -175,7 +278,7 @@ class PlotLcm(QMainWindow):
         
         self.gridCheckBox = QCheckBox("Show Grid")
         self.gridCheckBox.setChecked(False)
-        self.connect(self.gridCheckBox, SIGNAL('stateChanged(int)'), self.on_draw)
+        self.connect(self.gridCheckBox, SIGNAL('stateChanged(int)'), self.on_grid)
         
         slider_label = QLabel('Bar width (%):')
         self.slider = QSlider(Qt.Horizontal)
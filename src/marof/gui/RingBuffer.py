@@ -0,0 +1,73 @@
+from numpy import arange, argmax, argmin, concatenate, empty, sort
+
+class RingBuffer(object):
+    """ A fixed capacity buffer of timestamped values held in NumPy arrays. When the buffer is
+    full the oldest values are overwritten, so the memory used does not grow over time.
+
+    :param capacity: the maximum number of values
+    :param dtype: default float, the type of the values
+    """
+
+    def __init__(self, capacity, dtype=float):
+        assert capacity > 0, 'Capacity is negative or 0'
+        self._times = empty(capacity)
+        self._values = empty(capacity, dtype=dtype)
+        self._capacity = capacity
+        self.clear()
+
+    def clear(self):
+        """ Remove all values. """
+        self._next = 0
+        self._count = 0
+
+    def append(self, time, value):
+        """ Add a value, overwriting the oldest value if the buffer is full.
+
+        :param time: the time of the value in seconds
+        :param value: the value
+        """
+        i = self._next
+        self._times[i] = time
+        self._values[i] = value
+        i += 1
+        self._next = 0 if i == self._capacity else i
+        if self._count < self._capacity:
+            self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def view(self):
+        """ Get the values in time order.
+
+        :returns: a tuple of arrays (times, values)
+        """
+        if self._count < self._capacity:
+            return (self._times[0:self._count].copy(), self._values[0:self._count].copy())
+        i = self._next
+        return (concatenate((self._times[i:], self._times[0:i])),
+                concatenate((self._values[i:], self._values[0:i])))
+
+    def decimated(self, maxPoints):
+        """ Get at most maxPoints values in time order for drawing. The values are split into
+        buckets and the minimum and maximum of each bucket are kept, so peaks stay visible.
+
+        :param maxPoints: the maximum number of values returned
+        :returns: a tuple of arrays (times, values)
+        """
+        (times, values) = self.view()
+        buckets = maxPoints // 2
+        if len(values) <= maxPoints or buckets == 0:
+            return (times, values)
+        size = -(-len(values) // buckets) # ceiling division
+        buckets = len(values) // size
+        start = len(values) - buckets*size # drop the oldest values that do not fill a bucket
+        grouped = values[start:].reshape(buckets, size)
+        offsets = arange(buckets)*size + start
+        keep = sort(concatenate((offsets + argmin(grouped, axis=1),
+                                 offsets + argmax(grouped, axis=1))))
+        return (times[keep], values[keep])
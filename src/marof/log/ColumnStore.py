@@ -0,0 +1,68 @@
+import json
+import os
+
+from numpy import load
+
+from marof.log.exportColumns import INDEX_FILE
+
+class ColumnStore(object):
+    """ Loads the columns written by exportColumns() as read-only memory maps, so only the
+    slices that are used are read from disk.
+
+    Example::
+
+        store = ColumnStore("drive")
+        acc = store.select("ACCELEROMETER", startTime, startTime + 60e6)
+        plot(acc['utime'], acc['ax'])
+
+    :param directory: the directory of the exported columns
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            self._index = json.load(f)
+        self._columns = {}
+
+    @property
+    def channels(self):
+        """ The exported channels. """
+        return sorted(self._index.keys())
+
+    def info(self, channel):
+        """ Get the index of a channel.
+
+        :param channel: the channel string
+        :returns: a dictionary with the LCM 'type' name, the number of 'rows', the 'columns' and
+                  the earliest and latest receive times 'firstTime' and 'lastTime'
+        """
+        return self._index[channel]
+
+    def columns(self, channel):
+        """ Get all columns of a channel.
+
+        :param channel: the channel string
+        :returns: a dictionary of memory mapped arrays by field name
+        """
+        if channel not in self._columns:
+            info = self._index[channel]
+            path = os.path.join(self._directory, info['directory'])
+            self._columns[channel] = dict((column, load(os.path.join(path, column + '.npy'), mmap_mode='r'))
+                                          for column in info['columns'])
+        return self._columns[channel]
+
+    def select(self, channel, startTime=None, endTime=None):
+        """ Get the rows of a channel received in a time range. The receive times, which
+        exportColumns() sorts, are searched with a binary search, so only the selected rows are
+        read.
+
+        :param channel: the channel string
+        :param startTime: default None, the first receive time in microseconds
+        :param endTime: default None, the last receive time in microseconds
+        :returns: a dictionary of memory mapped array slices by field name
+        """
+        columns = self.columns(channel)
+        utime = columns['utime']
+        start = 0 if startTime is None else utime.searchsorted(startTime, 'left')
+        end = len(utime) if endTime is None else utime.searchsorted(endTime, 'right')
+        return dict((name, column[start:end]) for (name, column) in columns.items())
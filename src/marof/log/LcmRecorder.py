@@ -0,0 +1,68 @@
+from collections import deque
+
+from marof import MarofModule, EpochClock
+from marof.log import LogWriter
+
+class LcmRecorder(MarofModule):
+    """ Records the messages of the subscribed channels to a log file. The subscribers only queue
+    the messages with their receive time, and the module writes them to the file every update,
+    so recording does not slow down the handling of messages. Messages are not recorded while the
+    module is paused.
+
+    The receive times are taken from the monotonic clock, offset to the epoch once when the
+    recorder is created, so they never decrease even if the system time is changed while
+    recording.
+
+    Example::
+
+        recorder = LcmRecorder("RECORDER", "drive.log")
+        handler = MarofModuleHandler(recorder)
+        handler.subscribe(".*", recorder.handleMessage) # all channels
+        handler.startModule()
+        handler.start()
+        recorder.close()
+
+    :param name: the name of the module
+    :param filename: the name of the log file, which is overwritten
+    :param updateInterval: default 0.1, the interval to write the queued messages in seconds
+    :param indexInterval: default 1, the time in seconds covered by each index block of the log
+    """
+
+    def __init__(self, name, filename, updateInterval=0.1, indexInterval=1.0):
+        super(LcmRecorder, self).__init__(name, updateInterval)
+        self._writer = LogWriter(filename, indexInterval)
+        self._queue = deque()
+        self._clock = EpochClock(resyncInterval=float('inf')) # never re-synced
+
+    def handleMessage(self, channel, data):
+        """ Queue a message to be recorded. Subscribe this method to the channels to record.
+
+        :param channel: the channel string
+        :param data: the encoded message or message object
+        """
+        if self._isPaused:
+            return
+        if not isinstance(data, str):
+            data = data.encode()
+        self._queue.append((self._clock.getMicroSeconds(), channel, data))
+
+    def step(self):
+        queue = self._queue
+        write = self._writer.write
+        while queue:
+            (utime, channel, data) = queue.popleft()
+            write(utime, channel, data)
+        self._writer.flush()
+
+    def publishUpdate(self):
+        pass
+
+    def close(self):
+        """ Write the queued messages and close the log. Call when the module is stopped. """
+        self.step()
+        self._writer.close()
+
+    @property
+    def recorded(self):
+        """ The number of messages written to the log. """
+        return self._writer.events
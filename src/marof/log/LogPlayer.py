@@ -0,0 +1,98 @@
+import threading
+import time
+
+from marof import EncodedMessage, getMonotonicSeconds
+from marof.log import LogReader
+
+class LogPlayer(object):
+    """ Replays the messages of a log through a Transport, for example an LcmTransport to replay
+    to other processes or an InProcTransport to feed the subscribers of modules directly. The
+    messages are published as EncodedMessage objects, so subscribers decode them with
+    marof.decodeMessage() as usual.
+
+    Example::
+
+        transport = InProcTransport()
+        transport.subscribe("CURRENT_STATE", pid.currentHandler)
+        LogPlayer("drive.log", transport, speed=0).run() # as fast as possible
+
+    :param log: the LogReader or the name of the log file
+    :param transport: the Transport to publish the messages through
+    :param speed: default 1, the replay speed relative to real time. If 0, the messages are
+                  published as fast as possible.
+    """
+
+    def __init__(self, log, transport, speed=1.0):
+        if not isinstance(log, LogReader):
+            log = LogReader(log)
+        self._reader = log
+        self._transport = transport
+        self.speed = speed
+        self._stopRequested = False
+        self._isRunning = False
+        self._published = 0
+
+    def run(self, startTime=None, endTime=None, channels=None):
+        """ Replay the messages on the current thread. This method blocks until the messages are
+        replayed or stop() is called.
+
+        :param startTime: default None, the receive time in microseconds to start at
+        :param endTime: default None, the receive time in microseconds to stop at
+        :param channels: default None, a regular expression of the channels to replay
+        :returns: the number of messages published
+        """
+        self._isRunning = True
+        self._stopRequested = False
+        published = 0
+        publish = self._transport.publish
+        (logStart, clockStart, anchorSpeed) = (None, 0.0, None)
+        for (utime, channel, data) in self._reader.events(startTime, endTime, channels):
+            if self._stopRequested:
+                break
+            speed = self.speed
+            if speed > 0:
+                if logStart is None or speed != anchorSpeed:
+                    # Start the schedule at this message, also when the speed was changed
+                    (logStart, clockStart, anchorSpeed) = (utime, getMonotonicSeconds(), speed)
+                delay = clockStart + (utime - logStart)*1e-6/speed - getMonotonicSeconds()
+                if delay > 0:
+                    time.sleep(delay)
+            publish(channel, EncodedMessage(data))
+            published += 1
+            self._published += 1
+        self._isRunning = False
+        return published
+
+    def start(self, startTime=None, endTime=None, channels=None):
+        """ Replay the messages on a new daemon thread.
+
+        :returns: the thread
+        """
+        thread = threading.Thread(target=self.run, args=(startTime, endTime, channels))
+        thread.setDaemon(True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        """ Stop replaying. Can be called from any thread. """
+        self._stopRequested = True
+
+    @property
+    def speed(self):
+        """ The replay speed relative to real time, 0 for as fast as possible. A change applies
+        from the next message. """
+        return self._speed
+
+    @speed.setter
+    def speed(self, speed):
+        assert speed >= 0, 'Speed is negative'
+        self._speed = speed
+
+    @property
+    def published(self):
+        """ The number of messages published since the player was created. """
+        return self._published
+
+    @property
+    def isRunning(self):
+        return self._isRunning
@@ -0,0 +1,152 @@
+import re
+
+from marof.log.logFormat import HEADER, MAGIC, VERSION, EVENT_HEADER, EVENT, INDEX_BLOCK, INDEX
+from marof.log.logFormat import END_BLOCK, END
+
+class LogReader(object):
+    """ Reads the LCM messages of a log file written by LogWriter. The index blocks are used to
+    start reading at a time. A log that was not closed, for example after a crash, can be read up
+    to its last complete message.
+
+    :param filename: the name of the log file
+    """
+
+    def __init__(self, filename):
+        self._filename = filename
+        with open(filename, 'rb') as f:
+            header = f.read(HEADER.size)
+        assert len(header) == HEADER.size, 'The file is not a MARoF log'
+        (magic, version) = HEADER.unpack(header)
+        assert magic == MAGIC, 'The file is not a MARoF log'
+        assert version == VERSION, 'The log version %d is not supported' % version
+        self._index = None
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def index(self):
+        """ The index blocks as a list of tuples (earliest utime, latest utime, offset, count) in
+        the order of the log. """
+        if self._index is None:
+            self._index = self._readIndex()
+        return self._index
+
+    def __iter__(self):
+        return self.events()
+
+    def events(self, startTime=None, endTime=None, channels=None):
+        """ Iterate over the messages of the log in the order they were written. With a time
+        range only the index blocks with messages in the range are read, and the times of the
+        messages do not need to be in order.
+
+        :param startTime: default None, skip the messages received before this time in
+                          microseconds
+        :param endTime: default None, skip the messages received after this time in
+                        microseconds
+        :param channels: default None, a regular expression that the whole channel name must
+                         match, like an LCM subscription. If None, all channels are read.
+        :returns: an iterator of tuples (utime, channel, data)
+        """
+        match = None if channels is None else re.compile("(?:%s)\\Z" % channels).match
+        if startTime is None and endTime is None:
+            blocks = [(HEADER.size, None)] # the whole log
+        else:
+            blocks = [(offset, count) for (minTime, maxTime, offset, count) in self.index
+                      if ((startTime is None or maxTime >= startTime) and
+                          (endTime is None or minTime <= endTime))]
+        with open(self._filename, 'rb') as f:
+            for (offset, count) in blocks:
+                f.seek(offset)
+                for event in self._readEvents(f, count, startTime, endTime, match):
+                    yield event
+
+    def _readEvents(self, f, count, startTime, endTime, match):
+        """ Read count messages from the current position of the file, or all if count is None,
+        and iterate over the ones in the time range and channels. """
+        headerSize = EVENT_HEADER.size
+        unpackHeader = EVENT_HEADER.unpack
+        read = f.read
+        while count is None or count > 0:
+            header = read(headerSize)
+            if len(header) == 0:
+                return
+            recordType = ord(header[0])
+            if recordType == INDEX:
+                f.seek(INDEX_BLOCK.size - len(header), 1)
+                continue
+            if recordType == END or len(header) < headerSize:
+                return
+            assert recordType == EVENT, 'The log is corrupt at offset %d' % (f.tell() - len(header))
+            if count is not None:
+                count -= 1
+            (_, utime, channelLength, dataLength) = unpackHeader(header)
+            channel = read(channelLength)
+            if ((startTime is not None and utime < startTime) or
+                (endTime is not None and utime > endTime) or
+                (match is not None and not match(channel))):
+                f.seek(dataLength, 1)
+                continue
+            data = read(dataLength)
+            if len(data) < dataLength:
+                return # the last message was not completely written
+            yield (utime, channel, data)
+
+    def _readIndex(self):
+        """ Read the index blocks from the end of a closed log, or by scanning the log. """
+        with open(self._filename, 'rb') as f:
+            f.seek(0, 2)
+            size = f.tell()
+            if size >= HEADER.size + END_BLOCK.size:
+                f.seek(size - END_BLOCK.size)
+                (recordType, lastIndex) = END_BLOCK.unpack(f.read(END_BLOCK.size))
+                if recordType == END:
+                    return self._followIndex(f, lastIndex)
+            return self._scanIndex(f)
+
+    def _followIndex(self, f, offset):
+        """ Follow the chain of index blocks back from the last one. """
+        index = []
+        while offset >= 0:
+            f.seek(offset)
+            (_, previous, count, minTime, maxTime, blockOffset) = \
+                INDEX_BLOCK.unpack(f.read(INDEX_BLOCK.size))
+            index.append((minTime, maxTime, blockOffset, count))
+            offset = previous
+        index.reverse()
+        return index
+
+    def _scanIndex(self, f):
+        """ Read the headers of all records of a log that was not closed. The messages after the
+        last index block form one more block. """
+        index = []
+        f.seek(HEADER.size)
+        (count, minTime, maxTime, blockOffset) = (0, 0, 0, 0)
+        while True:
+            offset = f.tell()
+            header = f.read(EVENT_HEADER.size)
+            if len(header) == 0:
+                break
+            recordType = ord(header[0])
+            if recordType == INDEX:
+                if len(header) < INDEX_BLOCK.size:
+                    header += f.read(INDEX_BLOCK.size - len(header))
+                if len(header) < INDEX_BLOCK.size:
+                    break
+                (_, _, c, first, last, o) = INDEX_BLOCK.unpack(header)
+                index.append((first, last, o, c))
+                count = 0
+                continue
+            if recordType != EVENT or len(header) < EVENT_HEADER.size:
+                break
+            (_, utime, channelLength, dataLength) = EVENT_HEADER.unpack(header)
+            if count == 0:
+                (minTime, maxTime, blockOffset) = (utime, utime, offset)
+            else:
+                (minTime, maxTime) = (min(minTime, utime), max(maxTime, utime))
+            count += 1
+            f.seek(channelLength + dataLength, 1)
+        if count > 0:
+            index.append((minTime, maxTime, blockOffset, count))
+        return index
@@ -0,0 +1,76 @@
+from marof.log.logFormat import HEADER, MAGIC, VERSION, EVENT_HEADER, EVENT, INDEX_BLOCK, INDEX
+from marof.log.logFormat import END_BLOCK, END
+
+class LogWriter(object):
+    """ Writes LCM messages to an append-only log file. After every indexInterval seconds of
+    messages an index block with the time range and offset of those messages is written, so a
+    LogReader can seek to a time without reading the whole log. The index blocks hold the earliest
+    and latest time of their messages, so the times may decrease, for example after the system
+    time is set back, and the LogReader still finds every message in a time range.
+
+    :param filename: the name of the log file, which is overwritten
+    :param indexInterval: default 1, the time in seconds covered by each index block
+    """
+
+    def __init__(self, filename, indexInterval=1.0):
+        assert indexInterval > 0, 'Index interval is negative or 0'
+        self._file = open(filename, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION))
+        self._offset = HEADER.size
+        self._indexInterval = int(indexInterval*1e6)
+        self._lastIndex = -1
+        self._blockCount = 0
+        self._blockFirstTime = 0
+        self._blockMinTime = 0
+        self._blockMaxTime = 0
+        self._blockOffset = 0
+        self._events = 0
+
+    def write(self, utime, channel, data):
+        """ Append a message to the log.
+
+        :param utime: the time the message was received in microseconds
+        :param channel: the channel string
+        :param data: the encoded message
+        """
+        if self._blockCount > 0 and utime - self._blockFirstTime >= self._indexInterval:
+            self._writeIndex()
+        if self._blockCount == 0:
+            (self._blockFirstTime, self._blockMinTime, self._blockMaxTime) = (utime, utime, utime)
+            self._blockOffset = self._offset
+        elif utime < self._blockMinTime:
+            self._blockMinTime = utime
+        elif utime > self._blockMaxTime:
+            self._blockMaxTime = utime
+        self._file.write(EVENT_HEADER.pack(EVENT, utime, len(channel), len(data)))
+        self._file.write(channel)
+        self._file.write(data)
+        self._offset += EVENT_HEADER.size + len(channel) + len(data)
+        self._blockCount += 1
+        self._events += 1
+
+    def flush(self):
+        """ Write the buffered messages to the file. """
+        self._file.flush()
+
+    def close(self):
+        """ Write the last index block and close the file. """
+        if self._file.closed:
+            return
+        if self._blockCount > 0:
+            self._writeIndex()
+        self._file.write(END_BLOCK.pack(END, self._lastIndex))
+        self._file.close()
+
+    @property
+    def events(self):
+        """ The number of messages written. """
+        return self._events
+
+    def _writeIndex(self):
+        self._file.write(INDEX_BLOCK.pack(INDEX, self._lastIndex, self._blockCount,
+                                          self._blockMinTime, self._blockMaxTime,
+                                          self._blockOffset))
+        self._lastIndex = self._offset
+        self._offset += INDEX_BLOCK.size
+        self._blockCount = 0
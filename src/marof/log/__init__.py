@@ -0,0 +1,6 @@
+from LogWriter import LogWriter
+from LogReader import LogReader
+from LogPlayer import LogPlayer
+from LcmRecorder import LcmRecorder
+from ColumnStore import ColumnStore
+from exportColumns import exportColumns, lcmTypesByFingerprint
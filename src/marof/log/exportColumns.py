@@ -0,0 +1,129 @@
+"""
+Converts a log into columnar NumPy files for offline analysis.
+"""
+import json
+import os
+import re
+import sys
+
+from numpy import diff, dtype
+from numpy.lib.format import open_memmap
+
+from marof.log import LogReader
+
+INDEX_FILE = "index.json"
+
+_COLUMN_TYPES = ((bool, dtype('bool')),
+                 (int, dtype('<i8')),
+                 (long, dtype('<i8')),
+                 (float, dtype('<f8')))
+
+def lcmTypesByFingerprint(module=None):
+    """ Find the LCM types of a module by the fingerprint that starts their encoded messages.
+
+    :param module: default None, the module of LCM types. If None, marof_lcm is used.
+    :returns: a dictionary of LCM type classes by fingerprint
+    """
+    if module is None:
+        import marof_lcm as module
+    types = {}
+    for name in dir(module):
+        lcmType = getattr(module, name)
+        if hasattr(lcmType, '_get_packed_fingerprint'):
+            types[lcmType._get_packed_fingerprint()] = lcmType
+    return types
+
+def channelDirectory(channel):
+    """ The name of the directory of a channel, with characters that are not safe in file names
+    replaced by '_'. """
+    return re.sub(r'[^A-Za-z0-9_.\-]', '_', channel)
+
+def exportColumns(log, directory, types=None, channels=None):
+    """ Convert the messages of a log into one .npy file per channel and field, so each column
+    can be loaded with numpy.load(..., mmap_mode='r') without decoding the messages again. Every
+    channel gets the column 'utime' with the receive times of the log and a column for each
+    number or boolean field of its LCM type, in the order of the lcm-defs struct. Fields that are
+    strings or arrays are not exported. The rows are sorted by receive time, keeping the order of
+    the log for equal times, so ColumnStore can search them even if the times of the log go
+    backwards. An index file describes the exported channels, see ColumnStore.
+
+    :param log: the LogReader or the name of the log file
+    :param directory: the directory to write the files to, created if needed
+    :param types: default None, a dictionary of LCM type classes by channel. If None, the types
+                  are found from the fingerprints of the messages with lcmTypesByFingerprint().
+    :param channels: default None, a regular expression of the channels to export
+    :returns: the dictionary of the index
+    """
+    if not isinstance(log, LogReader):
+        log = LogReader(log)
+    fingerprints = lcmTypesByFingerprint() if types is None else None
+
+    # First pass: count the messages of each channel and find its type
+    counts = {}
+    channelTypes = {}
+    for (_, channel, data) in log.events(channels=channels):
+        if channel not in channelTypes:
+            lcmType = types.get(channel) if types is not None else fingerprints.get(data[0:8])
+            channelTypes[channel] = lcmType
+        if channelTypes[channel] is not None:
+            counts[channel] = counts.get(channel, 0) + 1
+
+    # Second pass: decode the messages into memory mapped columns
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    index = {}
+    files = {} # channel: (rows written, [(field, column)])
+    for (utime, channel, data) in log.events(channels=channels):
+        lcmType = channelTypes.get(channel)
+        if lcmType is None:
+            continue
+        msg = lcmType.decode(data)
+        if channel not in files:
+            files[channel] = (0, _openColumns(directory, channel, lcmType, msg, counts[channel]))
+            index[channel] = {'type': lcmType.__name__,
+                              'directory': channelDirectory(channel),
+                              'rows': counts[channel],
+                              'columns': [field for (field, _) in files[channel][1]]}
+        (row, columns) = files[channel]
+        columns[0][1][row] = utime
+        for (field, column) in columns[1:]:
+            column[row] = getattr(msg, field)
+        files[channel] = (row + 1, columns)
+
+    for (channel, (_, columns)) in files.items():
+        utime = columns[0][1]
+        if (diff(utime) < 0).any():
+            order = utime.argsort(kind='mergesort') # stable
+            for (_, column) in columns:
+                column[:] = column[order]
+        index[channel]['firstTime'] = int(utime[0])
+        index[channel]['lastTime'] = int(utime[-1])
+        for (_, column) in columns:
+            column.flush()
+    with open(os.path.join(directory, INDEX_FILE), 'w') as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    return index
+
+def _openColumns(directory, channel, lcmType, msg, rows):
+    """ Create the column files of a channel from the fields of its first message. """
+    channelPath = os.path.join(directory, channelDirectory(channel))
+    if not os.path.isdir(channelPath):
+        os.makedirs(channelPath)
+    columns = [('utime', open_memmap(os.path.join(channelPath, 'utime.npy'), 'w+', dtype('<i8'), (rows,)))]
+    for field in lcmType.__slots__:
+        value = getattr(msg, field)
+        for (pythonType, columnType) in _COLUMN_TYPES:
+            if type(value) is pythonType:
+                path = os.path.join(channelPath, field + '.npy')
+                columns.append((field, open_memmap(path, 'w+', columnType, (rows,))))
+                break
+    return columns
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print "Usage: exportColumns.py LOG_FILE DIRECTORY [CHANNEL_REGEX]"
+        sys.exit(1)
+    channels = sys.argv[3] if len(sys.argv) > 3 else None
+    index = exportColumns(sys.argv[1], sys.argv[2], channels=channels)
+    for channel in sorted(index):
+        print channel, index[channel]['type'], index[channel]['rows'], "rows"
@@ -0,0 +1,29 @@
+"""
+The layout of the MARoF log files written by LogWriter and read by LogReader.
+
+A log starts with the magic string and the format version, followed by records. Every record
+starts with a one byte type:
+
+- EVENT: the receive time in microseconds, the channel length, the data length, the channel and
+  the encoded message
+- INDEX: the offset of the previous index block or -1, the number of events in the block, the
+  earliest and latest time of its events and the offset of the first event of the block. The
+  times of the events are usually in order, but are not required to be.
+- END: the offset of the last index block, written when the log is closed
+
+All numbers are little endian.
+"""
+import struct
+
+MAGIC = "MAROFLOG"
+VERSION = 1
+HEADER = struct.Struct("<8sH")
+
+EVENT = 1
+INDEX = 2
+END = 3
+
+EVENT_HEADER = struct.Struct("<BqHI")  # type, utime, channel length, data length
+INDEX_BLOCK = struct.Struct("<BqIqqq") # type, previous index, count, min utime, max utime,
+                                       # first offset
+END_BLOCK = struct.Struct("<Bq")       # type, last index
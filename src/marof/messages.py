@@ -0,0 +1,123 @@
+"""
+Contains functions for working with LCM messages.
+"""
+from operator import attrgetter
+from struct import Struct
+
+# struct format characters of the LCM types with a fixed size
+FORMATS = {'int8_t': 'b', 'int16_t': 'h', 'int32_t': 'i', 'int64_t': 'q', 'byte': 'B',
+           'float': 'f', 'double': 'd', 'boolean': '?'}
+
+def decodeMessage(lcmType, data):
+    """ Decode the data received by a subscriber. Messages delivered within the process by a
+    MarofHost are already decoded and are returned as they are.
+    
+    :param lcmType: the LCM type class, for example orientation_t
+    :param data: the encoded message or a message object of the LCM type
+    :returns: the message object
+    """
+    if isinstance(data, lcmType):
+        return data
+    return lcmType.decode(data)
+
+def isFixedSize(lcmType):
+    """ Check if every message of an LCM type has the same size, that is all its fields are
+    primitive types and none are arrays or strings.
+    
+    :param lcmType: the LCM type class generated by lcm-gen 1.4 or later
+    :returns: True if the type is fixed size
+    """
+    typenames = getattr(lcmType, '__typenames__', None)
+    dimensions = getattr(lcmType, '__dimensions__', None)
+    if typenames is None or dimensions is None:
+        return False # generated by an lcm-gen without field information
+    return all(t in FORMATS for t in typenames) and all(d is None for d in dimensions)
+
+def messageFormat(typenames):
+    """ Get the struct format of the encoded messages of a fixed size LCM type, the 8 byte
+    fingerprint followed by the fields in network byte order.
+    
+    :param typenames: the list of the LCM type names of the fields, for example ['double']
+    :returns: the format string for struct.Struct
+    """
+    return '>8s' + ''.join(FORMATS[t] for t in typenames)
+
+class MessageEncoder(object):
+    """ Encodes messages of a fixed size LCM type with one precompiled struct.Struct of the
+    fingerprint and the fields, instead of the field by field encoding of lcm-gen. The encoded
+    messages are the same strings as the ones of the encode() method of the type, so they can be
+    published through LCM.
+    
+    :param lcmType: the fixed size LCM type class, see isFixedSize()
+    """
+    
+    def __init__(self, lcmType):
+        assert isFixedSize(lcmType), 'The LCM type is not fixed size'
+        fields = lcmType.__slots__
+        self._struct = Struct(messageFormat(lcmType.__typenames__))
+        if len(fields) == 1:
+            name = fields[0]
+            self._values = lambda msg: (getattr(msg, name),)
+        else:
+            self._values = attrgetter(*fields)
+        self._fingerprint = lcmType._get_packed_fingerprint()
+    
+    def encode(self, msg):
+        """ Encode a message.
+        
+        :param msg: the message object
+        :returns: the encoded message string
+        """
+        return self._struct.pack(self._fingerprint, *self._values(msg))
+    
+    @property
+    def struct(self):
+        """ The struct.Struct of the fingerprint and the fields. """
+        return self._struct
+    
+    @property
+    def fingerprint(self):
+        """ The 8 byte fingerprint that starts the encoded messages. """
+        return self._fingerprint
+    
+    @property
+    def values(self):
+        """ The function that gets the tuple of the field values of a message. """
+        return self._values
+    
+    @property
+    def size(self):
+        """ The size of the encoded messages in bytes. """
+        return self._struct.size
+
+_reusableTypes = {} # the subclasses of the LCM types that encode with a MessageEncoder, by type
+
+def reusableMessage(lcmType):
+    """ Create a message object to be filled and published again and again, for example every
+    update of a module. If the type is fixed size, the encode() method of the message packs it
+    with the struct of a MessageEncoder in one call, so publishing the message through LCM
+    allocates only the encoded string.
+    
+    :param lcmType: the LCM type class
+    :returns: the message object, an instance of the LCM type
+    """
+    if not isFixedSize(lcmType):
+        return lcmType()
+    reusableType = _reusableTypes.get(lcmType)
+    if reusableType is None:
+        encoder = MessageEncoder(lcmType)
+        # The encode() method packs the fields itself, one call less than encoder.encode()
+        (pack, fingerprint, values) = (encoder.struct.pack, encoder.fingerprint, encoder.values)
+        def encode(self):
+            return pack(fingerprint, *values(self))
+        reusableType = type(lcmType.__name__, (lcmType,), {'__slots__': (), 'encode': encode})
+        _reusableTypes[lcmType] = reusableType
+    return reusableType()
+
+class EncodedMessage(str):
+    """ An encoded LCM message that can be published through a Transport like a message object,
+    for example when replaying a log. Subscribers decode it with decodeMessage() as usual.
+    """
+    
+    def encode(self):
+        return str(self)
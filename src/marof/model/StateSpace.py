@@ -90,4 +90,4 @@ def stepSS(self, ss, x, u):
         y = ss.C * x1 + ss.D * u
         return (x1, y)
     else:
-        raise "Cannot step a continuous state space model"
+        raise ValueError("Cannot step a continuous state space model")
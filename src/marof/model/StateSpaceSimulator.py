@@ -0,0 +1,102 @@
+from numpy import asarray, empty, zeros, dot
+from marof.model import StateSpace
+
+class StateSpaceSimulator(object):
+    r""" Simulates a discrete state space model
+
+    ..  math::
+        \bm{x}[k+1] &= \bm{A}\bm{x}[k] + \bm{B}\bm{u}[k] \\
+        \bm{y}[k] &= \bm{C}\bm{x}[k] + \bm{D}\bm{u}[k]
+
+    The matrices are copied into plain arrays and the state, input and output are held in
+    buffers allocated once, so step() does not allocate any arrays. simulate() runs a whole input
+    sequence in one call. Changes to the model after the simulator is created are not seen by the
+    simulator.
+
+    :param ss: the discrete StateSpace model
+    :param x0: default None, the initial state. If None, the state starts at zero.
+    """
+
+    def __init__(self, ss, x0=None):
+        assert isinstance(ss, StateSpace), "The model must be a StateSpace"
+        assert ss.discrete, "Cannot simulate a continuous state space model"
+        self._A = asarray(ss.A, dtype=float).copy()
+        self._B = asarray(ss.B, dtype=float).copy()
+        self._C = asarray(ss.C, dtype=float).copy()
+        self._D = asarray(ss.D, dtype=float).copy()
+        (n, m) = self._B.shape
+        p = self._C.shape[0]
+        assert self._A.shape == (n, n), "A must be n x n"
+        assert self._C.shape[1] == n, "C must have n columns"
+        assert self._D.shape == (p, m), "D must be p x m"
+        self._Ts = ss.Ts
+        self._x = zeros(n)
+        self._xNext = zeros(n)
+        self._u = zeros(m)
+        self._y = zeros(p)
+        self._Bu = zeros(n)
+        self._Du = zeros(p)
+        self.reset(x0)
+
+    def reset(self, x0=None):
+        """ Set the state.
+
+        :param x0: default None, the new state. If None, the state is set to zero.
+        """
+        if x0 is None:
+            self._x[:] = 0
+        else:
+            self._x[:] = asarray(x0, dtype=float).ravel()
+
+    def step(self, u):
+        """ Compute the output for the input u and step the model to the next state. Assumes
+        this method is called every Ts seconds if it is run in real time.
+
+        :param u: the input, a number for a single input model or a sequence of m inputs
+        :returns: the output y[k]. The array is overwritten by the next step, so copy it to keep
+                  it.
+        """
+        self._u[:] = u
+        dot(self._C, self._x, out=self._y)
+        dot(self._D, self._u, out=self._Du)
+        self._y += self._Du
+        dot(self._A, self._x, out=self._xNext)
+        dot(self._B, self._u, out=self._Bu)
+        self._xNext += self._Bu
+        (self._x, self._xNext) = (self._xNext, self._x)
+        return self._y
+
+    def simulate(self, u):
+        """ Run a sequence of inputs through the model, starting from the current state. The
+        state is left after the last input, so calls can be chained.
+
+        :param u: an N x m array of inputs, or a sequence of N numbers for a single input model
+        :returns: (y, x), the N x p array of outputs and the N x n array of states x[k] at which
+                  each input was applied
+        """
+        u = asarray(u, dtype=float)
+        if u.ndim == 1:
+            u = u.reshape(len(u), 1)
+        assert u.shape[1] == self._B.shape[1], "The input must have m columns"
+        N = u.shape[0]
+        x = empty((N + 1, self._x.shape[0]))
+        x[0] = self._x
+        Bu = dot(u, self._B.T) # the input contribution of every step at once
+        A = self._A
+        for k in xrange(N):
+            xk = x[k + 1]
+            dot(A, x[k], out=xk)
+            xk += Bu[k]
+        self._x[:] = x[N]
+        x = x[0:N]
+        y = dot(x, self._C.T) + dot(u, self._D.T)
+        return (y, x)
+
+    @property
+    def state(self):
+        """ The current state x[k]. """
+        return self._x.copy()
+
+    @property
+    def Ts(self):
+        return self._Ts
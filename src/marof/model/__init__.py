@@ -1,4 +1,5 @@
 from StateSpace import StateSpace
 from TransferFunction import TransferFunction
-from zohe import zohe
+from zohe import zohe, zoheBatch, zoheCacheInfo, clearZoheCache
 from tf2ss import tf2ss
+from StateSpaceSimulator import StateSpaceSimulator
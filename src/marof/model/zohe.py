@@ -1,27 +1,149 @@
+import hashlib
+import threading
+from collections import OrderedDict
 
-from numpy import bmat, mat, zeros
+from numpy import asarray, bmat, dot, exp, mat, zeros
+from numpy.linalg import cond, eig, inv
 from scipy.linalg.matfuncs import expm
 
+from marof.model import StateSpace
+
+class _LruCache(object):
+    """ A thread safe dictionary that forgets the least recently used entries when it is full. """
+
+    def __init__(self, maxSize):
+        assert maxSize >= 0, 'Max size is negative'
+        self._maxSize = maxSize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries[key] = value # move to the most recently used end
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            while len(self._entries) > self._maxSize:
+                self._entries.popitem(last=False)
+
+    def clear(self, maxSize=None):
+        with self._lock:
+            if maxSize is not None:
+                assert maxSize >= 0, 'Max size is negative'
+                self._maxSize = maxSize
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return (self.hits, self.misses, len(self._entries), self._maxSize)
+
+_cache = _LruCache(64)
+
+def _key(A, B, T):
+    """ A hash of the content of A, B and T. """
+    digest = hashlib.sha1()
+    for M in (A, B):
+        digest.update(repr(M.shape))
+        digest.update(M.tostring())
+    digest.update(repr(float(T)))
+    return digest.digest()
+
+def _augmented(A, B):
+    """ Form the square matrix:  H = [ A  B ]
+                                     [ 0  0 ]
+    """
+    zr = A.shape[1] + B.shape[1] - A.shape[0]
+    return asarray(bmat([[           A,                      B            ],
+                         [ zeros((zr,A.shape[1])), zeros((zr,B.shape[1])) ]]))
+
+def _split(expH, A, B):
+    """ Extract phi and gamma (discrete forms of A and B) as new matrices. """
+    phi = mat(expH[0:A.shape[0], 0:A.shape[1]]).copy()
+    gamma = mat(expH[0:B.shape[0], A.shape[1]:expH.shape[1]]).copy()
+    return (phi, gamma)
+
 def zohe(A, B, T):
     """ Calculate the zero order hold equivalent of the continuous matrices A and
-    B using a time step of T.
-    
-    :param A: continuous A matrix 
+    B using a time step of T. The results are cached by the content of A, B and T,
+    so discretizing the same model again does not compute the matrix exponential.
+
+    :param A: continuous A matrix
     :param B: continuous B matrix
     :param T: time step
     :returns: a tuple of discrete matrices (phi, gamma).
     """
-    # Form the square matrix:  H = [ A  B ] * T
-    #                              [ 0  0 ]
-    zr = A.shape[1] + B.shape[1] - A.shape[0]
-    H = bmat([[           A,                      B            ],
-              [ zeros((zr,A.shape[1])), zeros((zr,B.shape[1])) ]]) * T
-    # Calculate matrix exponential
-    exp = expm(H)
-    
-    # Extract phi and gamma (discrete forms of A and B)
-    phi = mat(exp[0:A.shape[0], 0:A.shape[1]])
-    gamma = mat(exp[0:B.shape[0], A.shape[1]:exp.shape[1]])
-    return (phi, gamma)
+    A = asarray(A, dtype=float)
+    B = asarray(B, dtype=float)
+    key = _key(A, B, T)
+    expH = _cache.get(key)
+    if expH is None:
+        # Calculate matrix exponential of H * T
+        expH = expm(_augmented(A, B) * T)
+        _cache.put(key, expH)
+    return _split(expH, A, B)
+
+def zoheBatch(ss, Ts, maxCondition=1e6):
+    """ Calculate the zero order hold equivalents of a continuous state space model at
+    several time steps. The matrix exponentials of all time steps are computed from one
+    eigendecomposition of the augmented matrix when it is well conditioned, otherwise
+    each time step is computed like zohe(). The results share the cache of zohe().
+
+    :param ss: the continuous StateSpace model
+    :param Ts: a sequence of time steps
+    :param maxCondition: default 1e6, the largest condition number of the eigenvectors for
+                         which the eigendecomposition is used
+    :returns: a list of discrete StateSpace models, one for each time step
+    """
+    assert not ss.discrete, 'The state space model is already discrete'
+    A = asarray(ss.A, dtype=float)
+    B = asarray(ss.B, dtype=float)
+    H = _augmented(A, B)
+    keys = [_key(A, B, T) for T in Ts]
+    exps = [_cache.get(key) for key in keys]
 
+    missing = [i for (i, e) in enumerate(exps) if e is None]
+    if len(missing) > 0:
+        (w, V) = eig(H)
+        if cond(V) <= maxCondition:
+            Vinv = inv(V)
+            for i in missing:
+                # expm(H*T) = V * diag(exp(w*T)) * V^-1
+                exps[i] = dot(V * exp(w * Ts[i]), Vinv).real
+        else:
+            for i in missing:
+                exps[i] = expm(H * Ts[i])
+        for i in missing:
+            _cache.put(keys[i], exps[i])
 
+    models = []
+    for (T, expH) in zip(Ts, exps):
+        (phi, gamma) = _split(expH, A, B)
+        models.append(StateSpace(phi, gamma, ss.C.copy(), ss.D.copy(), T))
+    return models
+
+def zoheCacheInfo():
+    """ Get the statistics of the zohe() cache.
+
+    :returns: a tuple (hits, misses, size, maxSize)
+    """
+    return _cache.info()
+
+def clearZoheCache(maxSize=None):
+    """ Empty the zohe() cache and reset its statistics.
+
+    :param maxSize: default None, the new maximum number of cached results. If None, the
+                    maximum is not changed.
+    """
+    _cache.clear(maxSize)
@@ -1,5 +1,5 @@
 from math import fabs
-from marof import MarofModule
+from marof import MarofModule, decodeMessage
 from marof_lcm import motorCommand_t
 
 import Adafruit_BBIO.PWM as PWM
@@ -50,7 +50,7 @@ class DaguRover(MarofModule):
         PWM.set_duty_cycle(self._pwmLeft, fabs(leftPercent))
         
     def handleMotorCommand(self, channel, msg):
-        motorCommand = motorCommand_t.decode(msg)
+        motorCommand = decodeMessage(motorCommand_t, msg)
         self.sendCommand(motorCommand.speedPercent, motorCommand.turnPercent)
         
     def limitPercent(self, percent):
@@ -0,0 +1,58 @@
+from numpy import array, asarray, dot, eye
+
+class AffineCalibration(object):
+    r""" An affine calibration of a 3-axis sensor given by a 4x4 calibration matrix :math:`M`
+    that is applied to the raw reading as a row vector.
+
+    ..  math::
+        \begin{bmatrix} x_c & y_c & z_c & \cdot \end{bmatrix} =
+        \begin{bmatrix} x & y & z & 1 \end{bmatrix} M
+
+    The matrix is split once into a 3x3 matrix and an offset, so a single sample is calibrated
+    with plain float arithmetic and a block of samples with one matrix product.
+
+    :param matrix: default None, the 4x4 or 4x3 calibration matrix, for example from the least
+                   squares fit of MiniImu9v2.calibrateAccelerometer(). If None, the identity is
+                   used.
+    """
+
+    def __init__(self, matrix=None):
+        self.matrix = matrix
+
+    @property
+    def matrix(self):
+        """ The calibration matrix. """
+        return self._matrix
+
+    @matrix.setter
+    def matrix(self, matrix):
+        if matrix is None:
+            matrix = eye(4)
+        matrix = array(matrix, dtype=float)
+        assert matrix.shape in ((4, 4), (4, 3)), "The calibration matrix must be 4x4 or 4x3."
+        self._matrix = matrix
+        self._rotation = matrix[0:3, 0:3].copy()
+        self._offset = matrix[3, 0:3].copy()
+        (self._r00, self._r01, self._r02) = [float(v) for v in matrix[0, 0:3]]
+        (self._r10, self._r11, self._r12) = [float(v) for v in matrix[1, 0:3]]
+        (self._r20, self._r21, self._r22) = [float(v) for v in matrix[2, 0:3]]
+        (self._o0, self._o1, self._o2) = [float(v) for v in matrix[3, 0:3]]
+
+    def apply(self, raw):
+        """ Calibrate a single sample.
+
+        :param raw: the raw reading (x, y, z)
+        :returns: the calibrated reading (xc, yc, zc)
+        """
+        (x, y, z) = raw
+        return (x*self._r00 + y*self._r10 + z*self._r20 + self._o0,
+                x*self._r01 + y*self._r11 + z*self._r21 + self._o1,
+                x*self._r02 + y*self._r12 + z*self._r22 + self._o2)
+
+    def applyBlock(self, samples):
+        """ Calibrate a block of samples.
+
+        :param samples: an N x 3 array of raw readings
+        :returns: an N x 3 array of calibrated readings
+        """
+        return dot(asarray(samples, dtype=float), self._rotation) + self._offset
@@ -0,0 +1,143 @@
+import unittest
+
+class FakeI2C(object):
+    """ A fake I2C device with the same methods as Adafruit_I2C for testing sensors without
+    hardware. The registers are held in memory and every read or write counts as one bus
+    transaction. Multi-byte reads and writes use consecutive registers, ignoring the
+    auto-increment bit (0x80) of the register address. A FIFO can be emulated with setStream(),
+    so reads starting at a register return the next bytes of a stream.
+
+    Pass the class itself as the i2c parameter of the sensors, or a function returning a shared
+    instance to inspect it afterwards.
+
+    :param address: the address of the device
+    :param debug: default False, print debug messages
+    """
+    _REGISTER_MASK = 0x7F
+
+    def __init__(self, address, debug=False):
+        self.address = address
+        self.debug = debug
+        self.registers = bytearray(self._REGISTER_MASK + 1)
+        self.streams = {} # bytes returned by reads starting at a register
+        self.transactions = 0
+
+    def setRegisters(self, reg, values):
+        """ Set register values without counting a transaction.
+
+        :param reg: the first register
+        :param values: the byte values of consecutive registers
+        """
+        reg &= self._REGISTER_MASK
+        self.registers[reg:reg + len(values)] = bytearray(values)
+
+    def setStream(self, reg, values):
+        """ Set the bytes returned by the reads starting at a register, like a FIFO.
+
+        :param reg: the register
+        :param values: the byte values of the stream
+        """
+        self.streams[reg & self._REGISTER_MASK] = bytearray(values)
+
+    def write8(self, reg, value):
+        self.transactions += 1
+        self.registers[reg & self._REGISTER_MASK] = value & 0xFF
+
+    def writeList(self, reg, values):
+        self.transactions += 1
+        self.setRegisters(reg, values)
+
+    def readU8(self, reg):
+        self.transactions += 1
+        return self.registers[reg & self._REGISTER_MASK]
+
+    def readS8(self, reg):
+        value = self.readU8(reg)
+        return value - 256 if value > 127 else value
+
+    def readList(self, reg, length):
+        self.transactions += 1
+        reg &= self._REGISTER_MASK
+        if reg in self.streams:
+            stream = self.streams[reg]
+            data = list(stream[0:length])
+            del stream[0:length]
+            return data
+        return list(self.registers[reg:reg + length])
+
+
+class TestBurstReads(unittest.TestCase):
+    """ Unit tests for the sensor reads using the fake I2C bus. """
+
+    def setUp(self):
+        from LSM303DLHC import LSM303DLHC
+        from L3GD20 import L3GD20
+        devices = {}
+        def i2c(address, debug):
+            devices[address] = FakeI2C(address, debug)
+            return devices[address]
+        self.lsm303 = LSM303DLHC(0x1E, 0x19, i2c=i2c)
+        self.l3gd20 = L3GD20(0x6B, i2c=i2c)
+        self.mag = devices[0x1E]
+        self.acc = devices[0x19]
+        self.gyro = devices[0x6B]
+
+    def testAccelerometer(self):
+        # x = 1000 mg, y = -1 mg, z = -2048 mg, left justified 12-bit at 1 mg/LSB
+        self.acc.setRegisters(0x28, (0x80, 0x3E, 0xF0, 0xFF, 0x00, 0x80))
+        before = self.acc.transactions
+        (ax, ay, az) = self.lsm303.readAccelerometer()
+        self.assertEqual(self.acc.transactions - before, 1)
+        self.assertAlmostEqual(ax, 1.0)
+        self.assertAlmostEqual(ay, -0.001)
+        self.assertAlmostEqual(az, -2.048)
+
+    def testMagnetometer(self):
+        # x = 1100, z = -1100 and y = 0 LSB at 1100 LSB/Gauss
+        self.mag.setRegisters(0x03, (0x04, 0x4C, 0xFB, 0xB4, 0x00, 0x00))
+        before = self.mag.transactions
+        (mx, my, mz) = self.lsm303.readMagnetometer()
+        self.assertEqual(self.mag.transactions - before, 1)
+        self.assertAlmostEqual(mx, 1.0)
+        self.assertAlmostEqual(my, 0.0)
+        self.assertAlmostEqual(mz, -1.0)
+
+    def testGyroscope(self):
+        # x = 1000, y = -1000 and z = 0 LSB at 8.75 mdps/LSB
+        self.gyro.setRegisters(0x28, (0xE8, 0x03, 0x18, 0xFC, 0x00, 0x00))
+        before = self.gyro.transactions
+        (gx, gy, gz) = self.l3gd20.readGyroscope()
+        self.assertEqual(self.gyro.transactions - before, 1)
+        self.assertAlmostEqual(gx, 8.75)
+        self.assertAlmostEqual(gy, -8.75)
+        self.assertAlmostEqual(gz, 0.0)
+
+    def testAccelerometerFifo(self):
+        self.lsm303.enableAccFifo(True)
+        # 12 samples of x = i mg
+        self.acc.setRegisters(0x2F, (12,))
+        self.acc.setStream(0x28, sum([[(i << 4) & 0xFF, i >> 4, 0, 0, 0, 0] for i in xrange(12)], []))
+        before = self.acc.transactions
+        samples = self.lsm303.readAccelerometerFifo()
+        self.assertEqual(self.acc.transactions - before, 1 + 3) # status and 3 block reads
+        self.assertEqual(samples.shape, (12, 3))
+        for i in xrange(12):
+            self.assertAlmostEqual(samples[i, 0], i/1000.0)
+
+    def testGyroscopeFifoOverrun(self):
+        self.l3gd20.enableFifo(True)
+        self.gyro.setRegisters(0x2F, (0x40 | 0x1F,)) # overrun, the FIFO holds 32 samples
+        self.gyro.setStream(0x28, [0xE8, 0x03, 0, 0, 0, 0]*32)
+        samples = self.l3gd20.readGyroscopeFifo()
+        self.assertEqual(samples.shape, (32, 3))
+        self.assertAlmostEqual(samples[31, 0], 8.75)
+
+    def testFifoEmpty(self):
+        self.l3gd20.enableFifo(True)
+        self.gyro.setRegisters(0x2F, (0x20,))
+        self.assertEqual(self.l3gd20.readGyroscopeFifo().shape, (0, 3))
+
+
+if __name__=="__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBurstReads)
+    unittest.TextTestRunner(verbosity=2).run(suite)
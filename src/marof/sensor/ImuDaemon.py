@@ -1,45 +1,200 @@
 from math import sin, cos, sqrt, asin, atan2, degrees
-from marof import getMicroSeconds
-from marof.sensor import Sensor, MiniImu9v2
-from marof_lcm import magnetometer_t, accelerometer_t, gyroscope_t, orientation_t
+from numpy import arange, array, empty
+from marof import getFastMicroSeconds
+from marof.sensor import Sensor, MiniImu9v2, LSM303DLHC, L3GD20
+from marof_lcm import magnetometer_t, accelerometer_t, gyroscope_t, orientation_t, imu_t
 
 class ImuDaemon(Sensor):
-    """ A sensor daemon to read the IMU and publish the results over LCM. """
+    """ A sensor daemon to read the IMU and publish the results over LCM. 
     
-    def __init__(self, name, updateInterval, filt):
+    Every update publishes one imu_t message on the IMU channel with the magnetic field,
+    acceleration, angular velocity and orientation, and the FIFO samples when streaming. For 
+    older subscribers the separate MAGNETOMETER, ACCELEROMETER, GYROSCOPE and ORIENTATION 
+    messages are published every legacyDecimation updates.
+    
+    In streaming mode the accelerometer and gyroscope sample at 400 Hz and 380 Hz into their 
+    FIFOs, every sample taken since the last step is read, and the published accelerations and
+    angular velocities are the mean of these samples.
+    
+    With an AHRS such as MadgwickAhrs the orientation is fused from every gyroscope, 
+    accelerometer and magnetometer sample, all FIFO samples when streaming, instead of being
+    computed from the latest accelerometer and magnetometer reading by magAcc2Orientation().
+    
+    When streaming, the filter runs once per gyroscope sample with stepBlock() on the FIFO
+    samples of every step, so its sampling interval should be the one of the gyroscope. Each
+    row holds the latest magnetometer reading, the accelerometer sample closest in time and the
+    gyroscope sample. Nothing is published before the first accelerometer and gyroscope samples
+    are read.
+    
+    :param name: the name of the module
+    :param updateInterval: the interval to update the module in seconds
+    :param filt: the filter to use on the sensor data
+    :param streaming: default False, read the accelerometer and gyroscope FIFOs
+    :param ahrs: default None, the MadgwickAhrs that fuses the readings into the orientation
+    :param orientationDecimation: default 1, update the published orientation every this many
+                                  updates
+    :param legacyDecimation: default 10, publish the legacy messages every this many updates. If
+                             0, they are not published.
+    """
+    
+    def __init__(self, name, updateInterval, filt, streaming=False, ahrs=None, 
+                 orientationDecimation=1, legacyDecimation=10):
         super(ImuDaemon, self).__init__(name, updateInterval, filt)
+        assert orientationDecimation > 0, 'Orientation decimation is negative or 0'
+        assert legacyDecimation >= 0, 'Legacy decimation is negative'
         self._imu = MiniImu9v2(debug=True)
-        (_mx, _my, _mz, _ax, _ay, _az, _gx, _gy, _gz) = (None,)*9
+        (self._mx, self._my, self._mz, self._ax, self._ay, self._az, self._gx, self._gy, self._gz) = (None,)*9
+        self._streaming = streaming
+        self._ahrs = ahrs
+        self._orientationDecimation = orientationDecimation
+        self._orientationCountdown = 1
+        (self._roll, self._pitch, self._heading) = (0.0, 0.0, 0.0)
+        self._legacyDecimation = legacyDecimation
+        self._legacyCountdown = 1
+        self._imuMsg = self.pooledMessage("IMU", imu_t)
+        self._magnetometerMsg = self.pooledMessage("MAGNETOMETER", magnetometer_t)
+        self._accelerometerMsg = self.pooledMessage("ACCELEROMETER", accelerometer_t)
+        self._gyroscopeMsg = self.pooledMessage("GYROSCOPE", gyroscope_t)
+        self._orientationMsg = self.pooledMessage("ORIENTATION", orientation_t)
+        (self._accTimes, self._accSamples, self._gyroTimes, self._gyroSamples) = (None,)*4
+        if streaming:
+            self._imu.lsm303.setAccDataRate(LSM303DLHC.ACC_400_HZ)
+            self._imu.l3gd20.setGyroDataRate(L3GD20.DR_380_HZ)
+            self._imu.enableStreaming(True)
 
+    def step(self):
+        self.sensorStep()
+        if self._filter is None or not self._hasReadings():
+            return
+        if not self._streaming:
+            self._filterOutput = self._filter.step(self.filterInput)
+        elif len(self._gyroSamples) > 0:
+            self._filterOutput = self._filter.stepBlock(self._filterBlock())[-1]
+    
     def sensorStep(self):
         (self._mx, self._my, self._mz) = self._imu.readMagnetometer()
-        (self._ax, self._ay, self._az) = self._imu.readAccelerometer()
-        (self._gx, self._gy, self._gz) = self._imu.readGyroscope()
+        if not self._streaming:
+            (self._ax, self._ay, self._az) = self._imu.readAccelerometer()
+            (self._gx, self._gy, self._gz) = self._imu.readGyroscope()
+            if self._ahrs is not None:
+                self._ahrs.update(self._gx, self._gy, self._gz, self._ax, self._ay, self._az,
+                                  self._mx, self._my, self._mz, self.updateInterval)
+            return
+        
+        (self._accTimes, self._accSamples) = self._imu.readAccelerometerStream()
+        (self._gyroTimes, self._gyroSamples) = self._imu.readGyroscopeStream()
+        if len(self._accSamples) > 0:
+            (self._ax, self._ay, self._az) = self._accSamples.mean(axis=0)
+        if len(self._gyroSamples) > 0:
+            (self._gx, self._gy, self._gz) = self._gyroSamples.mean(axis=0)
+            if self._ahrs is not None and self._ax is not None:
+                acc = self._accSamples if len(self._accSamples) > 0 else (self._ax, self._ay, self._az)
+                self._ahrs.updateBlock(self._gyroSamples, acc, (self._mx, self._my, self._mz),
+                                       1.0/self._imu.l3gd20.dataRateHz)
         
     def publishUpdate(self):
-        now = getMicroSeconds()
+        if not self._hasReadings():
+            return # the FIFOs have been empty since streaming started
+        now = getFastMicroSeconds()
+        
+        self._orientationCountdown -= 1
+        if self._orientationCountdown <= 0:
+            self._orientationCountdown = self._orientationDecimation
+            if self._ahrs is not None:
+                (self._roll, self._pitch, self._heading) = self._ahrs.orientation
+            else:
+                (self._roll, self._pitch, self._heading) = self.magAcc2Orientation(
+                    self._mx, self._my, self._mz, self._ax, self._ay, self._az)
+        
+        msg = self._imuMsg
+        msg.time = now
+        (msg.mx, msg.my, msg.mz) = (self._mx, self._my, self._mz)
+        (msg.ax, msg.ay, msg.az) = (self._ax, self._ay, self._az)
+        (msg.gx, msg.gy, msg.gz) = (self._gx, self._gy, self._gz)
+        (msg.roll, msg.pitch, msg.heading) = (self._roll, self._pitch, self._heading)
+        if self._streaming:
+            (msg.numAccSamples, msg.accTimes, msg.accSamples) = self._samples(self._accTimes, 
+                                                                              self._accSamples)
+            (msg.numGyroSamples, msg.gyroTimes, msg.gyroSamples) = self._samples(self._gyroTimes, 
+                                                                                 self._gyroSamples)
+        else:
+            (msg.numAccSamples, msg.accTimes, msg.accSamples) = (0, [], [])
+            (msg.numGyroSamples, msg.gyroTimes, msg.gyroSamples) = (0, [], [])
+        self.publish("IMU", msg)
+        
+        if self._legacyDecimation > 0:
+            self._legacyCountdown -= 1
+            if self._legacyCountdown <= 0:
+                self._legacyCountdown = self._legacyDecimation
+                self.publishLegacy(now)
+    
+    def publishLegacy(self, now):
+        """ Publish the readings in the separate messages used before imu_t. 
         
-        msg = magnetometer_t()
+        :param now: the time of the messages in microseconds
+        """
+        msg = self._magnetometerMsg
         (msg.time, msg.mx, msg.my, msg.mz) = (now, self._mx, self._my, self._mz)
         self.publish("MAGNETOMETER", msg)
         
-        msg = accelerometer_t()
+        msg = self._accelerometerMsg
         (msg.time, msg.ax, msg.ay, msg.az) = (now, self._ax, self._ay, self._az)
         self.publish("ACCELEROMETER", msg)
         
-        msg = gyroscope_t()
+        msg = self._gyroscopeMsg
         (msg.time, msg.gx, msg.gy, msg.gz) = (now, self._gx, self._gy, self._gz)
         self.publish("GYROSCOPE", msg)
         
-        msg = orientation_t()
-        msg.time = now
-        (msg.roll, msg.pitch, msg.heading) = self.magAcc2Orientation(self._mx, self._my, self._mz, 
-                                                                     self._ax, self._ay, self._az)
+        msg = self._orientationMsg
+        (msg.time, msg.roll, msg.pitch, msg.heading) = (now, self._roll, self._pitch, self._heading)
         self.publish("ORIENTATION", msg)
+    
+    def _hasReadings(self):
+        """ Check if the accelerometer and gyroscope have been read. """
+        return self._ax is not None and self._gx is not None
+    
+    def _filterBlock(self):
+        """ The N x 9 filter input of the N gyroscope samples read in the last step. """
+        n = len(self._gyroSamples)
+        block = empty((n, 9))
+        block[:, 0:3] = (self._mx, self._my, self._mz)
+        na = len(self._accSamples)
+        if na > 0:
+            block[:, 3:6] = self._accSamples[arange(n)*na//n] # like MadgwickAhrs.updateBlock()
+        else:
+            block[:, 3:6] = (self._ax, self._ay, self._az)
+        block[:, 6:9] = self._gyroSamples
+        return block
+    
+    def _samples(self, times, samples):
+        """ The number, times and rows of samples for an imu_t message. """
+        if times is None:
+            return (0, [], [])
+        return (len(times), times.tolist(), samples.tolist())
 
+    @property
+    def ahrs(self):
+        """ The AHRS that fuses the readings into the orientation, or None. """
+        return self._ahrs
+    
+    @property
+    def accelerometerStream(self):
+        """ A tuple (times, samples) of the accelerometer samples read in the last step when 
+        streaming. The times are in microseconds and the samples are an N x 3 array in G. """
+        return (self._accTimes, self._accSamples)
+    
+    @property
+    def gyroscopeStream(self):
+        """ A tuple (times, samples) of the gyroscope samples read in the last step when 
+        streaming. The times are in microseconds and the samples are an N x 3 array in deg/s. """
+        return (self._gyroTimes, self._gyroSamples)
+    
     @property
     def filterInput(self):
-        return None # Not used right now
+        """ The nine axes (mx, my, mz, ax, ay, az, gx, gy, gz) as an array, so one filter step
+        filters every axis. """
+        return array((self._mx, self._my, self._mz, self._ax, self._ay, self._az, 
+                      self._gx, self._gy, self._gz), dtype=float)
     
     def magAcc2Orientation(self, mx, my, mz, ax, ay, az):
         """ Convert magnetic field and acceleration into orientation.
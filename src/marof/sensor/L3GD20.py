@@ -1,11 +1,22 @@
-from Adafruit_I2C import Adafruit_I2C
+import struct
+from numpy import frombuffer, zeros
+
+try:
+    from Adafruit_I2C import Adafruit_I2C
+except ImportError:
+    Adafruit_I2C = None # only available on the BeagleBone Black, use FakeI2C elsewhere
 
 class L3GD20(object):
     """ A 3 axis gyroscope that measures angular rate. Includes a low-pass filter. 
     Uses the Adafruit_I2C library for the BeagleBone Black
     
+    Each 3-axis sample is read with one multi-byte I2C transaction. The gyroscope can also
+    buffer up to 32 samples in its FIFO in stream mode, so it can sample faster than it is read.
+    
     :param gyroAddr: the address of the gyroscope
     :param debug: default False, print debug messages
+    :param i2c: default None, the I2C device class called with (address, debug). If None, 
+                Adafruit_I2C is used.
     """
     # Gyroscope registers
     _WHO_AM_I = 0x0F
@@ -34,6 +45,10 @@ class L3GD20(object):
     _INT1_THS_ZH = 0x36
     _INT1_THS_ZL = 0x37
     _INT1_DURATION = 0x38
+    _AUTO_INCREMENT = 0x80 # set in the register address to read multiple bytes
+    
+    # Sample layout: xl, xh, yl, yh, zl, zh
+    _GYRO_STRUCT = struct.Struct('<3h')
     
     # Gyroscope data rates
     DR_95_HZ = 0b00 << 6
@@ -41,6 +56,7 @@ class L3GD20(object):
     DR_380_HZ = 0b10 << 6
     DR_760_HZ = 0b11 << 6
     DATA_RATES = (DR_95_HZ, DR_190_HZ, DR_380_HZ,  DR_760_HZ)
+    DATA_RATES_HZ = {DR_95_HZ:95.0, DR_190_HZ:190.0, DR_380_HZ:380.0, DR_760_HZ:760.0}
     
     # Gyroscope bandwidth (varies with data rate)
     BW_1 = 0b00 << 4 # DR_95_HZ: 12.5, DR_190_HZ: 12.5, DR_380_HZ: 20,  DR_760_HZ: 30
@@ -55,14 +71,28 @@ class L3GD20(object):
     RANGE_2000 = 0b10 << 4 # +-2000 deg/s, 70 mdps/digit 
     RANGES = {RANGE_250:8.75, RANGE_500:17.5, RANGE_2000:70}
     
+    # Gyroscope FIFO
+    _FIFO_EN = 0b1 << 6 # in CTRL_REG5
+    _FIFO_BYPASS = 0b000 << 5
+    _FIFO_STREAM = 0b010 << 5
+    _FIFO_OVERRUN = 0b1 << 6 # in FIFO_SRC_REG
+    _FIFO_EMPTY = 0b1 << 5
+    _FIFO_LEVEL = 0x1F
+    FIFO_SIZE = 32
+    _MAX_BLOCK_SAMPLES = 5 # an SMBus block read is limited to 32 bytes
     
-    def __init__(self, gyroAddr, debug=False):
+    
+    def __init__(self, gyroAddr, debug=False, i2c=None):
         self._debug = debug
+        if i2c is None:
+            assert Adafruit_I2C is not None, "Adafruit_I2C is not installed"
+            i2c = Adafruit_I2C
         self._gyroEnabled = True
         self._gyroRange = self.RANGE_250
         self._gyroDataRate = self.DR_95_HZ
         self._gyroBW = self.BW_1
-        self._gyro = Adafruit_I2C(gyroAddr, debug)
+        self._fifoEnabled = False
+        self._gyro = i2c(gyroAddr, debug)
         self.enableGyroscope(self._gyroEnabled)
         if self._debug:
             print """Enabled gyroscope with 95 Hz refresh rate, +-250 degrees/sec sensitivity, and 
@@ -110,19 +140,57 @@ class L3GD20(object):
         
         :returns: (gx, gy, gz) in degrees/sec
         """
-        gxl = self._gyro.readU8(self._OUT_X_L)
-        gxh = self._gyro.readU8(self._OUT_X_H)
-        gyl = self._gyro.readU8(self._OUT_Y_L)
-        gyh = self._gyro.readU8(self._OUT_Y_H)
-        gzl = self._gyro.readU8(self._OUT_Z_L)
-        gzh = self._gyro.readU8(self._OUT_Z_H)
-        
-        # Convert to 2s complement and then to mG. 16-bit resolution
-        mdPerLsb = self.RANGES[self._gyroRange]
-        gx = self._twos_comp((gxh << 8) + gxl, 16) * mdPerLsb/1000.0
-        gy = self._twos_comp((gyh << 8) + gyl, 16) * mdPerLsb/1000.0
-        gz = self._twos_comp((gzh << 8) + gzl, 16) * mdPerLsb/1000.0
-        return (gx, gy, gz)
+        (gx, gy, gz) = self._GYRO_STRUCT.unpack(bytearray(
+            self._gyro.readList(self._OUT_X_L | self._AUTO_INCREMENT, 6)))
+        
+        # Convert the 2s complement values to degrees/sec. 16-bit resolution
+        dPerLsb = self.RANGES[self._gyroRange]/1000.0
+        return (gx * dPerLsb, gy * dPerLsb, gz * dPerLsb)
+    
+    def enableFifo(self, enable):
+        """ Enable or disable the FIFO in stream mode. In stream mode the FIFO holds the latest 
+        32 samples, which are read with readGyroscopeFifo().
+        
+        :param enable: If True, enable the FIFO in stream mode. If False, bypass the FIFO.
+        """
+        self._fifoEnabled = enable
+        self._writeReg5()
+        if enable:
+            self._gyro.write8(self._FIFO_CTRL_REG, self._FIFO_STREAM)
+        else:
+            self._gyro.write8(self._FIFO_CTRL_REG, self._FIFO_BYPASS)
+    
+    def readGyroscopeFifo(self):
+        """ Read all samples in the FIFO. The FIFO must be enabled.
+        
+        :returns: an N x 3 array of the angular rates (gx, gy, gz) in degrees/sec, oldest first
+        """
+        assert self._fifoEnabled, "The gyroscope FIFO is not enabled."
+        status = self._gyro.readU8(self._FIFO_SRC_REG)
+        if status & self._FIFO_OVERRUN:
+            count = self.FIFO_SIZE
+        elif status & self._FIFO_EMPTY:
+            count = 0
+        else:
+            count = status & self._FIFO_LEVEL
+        if count == 0:
+            return zeros((0, 3))
+        
+        # The register address wraps from OUT_Z_H to OUT_X_L while the FIFO is enabled
+        data = bytearray()
+        reg = self._OUT_X_L | self._AUTO_INCREMENT
+        for start in xrange(0, count, self._MAX_BLOCK_SAMPLES):
+            n = min(self._MAX_BLOCK_SAMPLES, count - start)
+            data.extend(self._gyro.readList(reg, 6*n))
+        
+        # Convert the 2s complement values to degrees/sec. 16-bit resolution
+        dPerLsb = self.RANGES[self._gyroRange]/1000.0
+        return frombuffer(data, dtype='<i2').reshape(count, 3) * dPerLsb
+    
+    @property
+    def dataRateHz(self):
+        """ The gyroscope data rate in Hz. """
+        return self.DATA_RATES_HZ[self._gyroDataRate]
     
     def _twos_comp(self, val, bits):
         if (val&(1<<(bits-1))) != 0:
@@ -137,3 +205,9 @@ class L3GD20(object):
 
     def _writeReg4(self):
         self._gyro.write8(self._CTRL_REG4, self._gyroRange)
+        
+    def _writeReg5(self):
+        if self._fifoEnabled:
+            self._gyro.write8(self._CTRL_REG5, self._FIFO_EN)
+        else:
+            self._gyro.write8(self._CTRL_REG5, 0x00)
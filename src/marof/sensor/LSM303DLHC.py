@@ -1,12 +1,23 @@
-from Adafruit_I2C import Adafruit_I2C
+import struct
+from numpy import frombuffer, zeros
+
+try:
+    from Adafruit_I2C import Adafruit_I2C
+except ImportError:
+    Adafruit_I2C = None # only available on the BeagleBone Black, use FakeI2C elsewhere
 
 class LSM303DLHC(object):
     """ A combined magnetometer and linear accelerometer. The magnetometer also contains 
     a temperature sensor. Uses the Adafruit_I2C library for the BeagleBone Black.
     
+    Each 3-axis sample is read with one multi-byte I2C transaction. The accelerometer can also
+    buffer up to 32 samples in its FIFO in stream mode, so it can sample faster than it is read.
+    
     :param magAddr: the address of the magnetometer
     :param accAddr: the address of the accelerometer
     :param debug: default False, print debug messages
+    :param i2c: default None, the I2C device class called with (address, debug). If None, 
+                Adafruit_I2C is used.
     """
     # Magnetometer registers
     _MAG_CRA_REG_M = 0x00
@@ -80,6 +91,11 @@ class LSM303DLHC(object):
     _ACC_TIME_LIMIT_A = 0x3B
     _ACC_TIME_LATENCY_A = 0x3C
     _ACC_TIME_WINDOW_A = 0x3D
+    _ACC_AUTO_INCREMENT = 0x80 # set in the register address to read multiple bytes
+    
+    # Sample layouts: magnetometer xh, xl, zh, zl, yh, yl and accelerometer xl, xh, yl, yh, zl, zh
+    _MAG_STRUCT = struct.Struct('>3H')
+    _ACC_STRUCT = struct.Struct('<3h')
     
     # Accelerometer data rates
     ACC_1_HZ = 0b0001 << 4
@@ -91,6 +107,18 @@ class LSM303DLHC(object):
     ACC_400_HZ = 0b0111 << 4
     ACC_RATES = (ACC_1_HZ, ACC_10_HZ, ACC_25_HZ, ACC_50_HZ, ACC_100_HZ, 
                  ACC_200_HZ, ACC_400_HZ)
+    ACC_RATES_HZ = {ACC_1_HZ:1.0, ACC_10_HZ:10.0, ACC_25_HZ:25.0, ACC_50_HZ:50.0, 
+                    ACC_100_HZ:100.0, ACC_200_HZ:200.0, ACC_400_HZ:400.0}
+    
+    # Accelerometer FIFO
+    _ACC_FIFO_EN = 0b1 << 6 # in CTRL_REG5_A
+    _ACC_FIFO_BYPASS = 0b00 << 6
+    _ACC_FIFO_STREAM = 0b10 << 6
+    _FIFO_OVERRUN = 0b1 << 6 # in FIFO_SRC_REG_A
+    _FIFO_EMPTY = 0b1 << 5
+    _FIFO_LEVEL = 0x1F
+    FIFO_SIZE = 32
+    _MAX_BLOCK_SAMPLES = 5 # an SMBus block read is limited to 32 bytes
     
     # Accelerometer power modes
     ACC_NORMAL_POWER = 0b0 << 3
@@ -108,8 +136,11 @@ class LSM303DLHC(object):
     ACC_RANGES = {ACC_RANGE_2:1.0, ACC_RANGE_4:2.0, ACC_RANGE_8:4.0, ACC_RANGE_16:12.0}
     
     
-    def __init__(self, magAddr, accAddr, debug=False):
+    def __init__(self, magAddr, accAddr, debug=False, i2c=None):
         self._debug = debug
+        if i2c is None:
+            assert Adafruit_I2C is not None, "Adafruit_I2C is not installed"
+            i2c = Adafruit_I2C
         
         # init temperature
         self._tempEnabled = True
@@ -118,7 +149,7 @@ class LSM303DLHC(object):
         self._magEnabled = True
         self._magDataRate = self.MAG_30_HZ
         self._magRange = self.MAG_RANGE_1_3
-        self._magnetometer = Adafruit_I2C(magAddr, debug)
+        self._magnetometer = i2c(magAddr, debug)
         self.enableMagnetometer(self._magEnabled)
         
         # init accelerometer
@@ -127,7 +158,8 @@ class LSM303DLHC(object):
         self._accResolution = self.ACC_HIGH_RES
         self._accDataRate = self.ACC_50_HZ
         self._accRange = self.ACC_RANGE_2
-        self._accelerometer = Adafruit_I2C(accAddr, debug)
+        self._accFifoEnabled = False
+        self._accelerometer = i2c(accAddr, debug)
         self.enableAccelerometer(self._accEnabled)
         
         if self._debug:
@@ -189,13 +221,14 @@ class LSM303DLHC(object):
         """
         # Data pointer is updated automatically after reading each byte from the magnetometer.
         # The data returned goes xh, xl, zh, zl, yh, yl
-        data = self._magnetometer.readList(self._MAG_OUT_X_H_M, 6)
+        (mx, mz, my) = self._MAG_STRUCT.unpack(bytearray(
+            self._magnetometer.readList(self._MAG_OUT_X_H_M, 6)))
 
         # Convert to 2s complement and convert to Gauss. Has 12-bit resolution, right justified.
         lsbPerGauss = self.MAG_RANGES[self._magRange]
-        mx = self._twos_comp(((data[0] & 0x0F) << 8) + data[1], 12)/lsbPerGauss
-        mz = self._twos_comp(((data[2] & 0x0F) << 8) + data[3], 12)/lsbPerGauss
-        my = self._twos_comp(((data[4] & 0x0F) << 8) + data[5], 12)/lsbPerGauss
+        mx = (((mx & 0x0FFF) ^ 0x0800) - 0x0800)/lsbPerGauss
+        my = (((my & 0x0FFF) ^ 0x0800) - 0x0800)/lsbPerGauss
+        mz = (((mz & 0x0FFF) ^ 0x0800) - 0x0800)/lsbPerGauss
         return (mx, my, mz)
         
     def enableAccelerometer(self, enable):
@@ -251,20 +284,59 @@ class LSM303DLHC(object):
         
         :returns: The acceleration in each direction (ax, ay, az) in G, where 1G = 9.8m/s
         """
-        axh = self._accelerometer.readU8(self._ACC_OUT_X_H_A)
-        axl = self._accelerometer.readU8(self._ACC_OUT_X_L_A)
-        ayh = self._accelerometer.readU8(self._ACC_OUT_Y_H_A)
-        ayl = self._accelerometer.readU8(self._ACC_OUT_Y_L_A)
-        azh = self._accelerometer.readU8(self._ACC_OUT_Z_H_A)
-        azl = self._accelerometer.readU8(self._ACC_OUT_Z_L_A)
+        (ax, ay, az) = self._ACC_STRUCT.unpack(bytearray(
+            self._accelerometer.readList(self._ACC_OUT_X_L_A | self._ACC_AUTO_INCREMENT, 6)))
+        
+        # Shift the 2s complement values and convert to G. 12 or 10-bit resolution, left justified
+        shift = 4 if self._accResolution == self.ACC_HIGH_RES else 6
+        GPerLsb = self.ACC_RANGES[self._accRange]/1000.0
+        return ((ax >> shift) * GPerLsb, (ay >> shift) * GPerLsb, (az >> shift) * GPerLsb)
+    
+    def enableAccFifo(self, enable):
+        """ Enable or disable the accelerometer FIFO in stream mode. In stream mode the FIFO 
+        holds the latest 32 samples, which are read with readAccelerometerFifo().
+        
+        :param enable: If True, enable the FIFO in stream mode. If False, bypass the FIFO.
+        """
+        self._accFifoEnabled = enable
+        self._writeAccReg5()
+        if enable:
+            self._accelerometer.write8(self._ACC_FIFO_CTRL_REG_A, self._ACC_FIFO_STREAM)
+        else:
+            self._accelerometer.write8(self._ACC_FIFO_CTRL_REG_A, self._ACC_FIFO_BYPASS)
+    
+    def readAccelerometerFifo(self):
+        """ Read all samples in the accelerometer FIFO. The FIFO must be enabled. 
+        
+        :returns: an N x 3 array of the accelerations (ax, ay, az) in G, oldest sample first
+        """
+        assert self._accFifoEnabled, "The accelerometer FIFO is not enabled."
+        status = self._accelerometer.readU8(self._ACC_FIFO_SRC_REG_A)
+        if status & self._FIFO_OVERRUN:
+            count = self.FIFO_SIZE
+        elif status & self._FIFO_EMPTY:
+            count = 0
+        else:
+            count = status & self._FIFO_LEVEL
+        if count == 0:
+            return zeros((0, 3))
         
-        # Convert to 2s complement and then to mG. 12 or 10-bit resolution, left justified
-        res = 12 if self._accResolution == self.ACC_HIGH_RES else 10
+        # The register address wraps from OUT_Z_H_A to OUT_X_L_A while the FIFO is enabled
+        data = bytearray()
+        reg = self._ACC_OUT_X_L_A | self._ACC_AUTO_INCREMENT
+        for start in xrange(0, count, self._MAX_BLOCK_SAMPLES):
+            n = min(self._MAX_BLOCK_SAMPLES, count - start)
+            data.extend(self._accelerometer.readList(reg, 6*n))
+        
+        # Shift the 2s complement values and convert to G. 12 or 10-bit resolution, left justified
+        shift = 4 if self._accResolution == self.ACC_HIGH_RES else 6
         GPerLsb = self.ACC_RANGES[self._accRange]/1000.0
-        ax = self._twos_comp(((axh << 8) + axl) >> (16 - res), res) * GPerLsb
-        ay = self._twos_comp(((ayh << 8) + ayl) >> (16 - res), res) * GPerLsb
-        az = self._twos_comp(((azh << 8) + azl) >> (16 - res), res) * GPerLsb
-        return (ax, ay, az)
+        return (frombuffer(data, dtype='<i2').reshape(count, 3) >> shift) * GPerLsb
+    
+    @property
+    def accDataRateHz(self):
+        """ The accelerometer data rate in Hz. """
+        return self.ACC_RATES_HZ[self._accDataRate]
     
     def _twos_comp(self, val, bits):
         if (val & (1 << (bits - 1))) != 0:
@@ -295,3 +367,9 @@ class LSM303DLHC(object):
 
     def _writeAccReg4(self):
         self._accelerometer.write8(self._ACC_CTRL_REG4_A, self._accResolution | self._accRange)
+        
+    def _writeAccReg5(self):
+        if self._accFifoEnabled:
+            self._accelerometer.write8(self._ACC_CTRL_REG5_A, self._ACC_FIFO_EN)
+        else:
+            self._accelerometer.write8(self._ACC_CTRL_REG5_A, 0x00)
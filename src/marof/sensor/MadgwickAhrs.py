@@ -0,0 +1,182 @@
+from math import sqrt, asin, atan2, degrees, radians
+
+class MadgwickAhrs(object):
+    r""" An attitude and heading reference system that fuses the gyroscope, accelerometer and
+    magnetometer into an orientation quaternion with the gradient descent filter of Madgwick.
+    The gyroscope is integrated at the full sensor rate and the accelerometer and magnetometer
+    pull the estimate towards the measured gravity and magnetic field with the gain beta, so the
+    heading is stable even when single readings are noisy.
+
+    The state is held in float attributes and the updates only use float arithmetic, so no
+    arrays are allocated per sample. Whole FIFO batches are fused with updateBlock().
+
+    :param beta: default 0.1, the gain of the accelerometer and magnetometer correction in rad/s.
+                 Larger values follow the accelerometer and magnetometer faster but pass more
+                 of their noise.
+    :param startupBeta: default 2.5, the gain used for the first startupTime seconds so the
+                        estimate converges quickly from the initial orientation
+    :param startupTime: default 1, the time in seconds the startup gain is used
+    """
+
+    def __init__(self, beta=0.1, startupBeta=2.5, startupTime=1.0):
+        assert beta >= 0 and startupBeta >= 0, 'Beta is negative'
+        self._beta = beta
+        self._startupBeta = startupBeta
+        self._startupTime = startupTime
+        self.reset()
+
+    def reset(self):
+        """ Forget the orientation and start the startup period again. """
+        (self._q0, self._q1, self._q2, self._q3) = (1.0, 0.0, 0.0, 0.0)
+        self._time = 0.0
+
+    @property
+    def beta(self):
+        return self._beta
+
+    @beta.setter
+    def beta(self, beta):
+        assert beta >= 0, 'Beta is negative'
+        self._beta = beta
+
+    @property
+    def quaternion(self):
+        """ The orientation as a tuple (w, x, y, z). """
+        return (self._q0, self._q1, self._q2, self._q3)
+
+    @property
+    def orientation(self):
+        """ The orientation as a tuple (roll, pitch, heading) in degrees, in the same convention
+        as ImuDaemon.magAcc2Orientation(). The heading is between 0 and 360. """
+        (q0, q1, q2, q3) = (self._q0, self._q1, self._q2, self._q3)
+        roll = atan2(q0*q1 + q2*q3, 0.5 - q1*q1 - q2*q2)
+        pitch = asin(max(-1.0, min(1.0, 2.0*(q0*q2 - q1*q3))))
+        heading = -atan2(q1*q2 + q0*q3, 0.5 - q2*q2 - q3*q3)
+        return (degrees(roll), degrees(pitch), degrees(heading) % 360)
+
+    def update(self, gx, gy, gz, ax, ay, az, mx, my, mz, dt):
+        """ Fuse one sample.
+
+        :param gx, gy, gz: the angular velocity in deg/s
+        :param ax, ay, az: the acceleration in any unit. If all are 0, only the gyroscope is
+                           used.
+        :param mx, my, mz: the magnetic field in any unit. If all are 0, the heading is only
+                           integrated from the gyroscope.
+        :param dt: the time since the last sample in seconds
+        """
+        (q0, q1, q2, q3) = (self._q0, self._q1, self._q2, self._q3)
+        (gx, gy, gz) = (radians(gx), radians(gy), radians(gz))
+
+        # Rate of change of the quaternion from the gyroscope
+        qDot0 = 0.5*(-q1*gx - q2*gy - q3*gz)
+        qDot1 = 0.5*(q0*gx + q2*gz - q3*gy)
+        qDot2 = 0.5*(q0*gy - q1*gz + q3*gx)
+        qDot3 = 0.5*(q0*gz + q1*gy - q2*gx)
+
+        aNorm = sqrt(ax*ax + ay*ay + az*az)
+        if aNorm > 0:
+            (ax, ay, az) = (ax/aNorm, ay/aNorm, az/aNorm)
+            mNorm = sqrt(mx*mx + my*my + mz*mz)
+            if mNorm > 0:
+                (s0, s1, s2, s3) = self._margGradient(q0, q1, q2, q3, ax, ay, az,
+                                                      mx/mNorm, my/mNorm, mz/mNorm)
+            else:
+                (s0, s1, s2, s3) = self._imuGradient(q0, q1, q2, q3, ax, ay, az)
+            sNorm = sqrt(s0*s0 + s1*s1 + s2*s2 + s3*s3)
+            if sNorm > 0:
+                beta = self._beta if self._time >= self._startupTime else self._startupBeta
+                beta /= sNorm
+                qDot0 -= beta*s0
+                qDot1 -= beta*s1
+                qDot2 -= beta*s2
+                qDot3 -= beta*s3
+
+        q0 += qDot0*dt
+        q1 += qDot1*dt
+        q2 += qDot2*dt
+        q3 += qDot3*dt
+        qNorm = sqrt(q0*q0 + q1*q1 + q2*q2 + q3*q3)
+        (self._q0, self._q1, self._q2, self._q3) = (q0/qNorm, q1/qNorm, q2/qNorm, q3/qNorm)
+        self._time += dt
+
+    def updateBlock(self, gyro, acc, mag, dt):
+        """ Fuse a batch of samples, for example the FIFO samples read in one step. The
+        gyroscope drives the update, and each gyroscope sample is fused with the accelerometer
+        and magnetometer samples taken closest to it when they were sampled at other rates.
+
+        :param gyro: an N x 3 array of angular velocities in deg/s
+        :param acc: an M x 3 array of accelerations, or a single sample (ax, ay, az)
+        :param mag: a K x 3 array of magnetic fields, or a single sample (mx, my, mz)
+        :param dt: the time between the gyroscope samples in seconds
+        """
+        gyro = gyro.tolist() if hasattr(gyro, 'tolist') else list(gyro)
+        acc = self._rows(acc)
+        mag = self._rows(mag)
+        n = len(gyro)
+        (na, nm) = (len(acc), len(mag))
+        update = self.update
+        for i in xrange(n):
+            (gx, gy, gz) = gyro[i]
+            (ax, ay, az) = acc[i*na//n]
+            (mx, my, mz) = mag[i*nm//n]
+            update(gx, gy, gz, ax, ay, az, mx, my, mz, dt)
+
+    def _rows(self, samples):
+        """ The samples as a list of rows, a single sample becoming one row. """
+        samples = samples.tolist() if hasattr(samples, 'tolist') else list(samples)
+        if len(samples) == 0:
+            return [(0.0, 0.0, 0.0)]
+        if not hasattr(samples[0], '__len__'):
+            return [samples]
+        return samples
+
+    def _imuGradient(self, q0, q1, q2, q3, ax, ay, az):
+        """ The gradient of the error between the measured and estimated gravity. """
+        (_2q0, _2q1, _2q2, _2q3) = (2.0*q0, 2.0*q1, 2.0*q2, 2.0*q3)
+        (_4q0, _4q1, _4q2) = (4.0*q0, 4.0*q1, 4.0*q2)
+        (_8q1, _8q2) = (8.0*q1, 8.0*q2)
+        (q0q0, q1q1, q2q2, q3q3) = (q0*q0, q1*q1, q2*q2, q3*q3)
+        s0 = _4q0*q2q2 + _2q2*ax + _4q0*q1q1 - _2q1*ay
+        s1 = _4q1*q3q3 - _2q3*ax + 4.0*q0q0*q1 - _2q0*ay - _4q1 + _8q1*q1q1 + _8q1*q2q2 + _4q1*az
+        s2 = 4.0*q0q0*q2 + _2q0*ax + _4q2*q3q3 - _2q3*ay - _4q2 + _8q2*q1q1 + _8q2*q2q2 + _4q2*az
+        s3 = 4.0*q1q1*q3 - _2q1*ax + 4.0*q2q2*q3 - _2q2*ay
+        return (s0, s1, s2, s3)
+
+    def _margGradient(self, q0, q1, q2, q3, ax, ay, az, mx, my, mz):
+        """ The gradient of the error between the measured and estimated gravity and magnetic
+        field. """
+        _2q0mx = 2.0*q0*mx
+        _2q0my = 2.0*q0*my
+        _2q0mz = 2.0*q0*mz
+        _2q1mx = 2.0*q1*mx
+        (_2q0, _2q1, _2q2, _2q3) = (2.0*q0, 2.0*q1, 2.0*q2, 2.0*q3)
+        _2q0q2 = 2.0*q0*q2
+        _2q2q3 = 2.0*q2*q3
+        (q0q0, q0q1, q0q2, q0q3) = (q0*q0, q0*q1, q0*q2, q0*q3)
+        (q1q1, q1q2, q1q3) = (q1*q1, q1*q2, q1*q3)
+        (q2q2, q2q3, q3q3) = (q2*q2, q2*q3, q3*q3)
+
+        # Reference direction of the magnetic field in the earth frame
+        hx = mx*q0q0 - _2q0my*q3 + _2q0mz*q2 + mx*q1q1 + _2q1*my*q2 + _2q1*mz*q3 - mx*q2q2 - mx*q3q3
+        hy = _2q0mx*q3 + my*q0q0 - _2q0mz*q1 + _2q1mx*q2 - my*q1q1 + my*q2q2 + _2q2*mz*q3 - my*q3q3
+        _2bx = sqrt(hx*hx + hy*hy)
+        _2bz = -_2q0mx*q2 + _2q0my*q1 + mz*q0q0 + _2q1mx*q3 - mz*q1q1 + _2q2*my*q3 - mz*q2q2 + mz*q3q3
+        _4bx = 2.0*_2bx
+        _4bz = 2.0*_2bz
+
+        # Errors of the estimated gravity (fa) and magnetic field (fm)
+        fa0 = 2.0*q1q3 - _2q0q2 - ax
+        fa1 = 2.0*q0q1 + _2q2q3 - ay
+        fa2 = 1.0 - 2.0*q1q1 - 2.0*q2q2 - az
+        fm0 = _2bx*(0.5 - q2q2 - q3q3) + _2bz*(q1q3 - q0q2) - mx
+        fm1 = _2bx*(q1q2 - q0q3) + _2bz*(q0q1 + q2q3) - my
+        fm2 = _2bx*(q0q2 + q1q3) + _2bz*(0.5 - q1q1 - q2q2) - mz
+
+        s0 = (-_2q2*fa0 + _2q1*fa1 - _2bz*q2*fm0 + (-_2bx*q3 + _2bz*q1)*fm1 + _2bx*q2*fm2)
+        s1 = (_2q3*fa0 + _2q0*fa1 - 4.0*q1*fa2 + _2bz*q3*fm0 + (_2bx*q2 + _2bz*q0)*fm1 +
+              (_2bx*q3 - _4bz*q1)*fm2)
+        s2 = (-_2q0*fa0 + _2q3*fa1 - 4.0*q2*fa2 + (-_4bx*q2 - _2bz*q0)*fm0 +
+              (_2bx*q1 + _2bz*q3)*fm1 + (_2bx*q0 - _4bz*q2)*fm2)
+        s3 = (_2q1*fa0 + _2q2*fa1 + (-_4bx*q3 + _2bz*q1)*fm0 + (-_2bx*q0 + _2bz*q2)*fm1 +
+              _2bx*q1*fm2)
+        return (s0, s1, s2, s3)
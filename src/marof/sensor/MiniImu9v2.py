@@ -1,11 +1,13 @@
-from numpy import array, mat, mean
+from numpy import array, mat, mean, arange
 from numpy.linalg import lstsq
 from math import sqrt, sin, cos, radians, pi
 import time
 import unittest
 
+from marof import getFastMicroSeconds
 from LSM303DLHC import LSM303DLHC
 from L3GD20 import L3GD20
+from AffineCalibration import AffineCalibration
 
 class MiniImu9v2(object):
     """ A combined magnetometer and linear accelerometer (LSM303DLHC) with a gyroscope (L3GD20).
@@ -20,31 +22,21 @@ class MiniImu9v2(object):
     :param magMat: magnetometer calibration matrix
     :param gyroBias: gyroscope bias in each direction
     :param tempBias: temperature bias in Celsius
+    :param i2c: default None, the I2C device class called with (address, debug). If None, 
+                Adafruit_I2C is used.
     """
     _GYRO_ADDRESS = 0x6B
     _MAG_ADDRESS = 0x1E
     _ACC_ADDRESS = 0x19
     
     
-    def __init__(self, debug=False, accMat=None, magMat=None, gyroBias=None, tempBias=None):
-        self.lsm303 = LSM303DLHC(self._MAG_ADDRESS, self._ACC_ADDRESS, debug)
-        self.l3gd20 = L3GD20(self._GYRO_ADDRESS, debug)
+    def __init__(self, debug=False, accMat=None, magMat=None, gyroBias=None, tempBias=None,
+                 i2c=None):
+        self.lsm303 = LSM303DLHC(self._MAG_ADDRESS, self._ACC_ADDRESS, debug, i2c)
+        self.l3gd20 = L3GD20(self._GYRO_ADDRESS, debug, i2c)
         
-        if accMat is None:
-            self.accMat = mat(((1, 0, 0, 0),
-                               (0, 1, 0, 0),
-                               (0, 0, 1, 0),
-                               (0, 0, 0, 0)))
-        else:
-            self.accMat = accMat
-        
-        if magMat is None:
-            self.magMat = mat(((1, 0, 0, 0),
-                               (0, 1, 0, 0),
-                               (0, 0, 1, 0),
-                               (0, 0, 0, 0)))
-        else:
-            self.magMat = magMat
+        self._accCalibration = AffineCalibration(accMat)
+        self._magCalibration = AffineCalibration(magMat)
         
         if gyroBias is None:
             self.gyroBias = (0, 0, 0)
@@ -56,6 +48,24 @@ class MiniImu9v2(object):
         else:
             self.tempBias = tempBias
     
+    @property
+    def accMat(self):
+        """ The 4x4 accelerometer calibration matrix. """
+        return self._accCalibration.matrix
+    
+    @accMat.setter
+    def accMat(self, accMat):
+        self._accCalibration.matrix = accMat
+    
+    @property
+    def magMat(self):
+        """ The 4x4 magnetometer calibration matrix. """
+        return self._magCalibration.matrix
+    
+    @magMat.setter
+    def magMat(self, magMat):
+        self._magCalibration.matrix = magMat
+    
     def readTemperatureRaw(self):
         """ Read the temperature in Celsius without applying calibration. 
         
@@ -112,14 +122,61 @@ class MiniImu9v2(object):
         """
         return self.applyGyroCalibration(self.readGyroscopeRaw())
     
+    def enableStreaming(self, enable):
+        """ Enable or disable the FIFOs of the accelerometer and gyroscope in stream mode, so all
+        samples taken between reads can be read with the read*Stream() methods.
+        
+        :param enable: If True, enable the FIFOs. If False, bypass them.
+        """
+        self.lsm303.enableAccFifo(enable)
+        self.l3gd20.enableFifo(enable)
+    
+    def readAccelerometerStream(self):
+        """ Read and calibrate all samples buffered by the accelerometer since the last read.
+        Streaming must be enabled. The sample times are reconstructed from the time of the read
+        and the data rate, assuming the newest sample was taken at the time of the read.
+        
+        :returns: a tuple (times, samples) of an array of N times in microseconds since the
+                  epoch and an N x 3 array of the calibrated accelerations in G, oldest first
+        """
+        samples = self.lsm303.readAccelerometerFifo()
+        now = getFastMicroSeconds()
+        samples = self.applyAccCalibrationBlock(samples)
+        return (self._sampleTimes(now, len(samples), self.lsm303.accDataRateHz), samples)
+    
+    def readGyroscopeStream(self):
+        """ Read and calibrate all samples buffered by the gyroscope since the last read.
+        Streaming must be enabled. The sample times are reconstructed from the time of the read
+        and the data rate, assuming the newest sample was taken at the time of the read.
+        
+        :returns: a tuple (times, samples) of an array of N times in microseconds since the
+                  epoch and an N x 3 array of the calibrated angular velocities in deg/s, 
+                  oldest first
+        """
+        samples = self.l3gd20.readGyroscopeFifo()
+        now = getFastMicroSeconds()
+        samples = self.applyGyroCalibrationBlock(samples)
+        return (self._sampleTimes(now, len(samples), self.l3gd20.dataRateHz), samples)
+    
+    def _sampleTimes(self, now, count, rateHz):
+        """ Reconstruct the times of count samples taken at rateHz, the newest at now. """
+        return now - ((count - 1 - arange(count)) * (1000000.0/rateHz)).astype('int64')
+    
     def applyMagCalibration(self, raw):
         """ Apply the magnetometer calibration on the raw sensor reading.
         
         :param raw: the raw reading (mx, my, mz) in Gauss
         :returns: the calibrated reading (mxc, myc, mzc) in Gauss
         """
-        raw = mat(raw + (1,))
-        return map(tuple, array(raw*self.magMat))[0][0:3]
+        return self._magCalibration.apply(raw)
+    
+    def applyMagCalibrationBlock(self, raw):
+        """ Apply the magnetometer calibration on a block of raw sensor readings.
+        
+        :param raw: an N x 3 array of raw readings in Gauss
+        :returns: an N x 3 array of calibrated readings in Gauss
+        """
+        return self._magCalibration.applyBlock(raw)
     
     def applyAccCalibration(self, raw):
         """ Apply the accelerometer calibration on the raw sensor reading.
@@ -127,8 +184,15 @@ class MiniImu9v2(object):
         :param raw: the raw reading (ax, ay, az) in G
         :returns: the calibrated reading (axc, ayc, azc) in G
         """
-        raw = mat(raw + (1,))
-        return map(tuple, array(raw*self.accMat))[0][0:3]
+        return self._accCalibration.apply(raw)
+    
+    def applyAccCalibrationBlock(self, raw):
+        """ Apply the accelerometer calibration on a block of raw sensor readings.
+        
+        :param raw: an N x 3 array of raw readings in G
+        :returns: an N x 3 array of calibrated readings in G
+        """
+        return self._accCalibration.applyBlock(raw)
     
     def applyGyroCalibration(self, raw):
         """ Apply the gyroscope calibration on the raw sensor reading.
@@ -138,6 +202,14 @@ class MiniImu9v2(object):
         """
         return (raw[0]-self.gyroBias[0], raw[1]-self.gyroBias[1], raw[2]-self.gyroBias[2])
     
+    def applyGyroCalibrationBlock(self, raw):
+        """ Apply the gyroscope calibration on a block of raw sensor readings.
+        
+        :param raw: an N x 3 array of raw readings in deg/s
+        :returns: an N x 3 array of calibrated readings in deg/s
+        """
+        return raw - array(self.gyroBias, dtype=float)
+    
     def applyTempCalibration(self, raw):
         """ Apply the temperature calibration on the raw sensor reading.
         
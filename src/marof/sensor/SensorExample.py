@@ -1,6 +1,6 @@
 from random import random
 
-from marof import MarofModuleHandler, getMicroSeconds
+from marof import MarofModuleHandler, getFastMicroSeconds
 from marof.sensor import Sensor
 from marof.filter import FirstOrderLpf
 
@@ -19,6 +19,8 @@ class SensorExample(Sensor):
         self._data = 0;
         self._channel = self.name
         self._filtChannel = self.name + "_FILTERED"
+        self._msg = self.pooledMessage(self._channel, sensorData_t)
+        self._filtMsg = self.pooledMessage(self._filtChannel, sensorData_t)
         
     @property
     def filterInput(self):
@@ -28,11 +30,14 @@ class SensorExample(Sensor):
         self._data = 0.5 - random()
             
     def publishUpdate(self):
-        msg = sensorData_t()
-        msg.time = getMicroSeconds()
+        now = getFastMicroSeconds()
+        msg = self._msg
+        msg.time = now
         msg.data = self._data
         self.publish(self._channel, msg)
         if self.filter is not None:
+            msg = self._filtMsg
+            msg.time = now
             msg.data = self.filterOutput
             self.publish(self._filtChannel, msg)
             
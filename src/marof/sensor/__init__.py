@@ -3,4 +3,7 @@ from SensorExample import SensorExample
 from MiniImu9v2 import MiniImu9v2
 from LSM303DLHC import LSM303DLHC
 from L3GD20 import L3GD20
+from FakeI2C import FakeI2C
+from AffineCalibration import AffineCalibration
+from MadgwickAhrs import MadgwickAhrs
 from ImuDaemon import ImuDaemon
@@ -0,0 +1,34 @@
+import timeit
+
+from numpy import array, mat, random
+
+from marof.sensor import AffineCalibration
+
+def matrixCalibration(raw, calMat):
+    """ The calibration as MiniImu9v2 computed it with numpy.matrix. """
+    raw = mat(raw + (1,))
+    return map(tuple, array(raw*calMat))[0][0:3]
+
+if __name__ == "__main__":
+    number = 20000
+    calMat = mat(((1.02, 0.01, 0, 0),
+                  (-0.01, 0.98, 0.02, 0),
+                  (0, 0.01, 1.01, 0),
+                  (0.03, -0.02, 0.05, 0)))
+    calibration = AffineCalibration(calMat)
+    raw = (0.1, -0.2, 0.98)
+    samples = random.randn(number, 3)
+    
+    matrixTime = min(timeit.repeat(lambda: matrixCalibration(raw, calMat), repeat=3, number=number))
+    applyTime = min(timeit.repeat(lambda: calibration.apply(raw), repeat=3, number=number))
+    blockTime = min(timeit.repeat(lambda: calibration.applyBlock(samples), repeat=3, number=1))
+    
+    print "Per sample cost:"
+    print "numpy.matrix: %.3f us" % (matrixTime/number*1e6)
+    print "AffineCalibration.apply: %.3f us (%.0fx faster)" % (applyTime/number*1e6, 
+                                                              matrixTime/applyTime)
+    print "AffineCalibration.applyBlock of %d samples: %.3f us (%.0fx faster)" % (number, 
+                                                              blockTime/number*1e6, 
+                                                              matrixTime/blockTime)
+    print "Difference:", max(abs(array(matrixCalibration(raw, calMat)) - 
+                                 array(calibration.apply(raw))))
@@ -0,0 +1,47 @@
+import glob
+import os
+import timeit
+
+from marof.codec import loadCodecs
+
+LCM_DEFS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'lcm-defs')
+
+SETUP = """
+import glob
+from marof.codec import loadCodecs
+import marof_lcm
+fast = loadCodecs(sorted(glob.glob(%(defs)r + '/*.lcm')))
+(lcmType, fastType) = (marof_lcm.orientation_t, fast.orientation_t)
+(msg, fastMsg) = (lcmType(), fastType())
+for m in (msg, fastMsg):
+    (m.time, m.roll, m.pitch, m.heading) = (1234567890, 1.5, -2.5, 271.0)
+data = msg.encode()
+payloads = [data]*%(batch)d
+"""
+
+def compare(name, slow, fast, number, setup):
+    slowTime = min(timeit.repeat(slow, setup, repeat=3, number=number))
+    fastTime = min(timeit.repeat(fast, setup, repeat=3, number=number))
+    print "%s: lcm-gen %.3f us, generated %.3f us, speedup: %.1fx" % (name, slowTime/number*1e6,
+                                                                     fastTime/number*1e6,
+                                                                     slowTime/fastTime)
+
+if __name__ == "__main__":
+    number = 100000
+    batch = 10000
+    setup = SETUP % {'defs': LCM_DEFS, 'batch': batch}
+    print "Messages per test:", number, "of orientation_t"
+    compare("encode", "msg.encode()", "fastMsg.encode()", number, setup)
+    compare("decode", "lcmType.decode(data)", "fastType.decode(data)", number, setup)
+    print "Messages per bulk decode:", batch
+    slowTime = min(timeit.repeat("[lcmType.decode(d) for d in payloads]", setup, repeat=3, number=10))
+    fastTime = min(timeit.repeat("fastType.decodeArray(payloads)", setup, repeat=3, number=10))
+    print "bulk decode: lcm-gen %.3f us, generated %.3f us per message, speedup: %.1fx" % \
+          (slowTime/10/batch*1e6, fastTime/10/batch*1e6, slowTime/fastTime)
+
+    fast = loadCodecs(sorted(glob.glob(os.path.join(LCM_DEFS, '*.lcm'))))
+    import marof_lcm
+    same = all(getattr(marof_lcm, name)._get_packed_fingerprint() ==
+               getattr(fast, name)._get_packed_fingerprint()
+               for name in dir(fast) if name.endswith('_t'))
+    print "Fingerprints equal to lcm-gen:", same
@@ -0,0 +1,110 @@
+import binascii
+import glob
+import os
+import tempfile
+import unittest
+
+from marof.codec import generateCodecs, loadCodecs, parseLcm
+
+LCM_DEFS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'lcm-defs')
+
+# The fingerprints of the marof_lcm types generated by lcm-gen 1.5.3
+FINGERPRINTS = {'accelerometer_t': '44d38984b67d8d15', 'config_t': '03d26a2adcca99a4',
+                'currentState_t': 'f8fe098eae353335', 'desiredState_t': 'c2e8e250c95ee9eb',
+                'gyroscope_t': 'a4d389b4b67da515', 'imu_t': '450ac49659f8fefa',
+                'magnetometer_t': '04d389e4b67dbd12', 'moduleStats_t': '7270c731719db7b5',
+                'motorCommand_t': '0839737a753b64fb', 'orientation_t': '82927f6ae567c9c6',
+                'pidBank_t': '25fcd89b7611d6b6', 'sensorData_t': 'f6ad5baf4a466c42'}
+
+# orientation_t(time=1234567890, roll=1.5, pitch=-2.5, heading=271.0) encoded by lcm-gen
+ORIENTATION = ('82927f6ae567c9c6' '00000000499602d2' '3ff8000000000000' 'c004000000000000'
+               '4070f00000000000')
+
+# desiredState_t(time=42, waypointMode=True, north=10.0, east=-20.0, heading=90.0,
+# velocity=0.5) encoded by lcm-gen
+DESIRED_STATE = ('c2e8e250c95ee9eb' '000000000000002a' '01' '4024000000000000'
+                 'c034000000000000' '4056800000000000' '3fe0000000000000')
+
+LIMITS = """
+package marof_test;
+
+struct limits_t
+{
+    const int32_t MAX_SPEED = 100, MIN_SPEED = -100;
+    const double GAIN = 1.5;
+    int32_t speed;
+    boolean enabled;
+}
+"""
+
+# limits_t(speed=-5, enabled=True) encoded by lcm-gen
+LIMITS_ENCODED = 'da8efe520baa50c9' 'fffffffb' '01'
+
+class CodecTest(unittest.TestCase):
+    """ Test the parser and the generated codecs against messages encoded by lcm-gen. """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fast = loadCodecs(sorted(glob.glob(os.path.join(LCM_DEFS, '*.lcm'))))
+        (f, cls.limitsFile) = tempfile.mkstemp(suffix='.lcm')
+        os.write(f, LIMITS)
+        os.close(f)
+        # keep the module, its globals are cleared when it is freed
+        cls.limitsModule = loadCodecs([cls.limitsFile], 'marof_test_codec')
+        cls.limits = cls.limitsModule.limits_t
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.limitsFile)
+
+    def testFingerprints(self):
+        for filename in glob.glob(os.path.join(LCM_DEFS, '*.lcm')):
+            with open(filename, 'r') as f:
+                for lcmStruct in parseLcm(f.read()):
+                    self.assertEqual(binascii.hexlify(lcmStruct.fingerprint),
+                                     FINGERPRINTS[lcmStruct.name], lcmStruct.name)
+
+    def testEncode(self):
+        msg = self.fast.orientation_t()
+        (msg.time, msg.roll, msg.pitch, msg.heading) = (1234567890, 1.5, -2.5, 271.0)
+        self.assertEqual(binascii.hexlify(msg.encode()), ORIENTATION)
+        msg = self.fast.desiredState_t()
+        (msg.time, msg.waypointMode, msg.north, msg.east, msg.heading, msg.velocity) = \
+            (42, True, 10.0, -20.0, 90.0, 0.5)
+        self.assertEqual(binascii.hexlify(msg.encode()), DESIRED_STATE)
+
+    def testDecode(self):
+        msg = self.fast.desiredState_t.decode(binascii.unhexlify(DESIRED_STATE))
+        self.assertEqual((msg.time, msg.waypointMode, msg.north, msg.east, msg.heading,
+                          msg.velocity), (42, True, 10.0, -20.0, 90.0, 0.5))
+        self.assertTrue(msg.waypointMode is True)
+        self.assertRaises(ValueError, self.fast.orientation_t.decode,
+                          binascii.unhexlify(DESIRED_STATE[:16] + ORIENTATION[16:]))
+
+    def testConstants(self):
+        self.assertEqual((self.limits.MAX_SPEED, self.limits.MIN_SPEED, self.limits.GAIN),
+                         (100, -100, 1.5))
+        msg = self.limits()
+        (msg.speed, msg.enabled) = (-5, True)
+        self.assertEqual(binascii.hexlify(msg.encode()), LIMITS_ENCODED)
+
+    def testDecodeArray(self):
+        data = binascii.unhexlify(ORIENTATION)
+        records = self.fast.orientation_t.decodeArray([data]*3)
+        self.assertEqual(list(records['heading']), [271.0]*3)
+        self.assertEqual(list(records['time']), [1234567890]*3)
+
+    def testDecodeArrayPayloadSizes(self):
+        data = binascii.unhexlify(ORIENTATION)
+        # the joined data is two valid messages, but the payloads are not
+        self.assertRaises(ValueError, self.fast.orientation_t.decodeArray,
+                          [data[:-4], data[-4:] + data])
+
+    def testSkipped(self):
+        (_, skipped) = generateCodecs(sorted(glob.glob(os.path.join(LCM_DEFS, '*.lcm'))))
+        self.assertTrue('config_t' in skipped)
+        self.assertFalse('orientation_t' in skipped)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(CodecTest)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from marof.log import ColumnStore, LogWriter, exportColumns
+from marof_lcm import orientation_t
+
+class ColumnStoreTest(unittest.TestCase):
+    """ Test exporting a log to columns and selecting time ranges of them. """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'test.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def export(self, times):
+        writer = LogWriter(self.filename)
+        for (i, utime) in enumerate(times):
+            msg = orientation_t()
+            (msg.time, msg.heading) = (utime, float(i))
+            writer.write(utime, "ORIENTATION", msg.encode())
+            writer.write(utime, "CONFIG", "not an LCM message")
+        writer.close()
+        exportColumns(self.filename, os.path.join(self.directory, 'columns'))
+        return ColumnStore(os.path.join(self.directory, 'columns'))
+
+    def testRoundTrip(self):
+        times = [1000000 + i*50000 for i in xrange(40)]
+        store = self.export(times)
+        self.assertEqual(store.channels, ["ORIENTATION"])
+        info = store.info("ORIENTATION")
+        self.assertEqual((info['type'], info['rows'], info['firstTime'], info['lastTime']),
+                         ('orientation_t', 40, times[0], times[-1]))
+        rows = store.select("ORIENTATION", times[10], times[19])
+        self.assertEqual(list(rows['utime']), times[10:20])
+        self.assertEqual(list(rows['heading']), range(10, 20))
+
+    def testTimesGoBack(self):
+        # the clock is set back by 1 s after 30 messages
+        times = [1000000 + i*50000 - (1000000 if i >= 30 else 0) for i in xrange(40)]
+        store = self.export(times)
+        self.assertEqual(store.info("ORIENTATION")['firstTime'], min(times))
+        self.assertEqual(store.info("ORIENTATION")['lastTime'], max(times))
+        (startTime, endTime) = (times[15], times[25])
+        rows = store.select("ORIENTATION", startTime, endTime)
+        expected = sorted((t, i) for (i, t) in enumerate(times) if startTime <= t <= endTime)
+        self.assertEqual(zip(rows['utime'], rows['heading']), expected)
+        self.assertEqual(list(rows['time']), list(rows['utime']))
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(ColumnStoreTest)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,71 @@
+import threading
+import unittest
+
+from marof import CommandQueue
+
+class Target(object):
+    def __init__(self):
+        self.desiredState = 0
+        self.calls = []
+
+class TestCommandQueue(unittest.TestCase):
+    """ Unit tests for the CommandQueue class. """
+
+    def setUp(self):
+        self.target = Target()
+        self.queue = CommandQueue(self.target, maxSize=4)
+
+    def testWritesCoalesceWhenQueued(self):
+        for value in xrange(100):
+            self.assertTrue(self.queue.set("desiredState", value))
+        self.assertEqual(len(self.queue), 1)
+        self.assertEqual(self.queue.coalesced, 99)
+        self.assertEqual(self.queue.drain(), 1)
+        self.assertEqual(self.target.desiredState, 99)
+
+    def testFullQueueKeepsLatestWrite(self):
+        for i in xrange(4):
+            self.assertTrue(self.queue.put(lambda i=i: self.target.calls.append(i)))
+        self.assertFalse(self.queue.set("desiredState", 1)) # no place for a new attribute
+        self.assertEqual(self.queue.dropped, 1)
+        self.queue.drain()
+        self.queue.set("desiredState", 2)
+        for i in xrange(3):
+            self.queue.put(lambda: None)
+        self.assertTrue(self.queue.set("desiredState", 3)) # the full queue still takes newer values
+        self.queue.drain()
+        self.assertEqual(self.target.desiredState, 3)
+        self.assertEqual(self.target.calls, [0, 1, 2, 3])
+
+    def testOrder(self):
+        self.queue.put(lambda: self.target.calls.append(self.target.desiredState))
+        self.queue.set("desiredState", 5)
+        self.queue.put(lambda: self.target.calls.append(self.target.desiredState))
+        self.queue.set("desiredState", 6)
+        self.assertEqual(self.queue.drain(), 3)
+        self.assertEqual(self.target.calls, [0, 6])
+        self.assertEqual(self.queue.executed, 3)
+
+    def testCommandsQueuedDuringDrainRunNextDrain(self):
+        self.queue.put(lambda: self.queue.set("desiredState", 7))
+        self.queue.drain()
+        self.assertEqual(self.target.desiredState, 0)
+        self.queue.drain()
+        self.assertEqual(self.target.desiredState, 7)
+
+    def testDroppedCountIsThreadSafe(self):
+        queue = CommandQueue(self.target, maxSize=1)
+        queue.put(lambda: None)
+        def fill():
+            for _ in xrange(10000):
+                queue.put(lambda: None)
+        threads = [threading.Thread(target=fill) for _ in xrange(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(queue.dropped, 40000)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCommandQueue)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,47 @@
+import unittest
+
+from numpy import array, ones, random
+from numpy.testing import assert_allclose
+
+from marof.filter import FirstOrderHpf, FirstOrderLpf
+
+class FirstOrderFilterTest(unittest.TestCase):
+    """ Test that step() of the first-order filters keeps its output and that stepBlock() gives
+    the output of step(). """
+
+    def setUp(self):
+        self.samples = random.RandomState(2).randn(200, 3)
+
+    def testHpfStep(self):
+        # the step of the filters before stepBlock() was added
+        (a, gain) = (FirstOrderHpf(2.0, 0.01, 1.5)._a, 1.5)
+        lastOutput = self.samples[0, 0]
+        expected = []
+        for x in self.samples[:, 0]:
+            lastOutput = gain*(a * (lastOutput + x - lastOutput))
+            expected.append(lastOutput)
+        filt = FirstOrderHpf(2.0, 0.01, 1.5)
+        self.assertEqual([filt.step(x) for x in self.samples[:, 0]], expected)
+
+    def testHpfBlock(self):
+        (filt, blockFilt) = (FirstOrderHpf(2.0, 0.01, 1.5), FirstOrderHpf(2.0, 0.01, 1.5))
+        expected = array([filt.step(x) for x in self.samples])
+        output = [blockFilt.stepBlock(self.samples[i:i + 50]) for i in xrange(0, 200, 50)]
+        self.assertTrue((array(output).reshape(expected.shape) == expected).all())
+
+    def testLpfBlock(self):
+        (filt, blockFilt) = (FirstOrderLpf(2.0, 0.01, 1.5), FirstOrderLpf(2.0, 0.01, 1.5))
+        expected = array([filt.step(x) for x in self.samples])
+        output = [blockFilt.stepBlock(self.samples[i:i + 50]) for i in xrange(0, 200, 50)]
+        assert_allclose(array(output).reshape(expected.shape), expected, rtol=1e-12)
+
+    def testScalarStateToChannels(self):
+        for filterType in (FirstOrderLpf, FirstOrderHpf):
+            (filt, stepFilt) = (filterType(2.0, 0.01, 1.5), filterType(2.0, 0.01, 1.5))
+            (filt.step(2.0), stepFilt.step(2.0))
+            expected = array([stepFilt.step(x) for x in ones((5, 3))])
+            assert_allclose(filt.stepBlock(ones((5, 3))), expected, rtol=1e-12)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(FirstOrderFilterTest)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,60 @@
+import unittest
+
+import lcm
+
+from marof.transport import HybridTransport, InProcTransport, LcmTransport
+from marof_lcm import orientation_t
+
+class HybridTransportTest(unittest.TestCase):
+    """ Test the loop back handling of the HybridTransport with an LCM instance that delivers the
+    published messages to its own subscribers, like LCM over multicast. """
+
+    def setUp(self):
+        self.lcm = lcm.LCM("memq://")
+        self.transport = HybridTransport(InProcTransport(), LcmTransport(self.lcm))
+        self.received = []
+        self.transport.subscribe("ORIENTATION", lambda c, m: self.received.append(m))
+
+    def orientation(self, heading):
+        msg = orientation_t()
+        msg.heading = heading
+        return msg
+
+    def testLocalMessageOnce(self):
+        msg = self.orientation(90.0)
+        self.transport.publish("ORIENTATION", msg)
+        self.lcm.handle()
+        self.assertEqual(self.received, [msg])
+
+    def testRemoteMessageOnPublishedChannel(self):
+        self.transport.publish("ORIENTATION", self.orientation(90.0))
+        self.lcm.handle()
+        remote = self.orientation(180.0).encode()
+        self.lcm.publish("ORIENTATION", remote)
+        self.lcm.handle()
+        self.assertEqual(len(self.received), 2)
+        self.assertEqual(self.received[1], remote)
+
+    def testRemoteCopyOfLocalMessage(self):
+        data = self.orientation(90.0).encode()
+        self.transport.publish("ORIENTATION", self.orientation(90.0))
+        self.lcm.publish("ORIENTATION", data) # the same message from a remote peer
+        self.lcm.handle()
+        self.lcm.handle()
+        self.assertEqual(len(self.received), 2)
+
+    def testUnsubscribedChannel(self):
+        # LCM does not loop back the messages of a channel without subscribers
+        for i in xrange(3):
+            self.transport.publish("HEADING", self.orientation(90.0))
+        for i in xrange(3):
+            self.lcm.handle()
+        received = []
+        self.transport.subscribe("HEADING", lambda c, m: received.append(m))
+        self.lcm.publish("HEADING", self.orientation(90.0).encode()) # from a remote peer
+        self.lcm.handle()
+        self.assertEqual(len(received), 1)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(HybridTransportTest)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+
+import lcm
+
+from marof import LcmDispatcher
+
+class CountingPoller(object):
+    """ Counts the polls of the poller of a dispatcher. """
+
+    def __init__(self, poller):
+        self._poller = poller
+        self.polls = 0
+
+    def poll(self, timeout):
+        self.polls += 1
+        return self._poller.poll(timeout)
+
+    def __getattr__(self, name):
+        return getattr(self._poller, name)
+
+class LcmDispatcherTest(unittest.TestCase):
+    """ Test the LcmDispatcher with LCM instances that deliver to their own subscribers. """
+
+    def setUp(self):
+        self.received = []
+        self.dispatcher = LcmDispatcher(maxBatch=16)
+
+    def tearDown(self):
+        self.dispatcher.stop()
+
+    def instance(self, channel):
+        lc = lcm.LCM("memq://")
+        lc.subscribe(channel, lambda c, data: self.received.append((c, data,
+                                                                     threading.current_thread())))
+        return lc
+
+    def waitFor(self, condition, timeout=2.0):
+        end = time.time() + timeout
+        while not condition() and time.time() < end:
+            time.sleep(0.001)
+        return condition()
+
+    def testStopWakesUp(self):
+        self.dispatcher.add(self.instance("A"))
+        thread = self.dispatcher.start()
+        self.assertTrue(self.waitFor(lambda: self.dispatcher.isRunning))
+        self.dispatcher.stop()
+        thread.join(1.0)
+        self.assertFalse(thread.isAlive())
+        self.assertFalse(self.dispatcher.isRunning)
+
+    def testReferences(self):
+        lc = self.instance("A")
+        self.dispatcher.add(lc)
+        self.dispatcher.add(lc)
+        thread = self.dispatcher.start()
+        self.dispatcher.remove(lc)
+        lc.publish("A", "1")
+        self.assertTrue(self.waitFor(lambda: len(self.received) == 1))
+        self.assertTrue(thread.isAlive())
+        self.dispatcher.remove(lc) # the last reference, so the dispatcher stops
+        thread.join(1.0)
+        self.assertFalse(thread.isAlive())
+
+    def testInstancesOnOneThread(self):
+        instances = [self.instance("A"), self.instance("B"), self.instance("C")]
+        for lc in instances:
+            self.dispatcher.add(lc)
+        for i in xrange(100):
+            for (lc, channel) in zip(instances, "ABC"):
+                lc.publish(channel, str(i))
+        thread = self.dispatcher.start()
+        self.assertTrue(self.waitFor(lambda: len(self.received) == 300))
+        for channel in "ABC":
+            self.assertEqual([data for (c, data, _) in self.received if c == channel],
+                             [str(i) for i in xrange(100)])
+        self.assertEqual(set(t for (_, _, t) in self.received), set([thread]))
+        # round robin: the first batch of every instance comes before the rest of the others
+        self.assertEqual(set(c for (c, _, _) in self.received[:48]), set("ABC"))
+
+    def testBatches(self):
+        lc = self.instance("A")
+        self.dispatcher.add(lc)
+        for i in xrange(160):
+            lc.publish("A", str(i))
+        poller = CountingPoller(self.dispatcher._poller)
+        self.dispatcher._poller = poller
+        self.dispatcher.start()
+        self.assertTrue(self.waitFor(lambda: len(self.received) == 160))
+        self.assertTrue(poller.polls <= 12, poller.polls) # 10 batches of 16 and the wake ups
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(LcmDispatcherTest)
+    unittest.TextTestRunner(verbosity=2).run(suite)
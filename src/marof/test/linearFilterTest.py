@@ -0,0 +1,55 @@
+import unittest
+
+from numpy import array, ones, random
+from numpy.testing import assert_allclose
+from scipy.signal import lfilter
+
+from marof.filter import LinearFilter
+from marof.model import StateSpace, TransferFunction
+
+class LinearFilterTest(unittest.TestCase):
+    """ Test the LinearFilter against scipy.signal.lfilter. The inputs start with 0, so the
+    steady state the filter starts in is the zero state of lfilter. """
+
+    def setUp(self):
+        self.impulse = array([0, 1.0, 0, 0, 0, 0])
+        self.samples = random.RandomState(1).randn(50)
+        self.samples[0] = 0
+
+    def check(self, filt, num, den):
+        for x in (self.impulse, self.samples):
+            expected = lfilter(num, den, x)
+            filt.reset()
+            assert_allclose([filt.step(v) for v in x], expected, atol=1e-12)
+            filt.reset()
+            assert_allclose(filt.stepBlock(x), expected, atol=1e-12)
+
+    def testStrictlyProper(self):
+        filt = LinearFilter(TransferFunction([1.0], [1.0, -0.5], 1))
+        filt.reset()
+        assert_allclose([filt.step(v) for v in self.impulse], [0, 0, 1.0, 0.5, 0.25, 0.125])
+        self.check(filt, [0, 1.0], [1.0, -0.5])
+
+    def testTwoSamplesDelay(self):
+        den = [1.0, -0.5, 0.06, 0.1]
+        self.check(LinearFilter(TransferFunction([2.0, 1.0], den, 1)), [0, 0, 2.0, 1.0], den)
+
+    def testProper(self):
+        (num, den) = ([0.5, 0.2, 0.1], [1.0, -0.5, 0.06])
+        self.check(LinearFilter(TransferFunction(num, den, 1)), num, den)
+
+    def testStateSpace(self):
+        # the controllable canonical form of (0.3 z + 0.1)/(z^2 - 0.9 z + 0.2)
+        (A, B, C, D) = ([[0.9, -0.2], [1.0, 0]], [[1.0], [0]], [[0.3, 0.1]], [[0]])
+        self.check(LinearFilter(StateSpace(A, B, C, D, 1)), [0, 0.3, 0.1], [1.0, -0.9, 0.2])
+
+    def testScalarStateToChannels(self):
+        (filt, stepFilt) = (LinearFilter.butterworth(2, 1.0, 0.1),
+                            LinearFilter.butterworth(2, 1.0, 0.1))
+        (filt.step(2.0), stepFilt.step(2.0))
+        expected = array([stepFilt.step(x) for x in ones((5, 3))])
+        assert_allclose(filt.stepBlock(ones((5, 3))), expected, rtol=1e-12)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(LinearFilterTest)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,189 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from marof import EncodedMessage, Transport, getMonotonicSeconds
+from marof.log import LogPlayer, LogReader, LogWriter
+
+class RecordingTransport(Transport):
+    """ Keeps the published messages with the time they were published. onPublish is called
+    with the number of messages published so far, so a test can act during a replay. """
+
+    def __init__(self, onPublish=None):
+        self.published = []
+        self._onPublish = onPublish
+
+    def publish(self, channel, lcmMsg):
+        self.published.append((getMonotonicSeconds(), channel, lcmMsg))
+        if self._onPublish is not None:
+            self._onPublish(len(self.published))
+
+    def subscribe(self, channel, function):
+        return None
+
+    def unsubscribe(self, subscription):
+        return
+
+class LogTest(unittest.TestCase):
+    """ Test writing and reading logs, with the index, channel filters, logs that were not closed
+    and times that go backwards. """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'test.log')
+        # 100 messages 50 ms apart on two channels, 1 s index blocks
+        self.events = [(1000000000 + i*50000, "IMU" if i % 2 else "MOTOR_COMMAND", "data%d" % i)
+                       for i in xrange(100)]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, events, close=True):
+        writer = LogWriter(self.filename, indexInterval=1.0)
+        for event in events:
+            writer.write(*event)
+        if close:
+            writer.close()
+        else:
+            writer.flush()
+        return writer
+
+    def inRange(self, events, startTime, endTime):
+        return [e for e in events if startTime <= e[0] <= endTime]
+
+    def testRoundTrip(self):
+        writer = self.write(self.events)
+        self.assertEqual(writer.events, len(self.events))
+        self.assertEqual(list(LogReader(self.filename)), self.events)
+
+    def testIndex(self):
+        self.write(self.events)
+        index = LogReader(self.filename).index
+        self.assertEqual(len(index), 5)
+        self.assertEqual(sum(count for (_, _, _, count) in index), len(self.events))
+        self.assertEqual(index[0][0:2], (self.events[0][0], self.events[19][0]))
+        self.assertEqual(index[-1][0:2], (self.events[80][0], self.events[-1][0]))
+
+    def testTimeRange(self):
+        self.write(self.events)
+        reader = LogReader(self.filename)
+        (startTime, endTime) = (self.events[25][0], self.events[61][0])
+        self.assertEqual(list(reader.events(startTime, endTime)),
+                         self.inRange(self.events, startTime, endTime))
+        self.assertEqual(list(reader.events(startTime=self.events[-1][0] + 1)), [])
+
+    def testChannels(self):
+        self.write(self.events)
+        reader = LogReader(self.filename)
+        self.assertEqual(list(reader.events(channels="IMU")),
+                         [e for e in self.events if e[1] == "IMU"])
+        self.assertEqual(list(reader.events(channels="IM")), [])
+        self.assertEqual(len(list(reader.events(channels="IMU|MOTOR.*"))), len(self.events))
+
+    def testNotClosed(self):
+        self.write(self.events, close=False)
+        reader = LogReader(self.filename)
+        self.assertEqual(list(reader), self.events)
+        self.assertEqual(sum(count for (_, _, _, count) in reader.index), len(self.events))
+        (startTime, endTime) = (self.events[85][0], self.events[95][0])
+        self.assertEqual(list(reader.events(startTime, endTime)),
+                         self.inRange(self.events, startTime, endTime))
+
+    def testTruncated(self):
+        self.write(self.events, close=False)
+        size = os.path.getsize(self.filename)
+        with open(self.filename, 'r+b') as f:
+            f.truncate(size - 3) # in the data of the last message
+        reader = LogReader(self.filename)
+        self.assertEqual(list(reader), self.events[:-1])
+        self.assertEqual(list(reader.events(startTime=self.events[90][0])), self.events[90:-1])
+
+    def testTimesGoBack(self):
+        # the clock is set back by 3 s after 60 messages
+        events = [(utime - 3000000 if i >= 60 else utime, channel, data)
+                  for (i, (utime, channel, data)) in enumerate(self.events)]
+        self.write(events)
+        reader = LogReader(self.filename)
+        self.assertEqual(list(reader), events)
+        for (startTime, endTime) in ((events[10][0], events[30][0]),
+                                     (events[70][0], events[90][0]),
+                                     (events[0][0], events[59][0])):
+            self.assertEqual(list(reader.events(startTime, endTime)),
+                             self.inRange(events, startTime, endTime))
+
+class LogPlayerTest(unittest.TestCase):
+    """ Test replaying a log with the LogPlayer. """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'test.log')
+        # 1 s of messages at 100 Hz
+        self.events = [(1000000000 + i*10000, "IMU", "data%d" % i) for i in xrange(100)]
+        writer = LogWriter(self.filename)
+        for event in self.events:
+            writer.write(*event)
+        writer.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testAsFastAsPossible(self):
+        transport = RecordingTransport()
+        player = LogPlayer(self.filename, transport, speed=0)
+        start = getMonotonicSeconds()
+        self.assertEqual(player.run(), len(self.events))
+        self.assertTrue(getMonotonicSeconds() - start < 0.5)
+        self.assertEqual([(channel, msg) for (_, channel, msg) in transport.published],
+                         [(channel, data) for (_, channel, data) in self.events])
+        self.assertTrue(all(type(msg) is EncodedMessage for (_, _, msg) in transport.published))
+        self.assertEqual(player.published, len(self.events))
+        self.assertFalse(player.isRunning)
+
+    def testTimeRange(self):
+        transport = RecordingTransport()
+        player = LogPlayer(LogReader(self.filename), transport, speed=0)
+        self.assertEqual(player.run(self.events[10][0], self.events[19][0], "IMU"), 10)
+
+    def testSpeed(self):
+        transport = RecordingTransport()
+        LogPlayer(self.filename, transport, speed=4.0).run()
+        elapsed = transport.published[-1][0] - transport.published[0][0]
+        self.assertTrue(0.2 < elapsed < 0.35, elapsed)
+
+    def testSpeedChange(self):
+        # 0.2 s of the log at 4x, then the remaining 0.8 s at 1x
+        def onPublish(count):
+            if count == 20:
+                player.speed = 1.0
+        transport = RecordingTransport(onPublish)
+        player = LogPlayer(self.filename, transport, speed=4.0)
+        player.run()
+        times = [t for (t, _, _) in transport.published]
+        elapsed = times[-1] - times[0]
+        self.assertTrue(0.75 < elapsed < 0.95, elapsed)
+        self.assertTrue(max(b - a for (a, b) in zip(times, times[1:])) < 0.05)
+
+    def testStop(self):
+        def onPublish(count):
+            if count == 10:
+                player.stop()
+        transport = RecordingTransport(onPublish)
+        player = LogPlayer(self.filename, transport, speed=0)
+        self.assertEqual(player.run(), 10)
+        self.assertFalse(player.isRunning)
+
+    def testStopThread(self):
+        player = LogPlayer(self.filename, RecordingTransport(), speed=1.0)
+        thread = player.start()
+        time.sleep(0.1)
+        player.stop()
+        thread.join(1.0)
+        self.assertFalse(thread.isAlive())
+        self.assertTrue(0 < player.published < len(self.events))
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite([unittest.TestLoader().loadTestsFromTestCase(LogTest),
+                                unittest.TestLoader().loadTestsFromTestCase(LogPlayerTest)])
+    unittest.TextTestRunner(verbosity=2).run(suite)
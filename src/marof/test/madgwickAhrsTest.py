@@ -0,0 +1,87 @@
+import unittest
+from math import atan2, cos, degrees, radians, sin
+
+from numpy import array, dot, zeros
+
+from marof.sensor.MadgwickAhrs import MadgwickAhrs
+
+def quaternion(roll, pitch, heading):
+    """ The quaternion (w, x, y, z) of an orientation in degrees, in the convention of
+    MadgwickAhrs.orientation. """
+    (r, p, h) = (radians(roll)/2, radians(pitch)/2, -radians(heading)/2)
+    return (cos(r)*cos(p)*cos(h) + sin(r)*sin(p)*sin(h),
+            sin(r)*cos(p)*cos(h) - cos(r)*sin(p)*sin(h),
+            cos(r)*sin(p)*cos(h) + sin(r)*cos(p)*sin(h),
+            cos(r)*cos(p)*sin(h) - sin(r)*sin(p)*cos(h))
+
+def readings(roll, pitch, heading):
+    """ The accelerometer and magnetometer readings of a sensor at rest in an orientation. """
+    (w, x, y, z) = quaternion(roll, pitch, heading)
+    rotation = array([[1 - 2*(y*y + z*z), 2*(x*y - w*z), 2*(x*z + w*y)],
+                      [2*(x*y + w*z), 1 - 2*(x*x + z*z), 2*(y*z - w*x)],
+                      [2*(x*z - w*y), 2*(y*z + w*x), 1 - 2*(x*x + y*y)]])
+    acc = dot(rotation.T, [0, 0, 9.81])
+    mag = dot(rotation.T, [20.0, 0, -45.0]) # the field dips into the ground
+    return (acc, mag)
+
+def tiltCompensation(acc, mag):
+    """ The exact tilt compensated orientation (roll, pitch, heading) in degrees. Unlike
+    ImuDaemon.magAcc2Orientation(), the heading keeps the cross terms of roll and pitch. """
+    ((ax, ay, az), (mx, my, mz)) = (acc, mag)
+    roll = atan2(ay, az)
+    pitch = atan2(-ax, ay*sin(roll) + az*cos(roll))
+    bx = mx*cos(pitch) + (my*sin(roll) + mz*cos(roll))*sin(pitch)
+    by = my*cos(roll) - mz*sin(roll)
+    return (degrees(roll), degrees(pitch), degrees(atan2(by, bx)) % 360)
+
+class MadgwickAhrsTest(unittest.TestCase):
+    """ Test the fused orientation of a sensor at rest. """
+
+    def assertOrientation(self, actual, expected, places=2):
+        for (a, e) in zip(actual, expected):
+            self.assertAlmostEqual((a - e + 180) % 360 - 180, 0, places)
+
+    def testQuaternion(self):
+        ahrs = MadgwickAhrs()
+        (ahrs._q0, ahrs._q1, ahrs._q2, ahrs._q3) = quaternion(10, -20, 30)
+        self.assertOrientation(ahrs.orientation, (10, -20, 30), 9)
+
+    def testConvergence(self):
+        for angles in [(0, 0, 0), (10, -20, 30), (-25, 15, 200), (5, 5, 359.5),
+                       (30, -30, 120), (-30, 25, 290)]:
+            (acc, mag) = readings(*angles)
+            self.assertOrientation(tiltCompensation(acc, mag), angles, 9)
+            ahrs = MadgwickAhrs()
+            ahrs.updateBlock(zeros((12000, 3)), acc, mag, 0.01)
+            self.assertOrientation(ahrs.orientation, tiltCompensation(acc, mag))
+
+    def testGyro(self):
+        ahrs = MadgwickAhrs()
+        ahrs.updateBlock([(0, 0, -9.0)]*100, [], [], 0.1) # no correction without acc and mag
+        self.assertOrientation(ahrs.orientation, (0, 0, 90))
+        ahrs.updateBlock([(0, 0, 0)]*12000, *(readings(0, 0, 60) + (0.01,)))
+        self.assertOrientation(ahrs.orientation, (0, 0, 60))
+
+    def testUpdateBlockPairing(self):
+        gyro = [(1.0, -2.0, 3.0), (0.5, 0, -1.0), (2.0, 1.0, 0), (-1.0, 0.5, 0.5),
+                (0, 0, 4.0), (3.0, -1.0, 1.0)]
+        acc = [readings(10, 0, 0)[0], readings(-10, 5, 0)[0]]
+        mag = [readings(0, 0, a)[1] for a in (40, 80, 120)]
+        ahrs = MadgwickAhrs()
+        ahrs.updateBlock(array(gyro), array(acc), array(mag), 0.02)
+        # acc and mag sampled at a third and a half of the gyro rate
+        expected = MadgwickAhrs()
+        for (i, (a, m)) in enumerate([(0, 0), (0, 0), (0, 1), (1, 1), (1, 2), (1, 2)]):
+            expected.update(*(tuple(gyro[i]) + tuple(acc[a]) + tuple(mag[m]) + (0.02,)))
+        self.assertEqual(ahrs.quaternion, expected.quaternion)
+        # a single sample is used for the whole batch
+        ahrs.reset()
+        ahrs.updateBlock(gyro, tuple(acc[1]), mag[2].tolist(), 0.02)
+        expected.reset()
+        for g in gyro:
+            expected.update(*(tuple(g) + tuple(acc[1]) + tuple(mag[2]) + (0.02,)))
+        self.assertEqual(ahrs.quaternion, expected.quaternion)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(MadgwickAhrsTest)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,42 @@
+import unittest
+
+import lcm
+
+from marof import LcmTransport, MessageEncoder, decodeMessage, reusableMessage
+from marof_lcm import motorCommand_t
+
+class MessagesTest(unittest.TestCase):
+    """ Test that the fixed size messages encode like lcm-gen and can be published through LCM. """
+
+    def command(self, msg):
+        (msg.time, msg.speedPercent, msg.turnPercent) = (1234567890, 50.0, -12.5)
+        return msg
+
+    def testEncoderSameAsLcmGen(self):
+        data = MessageEncoder(motorCommand_t).encode(self.command(motorCommand_t()))
+        self.assertEqual(type(data), str)
+        self.assertEqual(data, self.command(motorCommand_t()).encode())
+
+    def testReusableSameAsLcmGen(self):
+        msg = self.command(reusableMessage(motorCommand_t))
+        self.assertTrue(isinstance(msg, motorCommand_t))
+        self.assertEqual(type(msg.encode()), str)
+        self.assertEqual(msg.encode(), self.command(motorCommand_t()).encode())
+
+    def testPublishPooledThroughLcm(self):
+        lc = lcm.LCM("memq://")
+        received = []
+        lc.subscribe("MOTOR_COMMAND", lambda channel, data: received.append(data))
+        transport = LcmTransport(lc)
+        msg = self.command(reusableMessage(motorCommand_t))
+        transport.publish("MOTOR_COMMAND", msg)
+        msg.speedPercent = 25.0
+        transport.publish("MOTOR_COMMAND", msg)
+        lc.handle()
+        lc.handle()
+        self.assertEqual([decodeMessage(motorCommand_t, d).speedPercent for d in received],
+                         [50.0, 25.0])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(MessagesTest)
+    unittest.TextTestRunner(verbosity=2).run(suite)
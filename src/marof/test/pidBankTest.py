@@ -0,0 +1,113 @@
+import unittest
+
+from numpy import array
+from numpy.random import RandomState
+
+from marof.control.HeadingPid import HeadingPid
+from marof.control.PidBank import PidBank
+from marof.control.PidController import PidController
+
+class LinearPid(PidController):
+    """ A PidController with plain state differences. """
+
+    def stateDifference(self, desired, current):
+        return desired - current
+
+    def publishUpdate(self):
+        pass
+
+class PidBankTest(unittest.TestCase):
+    """ Run a bank of two loops next to a HeadingPid and a PidController with the same gains. """
+
+    T = 0.1
+
+    def setUp(self):
+        self.bank = PidBank("PID_BANK", self.T)
+        self.heading = self.bank.addLoop("heading", 5, 0.1, 3, period=360)
+        self.speed = self.bank.addLoop("speed", 2, 0.5, 0.2, 0, 100)
+        self.headingPid = HeadingPid("Heading_PID", self.T, 5, 0.1, 3, 50)
+        self.speedPid = LinearPid("Speed_PID", self.T, 2, 0.5, 0.2)
+        self.speedPid.setLimits(0, 100)
+
+    def step(self, heading, speed):
+        """ Step the bank and the reference controllers with the given current states. """
+        self.bank.setCurrentState(self.heading, heading)
+        self.bank.setCurrentState(self.speed, speed)
+        self.headingPid.currentState = heading
+        self.speedPid.currentState = speed
+        self.bank.step()
+        self.headingPid.step()
+        self.speedPid.step()
+        self.assertAlmostEqual(self.bank.output[self.heading], self.headingPid.output, 9)
+        self.assertAlmostEqual(self.bank.output[self.speed], self.speedPid.output, 9)
+
+    def setDesired(self, heading, speed):
+        self.bank.setDesiredState(self.heading, heading)
+        self.bank.setDesiredState(self.speed, speed)
+        self.headingPid.desiredState = heading
+        self.speedPid.desiredState = speed
+
+    def testNames(self):
+        self.assertEqual(self.bank.names, ["heading", "speed"])
+        self.assertEqual(self.bank.loopIndex("speed"), self.speed)
+        self.assertRaises(AssertionError, self.bank.addLoop, "speed", 1, 0, 0)
+
+    def testMatchesControllers(self):
+        random = RandomState(7)
+        self.setDesired(90, 40)
+        for heading, speed in zip(random.uniform(0, 360, 200), random.uniform(0, 80, 200)):
+            self.step(heading, speed)
+
+    def testWrap(self):
+        # the shortest way from 350 to 10 is +20 degrees through north, not -340
+        self.setDesired(10, 0)
+        self.step(350, 0)
+        self.assertAlmostEqual(self.bank.stateDifference(array([10.0, 0]),
+                                                         array([350.0, 0]))[0], 20)
+        self.assertAlmostEqual(self.bank.stateDifference(array([350.0, 0]),
+                                                         array([10.0, 0]))[0], -20)
+        self.assertGreater(self.bank.output[self.heading], 0)
+        # crossing north must not kick the derivative by a whole turn
+        for heading in (355, 359, 3, 8, 12, 9, 1, 357):
+            self.step(heading, 0)
+        self.setDesired(190, 0)
+        for heading in (20, 15, 5, 355, 345):
+            self.step(heading, 0)
+
+    def testAntiWindup(self):
+        self.setDesired(180, 100)
+        for _ in xrange(200):
+            self.step(0, 0)
+        self.assertEqual(self.bank._errorSum[self.speed], 100)
+        self.assertEqual(self.bank._errorSum[self.heading], 100)
+        self.assertEqual(self.bank.output[self.speed], 100)
+        # the clamped integrator lets the output follow a reversed error right away
+        self.setDesired(180, 0)
+        self.step(0, 60)
+        self.assertLess(self.bank.output[self.speed], 100)
+        for _ in xrange(50):
+            self.step(270, 60)
+        self.assertEqual(self.bank.output[self.speed], 0)
+        self.assertEqual(self.bank.output[self.heading], -100)
+
+    def testSetLimits(self):
+        self.setDesired(180, 100)
+        for _ in xrange(200):
+            self.step(0, 0)
+        self.bank.setLimits(self.heading, -30, 30)
+        self.bank.setLimits(self.speed, 0, 50)
+        self.headingPid.setLimits(-30, 30)
+        self.speedPid.setLimits(0, 50)
+        # the output and the integrator are clamped to the new limits at once
+        self.assertEqual(self.bank.output[self.heading], 30)
+        self.assertEqual(self.bank._errorSum[self.speed], 50)
+        self.assertEqual(self.bank.output[self.speed], 50)
+        self.setDesired(180, 20)
+        for _ in xrange(20):
+            self.step(0, 90)
+        self.assertEqual(self.bank.output[self.speed], 0)
+        self.assertRaises(AssertionError, self.bank.setLimits, self.speed, 50, 50)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(PidBankTest)
+    unittest.TextTestRunner(verbosity=2).run(suite)
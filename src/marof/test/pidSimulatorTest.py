@@ -0,0 +1,90 @@
+import unittest
+
+from numpy import array, dot, inf
+from numpy.testing import assert_allclose
+
+from marof.control import PidSimulator
+from marof.control.PidController import PidController
+from marof.model import StateSpace
+
+class Pid(PidController):
+    """ A PidController with the state difference of PidSimulator. """
+
+    def __init__(self, kp, ki, kd, Ts, period):
+        super(Pid, self).__init__("PID", Ts, kp, ki, kd)
+        self._period = period
+
+    def stateDifference(self, desired, current):
+        diff = desired - current
+        if self._period is None:
+            return diff
+        diff %= self._period
+        return diff - self._period if diff > 0.5*self._period else diff
+
+    def publishUpdate(self):
+        pass
+
+def simulate(plant, limits, kp, ki, kd, setpoint, duration, disturbance, x0, period,
+             tolerance=0.02):
+    """ The closed loop of one PidController, step by step. """
+    (A, B, C) = (array(plant.A), array(plant.B)[:, 0], array(plant.C)[0])
+    Ts = plant.Ts
+    steps = int(round(duration/Ts))
+    pid = Pid(kp, ki, kd, Ts, period)
+    pid.setLimits(*limits)
+    pid.desiredState = setpoint
+    x = array(x0, dtype=float)
+    current = dot(C, x)
+    pid._lastInput = current # the simulator starts without a derivative kick
+    initialError = abs(pid.stateDifference(setpoint, current))
+    direction = 1 if pid.stateDifference(setpoint, current) >= 0 else -1
+    (lastOutside, overshoot, saturated) = (-1, 0.0, 0)
+    for k in xrange(steps):
+        pid.currentState = current
+        pid.step()
+        error = pid.stateDifference(setpoint, current)
+        if abs(error) > tolerance*initialError:
+            lastOutside = k
+        overshoot = max(overshoot, -error*direction)
+        saturated += pid.output <= pid.minOutput or pid.output >= pid.maxOutput
+        x = dot(A, x) + B*(pid.output + disturbance)
+        current = dot(C, x)
+    error = pid.stateDifference(setpoint, current)
+    if abs(error) > tolerance*initialError:
+        lastOutside = steps
+    return {'settlingTime': inf if lastOutside >= steps else (lastOutside + 1)*Ts,
+            'overshoot': 100.0*overshoot/(initialError or 1.0),
+            'saturation': saturated/float(steps),
+            'finalError': error}
+
+class PidSimulatorTest(unittest.TestCase):
+    """ Test the batched PidSimulator against PidController stepped one combination at a
+    time. """
+
+    def setUp(self):
+        # a motor with a time constant of about 1 s driving a heading
+        self.plant = StateSpace([[1.0, 0.1], [0, 0.9]], [[0], [0.1]], [[1.0, 0]], [[0]], 0.1)
+
+    def check(self, sim, kp, ki, kd, setpoint, disturbance, x0, period):
+        stats = sim.run(kp, ki, kd, setpoint, 10.0, disturbance, x0)
+        for i in xrange(len(kp)):
+            expected = simulate(self.plant, (sim.minOutput, sim.maxOutput), kp[i], ki[i], kd[i],
+                                setpoint, 10.0, disturbance, x0, period)
+            for name in ('settlingTime', 'overshoot', 'saturation', 'finalError'):
+                assert_allclose(stats[name][i], expected[name], rtol=1e-9, atol=1e-9,
+                                err_msg="%s of combination %d" % (name, i))
+
+    def testGains(self):
+        (kp, ki, kd) = ([1.0, 2.0, 5.0, 20.0], [0, 0.5, 1.0, 0.2], [0, 0.2, 1.0, 0.5])
+        self.check(PidSimulator(self.plant), kp, ki, kd, 30.0, 3.0, [0, 0], None)
+
+    def testHeadingWrap(self):
+        (kp, ki, kd) = ([1.0, 5.0], [0.1, 0.5], [0.5, 1.0])
+        sim = PidSimulator(self.plant, -50, 50, period=360)
+        self.check(sim, kp, ki, kd, 350.0, 0.0, [10.0, 0], 360)
+        stats = sim.run(kp, ki, kd, 350.0, 10.0, x0=[10.0, 0])
+        self.assertTrue((abs(stats['finalError']) < 20).all()) # turned left, not 340 deg right
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(PidSimulatorTest)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,77 @@
+from marof import MarofModule, Transport, getFastMicroSeconds, getMonotonicSeconds
+from marof_lcm import motorCommand_t
+
+class EncodingTransport(Transport):
+    """ Encodes the published messages like an LcmTransport without sending them. If retain is
+    True, the messages and the encoded data are kept, so no object is freed and reused while
+    publishing and the number of distinct objects is the number allocated. The encoded data must
+    be a string, as LCM publishes nothing else. """
+
+    def __init__(self, retain):
+        self.published = []
+        self._retain = retain
+
+    def publish(self, channel, lcmMsg):
+        data = lcmMsg.encode()
+        assert isinstance(data, str), 'The message is not encoded into a string'
+        if self._retain:
+            self.published.append((lcmMsg, data))
+
+    def subscribe(self, channel, function):
+        return None
+
+    def unsubscribe(self, subscription):
+        return
+
+    def allocations(self):
+        """ The number of distinct message objects and encoded messages published. """
+        return (len(set(id(msg) for (msg, _) in self.published)) +
+                len(set(id(data) for (_, data) in self.published)))
+
+class CommandModule(MarofModule):
+    """ Publishes a motor command every update, like HeadingPid. """
+
+    def __init__(self, pooled):
+        super(CommandModule, self).__init__("PUBLISH_BENCHMARK", 0.01, statsInterval=0)
+        self._pooled = pooled
+        self._commandMsg = self.pooledMessage(self.name, motorCommand_t)
+
+    def step(self):
+        pass
+
+    def publishUpdate(self):
+        msg = self._commandMsg if self._pooled else motorCommand_t()
+        msg.time = getFastMicroSeconds()
+        msg.speedPercent = 50.0
+        msg.turnPercent = -12.5
+        self.publish(self.name, msg)
+
+def benchmark(pooled, ticks):
+    """ Publish a message every tick.
+
+    :returns: a tuple (allocations per tick, microseconds per tick)
+    """
+    module = CommandModule(pooled)
+    transport = EncodingTransport(retain=True)
+    module.setTransport(transport)
+    for i in xrange(ticks):
+        module.publishUpdate()
+    allocations = transport.allocations()
+
+    module.setTransport(EncodingTransport(retain=False))
+    elapsed = []
+    for repeat in xrange(3):
+        start = getMonotonicSeconds()
+        for i in xrange(ticks):
+            module.publishUpdate()
+        elapsed.append(getMonotonicSeconds() - start)
+    return (allocations/float(ticks), min(elapsed)/ticks*1e6)
+
+if __name__ == "__main__":
+    ticks = 100000
+    print "Ticks per publish path:", ticks
+    (newAllocations, newTime) = benchmark(False, ticks)
+    print "New message per tick: %.2f allocations/tick, %.2f us/tick" % (newAllocations, newTime)
+    (pooledAllocations, pooledTime) = benchmark(True, ticks)
+    print "Pooled message: %.2f allocations/tick, %.2f us/tick, speedup: %.1fx" % \
+          (pooledAllocations, pooledTime, newTime/pooledTime)
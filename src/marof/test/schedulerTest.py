@@ -0,0 +1,68 @@
+import unittest
+
+from marof import Scheduler
+
+class FakeClock(object):
+    """ A clock that only moves when it is set, or by step on every reading. """
+
+    def __init__(self, step=0.0):
+        self.now = 100.0
+        self.step = step
+
+    def __call__(self):
+        now = self.now
+        self.now += self.step
+        return now
+
+class TestScheduler(unittest.TestCase):
+    """ Unit tests for the Scheduler class. """
+
+    def scheduler(self, policy, clock, delay=0.0):
+        scheduler = Scheduler(1.0, policy, spinTime=10.0, clock=clock) # always spin, never sleep
+        scheduler.start(delay)
+        return scheduler
+
+    def testOnTime(self):
+        clock = FakeClock(step=0.01)
+        scheduler = self.scheduler(Scheduler.CATCH_UP, clock, delay=0.5)
+        for _ in xrange(3):
+            lateness = scheduler.wait()
+            self.assertTrue(0 <= lateness < 0.02)
+        self.assertEqual(scheduler.ticks, 3)
+        self.assertEqual(scheduler.overruns, 0)
+
+    def testCatchUp(self):
+        clock = FakeClock()
+        scheduler = self.scheduler(Scheduler.CATCH_UP, clock)
+        clock.now += 2.5
+        self.assertAlmostEqual(scheduler.wait(), 2.5)
+        self.assertAlmostEqual(scheduler.wait(), 1.5) # the missed ticks run back to back
+        self.assertAlmostEqual(scheduler.wait(), 0.5)
+        self.assertEqual(scheduler.overruns, 3)
+        self.assertEqual(scheduler.missedTicks, 0)
+
+    def testSkip(self):
+        clock = FakeClock()
+        scheduler = self.scheduler(Scheduler.SKIP, clock)
+        clock.now += 2.5
+        self.assertAlmostEqual(scheduler.wait(), 2.5)
+        self.assertEqual(scheduler.missedTicks, 2)
+        self.assertAlmostEqual(scheduler.maxLateness, 2.5)
+        clock.step = 0.01
+        self.assertTrue(0 <= scheduler.wait() < 0.02) # the phase of the deadlines is kept
+        self.assertAlmostEqual(clock.now % 1.0, 0.0, delta=0.02)
+
+    def testPhaseReset(self):
+        clock = FakeClock()
+        scheduler = self.scheduler(Scheduler.PHASE_RESET, clock)
+        clock.now += 2.5
+        self.assertAlmostEqual(scheduler.wait(), 2.5)
+        self.assertAlmostEqual(scheduler.lateness, 2.5)
+        self.assertEqual(scheduler.overruns, 1)
+        clock.step = 0.01
+        self.assertTrue(0 <= scheduler.wait() < 0.02)
+        self.assertAlmostEqual(clock.now % 1.0, 0.5, delta=0.02) # the ticks follow the late one
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestScheduler)
+    unittest.TextTestRunner(verbosity=2).run(suite)
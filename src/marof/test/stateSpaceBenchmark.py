@@ -0,0 +1,43 @@
+import timeit
+
+from numpy import array, mat, random
+
+from marof.model import StateSpace, StateSpaceSimulator
+from marof.model.StateSpace import stepSS
+
+def stepAll(ss, u):
+    """ Run the inputs through stepSS and return the states. """
+    x = mat([[0.0]]*ss.A.shape[0])
+    states = []
+    for uk in u:
+        states.append(array(x).ravel())
+        (x, _) = stepSS(None, ss, x, uk)
+    return array(states)
+
+if __name__ == "__main__":
+    number = 20000
+    # a 4 state model of two coupled masses sampled at 100 Hz
+    ss = StateSpace([[1, 0.01, 0, 0],
+                     [-0.02, 0.99, 0.01, 0],
+                     [0, 0, 1, 0.01],
+                     [0.01, 0, -0.03, 0.98]],
+                    [[0], [0.01], [0], [0]],
+                    [[1, 0, 0, 0], [0, 0, 1, 0]],
+                    [[0], [0]], 0.01)
+    simulator = StateSpaceSimulator(ss)
+    u = random.randn(number)
+    x = mat([[0.0]]*4)
+    
+    stepSSTime = min(timeit.repeat(lambda: stepSS(None, ss, x, 0.5), repeat=3, number=number))
+    stepTime = min(timeit.repeat(lambda: simulator.step(0.5), repeat=3, number=number))
+    simulateTime = min(timeit.repeat(lambda: simulator.simulate(u), repeat=3, number=1))
+    
+    print "Per step cost of a 4 state model:"
+    print "stepSS: %.3f us" % (stepSSTime/number*1e6)
+    print "StateSpaceSimulator.step: %.3f us (%.1fx faster)" % (stepTime/number*1e6, 
+                                                               stepSSTime/stepTime)
+    print "StateSpaceSimulator.simulate of %d inputs: %.3f us (%.1fx faster)" % (number, 
+                                                               simulateTime/number*1e6, 
+                                                               stepSSTime/simulateTime)
+    simulator.reset()
+    print "Difference of states:", abs(stepAll(ss, u) - simulator.simulate(u)[1]).max()
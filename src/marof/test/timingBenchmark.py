@@ -0,0 +1,20 @@
+import timeit
+
+from marof import getMicroSeconds, getMilliSeconds, getSeconds
+from marof import getFastMicroSeconds, getFastMilliSeconds, getFastSeconds
+
+if __name__ == "__main__":
+    number = 100000
+    functions = (("getMicroSeconds", "getFastMicroSeconds"),
+                 ("getMilliSeconds", "getFastMilliSeconds"),
+                 ("getSeconds", "getFastSeconds"))
+    
+    print "Calls per function:", number
+    for (slow, fast) in functions:
+        slowTime = min(timeit.repeat(slow + "()", "from marof import " + slow, repeat=3, number=number))
+        fastTime = min(timeit.repeat(fast + "()", "from marof import " + fast, repeat=3, number=number))
+        print "%s: %.3f us, %s: %.3f us, speedup: %.1fx" % (slow, slowTime/number*1e6, 
+                                                           fast, fastTime/number*1e6, 
+                                                           slowTime/fastTime)
+    
+    print "Difference between clocks:", getFastMicroSeconds() - getMicroSeconds(), "us"
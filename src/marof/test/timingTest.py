@@ -0,0 +1,30 @@
+import os
+import time
+import unittest
+
+from marof import getMicroSeconds, getFastMicroSeconds, getSeconds, getFastSeconds
+
+class TestTiming(unittest.TestCase):
+    """ Unit tests for the clocks in the timing module. """
+
+    def setUp(self):
+        self._tz = os.environ.get('TZ')
+
+    def tearDown(self):
+        if self._tz is None:
+            del os.environ['TZ']
+        else:
+            os.environ['TZ'] = self._tz
+        time.tzset()
+
+    def testClocksAgreeInEveryTimeZone(self):
+        for tz in ('UTC', 'America/New_York', 'Asia/Kolkata'):
+            os.environ['TZ'] = tz
+            time.tzset()
+            self.assertLess(abs(getFastMicroSeconds() - getMicroSeconds()), 100000, tz)
+            self.assertLessEqual(abs(getFastSeconds() - getSeconds()), 1, tz)
+            self.assertLess(abs(getMicroSeconds()*1e-6 - time.time()), 0.1, tz)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestTiming)
+    unittest.TextTestRunner(verbosity=2).run(suite)
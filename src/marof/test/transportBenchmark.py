@@ -0,0 +1,55 @@
+import threading
+
+from marof import InProcTransport, LcmTransport, LcmDispatcher, decodeMessage
+from marof import getMonotonicSeconds
+from marof_lcm import sensorData_t
+
+class Counter(object):
+    """ A subscriber that decodes and counts messages. """
+    
+    def __init__(self, expected):
+        self.count = 0
+        self.expected = expected
+        self.done = threading.Event()
+        
+    def handle(self, channel, data):
+        msg = decodeMessage(sensorData_t, data)
+        self.count += 1
+        if self.count == self.expected:
+            self.done.set()
+
+def benchmark(transport, number, dispatcher=None):
+    """ Publish messages through the transport and measure the rate they are received at. 
+    
+    :returns: a tuple (messages received, messages per second)
+    """
+    counter = Counter(number)
+    subscription = transport.subscribe("TRANSPORT_BENCHMARK", counter.handle)
+    if dispatcher is not None:
+        dispatcher.add(transport.lcm)
+        thread = dispatcher.start()
+    
+    msg = sensorData_t()
+    start = getMonotonicSeconds()
+    for i in xrange(number):
+        msg.time = i
+        msg.data = i
+        transport.publish("TRANSPORT_BENCHMARK", msg)
+    counter.done.wait(5.0) # LCM over UDP can drop messages, so do not wait forever
+    elapsed = getMonotonicSeconds() - start
+    
+    if dispatcher is not None:
+        dispatcher.remove(transport.lcm)
+        thread.join()
+    transport.unsubscribe(subscription)
+    return (counter.count, counter.count/elapsed)
+
+if __name__ == "__main__":
+    number = 20000
+    print "Messages published per transport:", number
+    
+    (received, rate) = benchmark(InProcTransport(), number)
+    print "InProcTransport: %d received, %.0f messages/sec" % (received, rate)
+    
+    (received, rate) = benchmark(LcmTransport(), number, LcmDispatcher())
+    print "LcmTransport (UDP multicast): %d received, %.0f messages/sec" % (received, rate)
@@ -0,0 +1,96 @@
+import sys
+import unittest
+
+from numpy import array
+from numpy.testing import assert_allclose
+from scipy.signal import cont2discrete
+
+from marof.model import StateSpace, clearZoheCache, zohe, zoheBatch, zoheCacheInfo
+
+zoheModule = sys.modules['marof.model.zohe']
+
+class ZoheTest(unittest.TestCase):
+    """ Test the zero order hold equivalents and their cache against scipy. """
+
+    def setUp(self):
+        clearZoheCache(64)
+        self.expmCalls = 0
+        self.expm = zoheModule.expm
+        def countingExpm(M):
+            self.expmCalls += 1
+            return self.expm(M)
+        zoheModule.expm = countingExpm
+        # a damped oscillator, which is diagonalizable
+        self.oscillator = StateSpace(array([[0, 1.0], [-4.0, -0.8]]), array([[0], [1.0]]),
+                                     array([[1.0, 0]]), array([[0.0]]))
+        # a double integrator, which is defective
+        self.integrator = StateSpace(array([[0, 1.0], [0, 0]]), array([[0], [1.0]]),
+                                     array([[1.0, 0]]), array([[0.0]]))
+
+    def tearDown(self):
+        zoheModule.expm = self.expm
+        clearZoheCache(64)
+
+    def expected(self, ss, T):
+        (phi, gamma, _, _, _) = cont2discrete((ss.A, ss.B, ss.C, ss.D), T, 'zoh')
+        return (phi, gamma)
+
+    def check(self, ss, Ts):
+        for (model, T) in zip(zoheBatch(ss, Ts), Ts):
+            (phi, gamma) = self.expected(ss, T)
+            assert_allclose(model.A, phi, atol=1e-10)
+            assert_allclose(model.B, gamma, atol=1e-10)
+            self.assertEqual(model.Ts, T)
+            self.assertTrue(model.discrete)
+        for T in Ts:
+            (phi, gamma) = zohe(ss.A, ss.B, T)
+            assert_allclose(phi, self.expected(ss, T)[0], atol=1e-10)
+            assert_allclose(gamma, self.expected(ss, T)[1], atol=1e-10)
+
+    def testDiagonalizable(self):
+        self.check(self.oscillator, [0.01, 0.05, 0.1, 0.5])
+        self.assertEqual(self.expmCalls, 0) # one eigendecomposition, cached for zohe()
+
+    def testDefective(self):
+        self.check(self.integrator, [0.01, 0.1, 1.0])
+        self.assertEqual(self.expmCalls, 3) # the expm fallback for every time step
+
+    def testHitsAndMisses(self):
+        zohe(self.oscillator.A, self.oscillator.B, 0.1)
+        zohe(self.oscillator.A, self.oscillator.B, 0.1)
+        zohe(array(self.oscillator.A), array(self.oscillator.B), 0.1) # same content
+        zohe(self.oscillator.A, self.oscillator.B, 0.2)
+        self.assertEqual(zoheCacheInfo(), (2, 2, 2, 64))
+        zoheBatch(self.oscillator, [0.1, 0.2, 0.3])
+        self.assertEqual(zoheCacheInfo(), (4, 3, 3, 64))
+        clearZoheCache()
+        self.assertEqual(zoheCacheInfo(), (0, 0, 0, 64))
+
+    def testEviction(self):
+        clearZoheCache(2)
+        (A, B) = (self.integrator.A, self.integrator.B)
+        zohe(A, B, 0.1)
+        zohe(A, B, 0.2)
+        zohe(A, B, 0.1) # now the most recently used
+        zohe(A, B, 0.3) # evicts 0.2
+        self.assertEqual(zoheCacheInfo(), (1, 3, 2, 2))
+        zohe(A, B, 0.1)
+        self.assertEqual(zoheCacheInfo()[0:2], (2, 3))
+        zohe(A, B, 0.2)
+        self.assertEqual(zoheCacheInfo()[0:2], (2, 4))
+        self.assertEqual(self.expmCalls, 4)
+
+    def testCopies(self):
+        (A, B) = (self.oscillator.A, self.oscillator.B)
+        (phi, gamma) = zohe(A, B, 0.1)
+        (expectedPhi, expectedGamma) = (phi.copy(), gamma.copy())
+        phi[:] = 0
+        gamma[:] = 0
+        zoheBatch(self.oscillator, [0.1])[0].A[:] = 0
+        (phi, gamma) = zohe(A, B, 0.1)
+        assert_allclose(phi, expectedPhi)
+        assert_allclose(gamma, expectedGamma)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(ZoheTest)
+    unittest.TextTestRunner(verbosity=2).run(suite)
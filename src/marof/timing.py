@@ -1,23 +1,121 @@
-from time import mktime
+from calendar import timegm
+from time import time
 from datetime import datetime
+import threading
 """
 Contains timing functions that are useful for timestamps.
 """
 
+try:
+    from time import monotonic as _monotonic
+except ImportError:
+    # Python 2 has no monotonic clock, so call clock_gettime(CLOCK_MONOTONIC) directly
+    import ctypes
+    import ctypes.util
+    
+    class _Timespec(ctypes.Structure):
+        _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+    
+    _CLOCK_MONOTONIC = 1
+    try:
+        _librt = ctypes.CDLL(ctypes.util.find_library('rt') or 'libc.so.6', use_errno=True)
+        _clock_gettime = _librt.clock_gettime
+        _clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(_Timespec)]
+        _timespec = _Timespec()
+        _timespecRef = ctypes.byref(_timespec)
+        # ctypes releases the GIL during the call, so the shared timespec is guarded by a lock
+        _timespecLock = threading.Lock()
+        
+        def _monotonic():
+            with _timespecLock:
+                if _clock_gettime(_CLOCK_MONOTONIC, _timespecRef) != 0:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, "clock_gettime failed")
+                return _timespec.tv_sec + _timespec.tv_nsec * 1e-9
+    except (OSError, AttributeError):
+        _monotonic = time # no monotonic clock available, fall back to the wall clock
+
+def getMonotonicSeconds():
+    """ Gets the time in seconds from a monotonic clock. The clock is not affected by changes to
+    the system time and should only be used to measure intervals.
+    
+    :returns: seconds since an arbitrary point in the past as a float
+    """
+    return _monotonic()
+
+class EpochClock(object):
+    """ A fast clock for timestamps in the epoch in UTC. The time is read from the monotonic clock
+    plus a cached offset to the epoch, which avoids the calendar conversions of getMicroSeconds().
+    The offset is re-synced with the system time every resyncInterval seconds so the clock follows
+    changes to the system time without jumping between re-syncs.
+    
+    :param resyncInterval: default 10 sec, the interval between re-syncs of the epoch offset
+    """
+    
+    def __init__(self, resyncInterval=10.0):
+        assert resyncInterval > 0, 'Resync interval is negative or 0'
+        self._resyncInterval = resyncInterval
+        self._offset = 0 # microseconds from the monotonic clock to the epoch
+        self._nextResync = 0.0
+        self.resync()
+    
+    def resync(self):
+        """ Re-sync the epoch offset with the system time. """
+        before = _monotonic()
+        epoch = time()
+        after = _monotonic()
+        self._offset = int(epoch*1000000) - int((before + after)*500000)
+        self._nextResync = after + self._resyncInterval
+    
+    def getMicroSeconds(self):
+        """ Gets the time in microseconds since the epoch in UTC.
+        
+        :returns: microseconds since the epoch in UTC as an integer
+        """
+        now = _monotonic()
+        if now >= self._nextResync:
+            self.resync()
+        return int(now*1000000) + self._offset
+    
+    def getMilliSeconds(self):
+        """ Gets the time in milliseconds since the epoch in UTC.
+        
+        :returns: milliseconds since the epoch in UTC as an integer
+        """
+        return self.getMicroSeconds() // 1000
+    
+    def getSeconds(self):
+        """ Gets the time in seconds since the epoch in UTC.
+        
+        :returns: seconds since the epoch in UTC as an integer
+        """
+        return self.getMicroSeconds() // 1000000
+    
+    @property
+    def resyncInterval(self):
+        """ The interval between re-syncs of the epoch offset in seconds. """
+        return self._resyncInterval
+
+_epochClock = EpochClock()
+
+getFastMicroSeconds = _epochClock.getMicroSeconds
+getFastMilliSeconds = _epochClock.getMilliSeconds
+getFastSeconds = _epochClock.getSeconds
+
 def getMicroSeconds():
     """ Gets the time in microseconds since the epoch in UTC.
     
     :returns microseconds since the epoch in UTC as a long
     """
     now = datetime.utcnow()
-    return long((mktime(now.timetuple()) + 1e-6*now.microsecond)*1e6)
+    return long((timegm(now.timetuple()) + 1e-6*now.microsecond)*1e6)
 
 def getSeconds():
     """ Gets the time in seconds since the epoch in UTC.
     
     :returns seconds since the epoch in UTC as a long
     """
-    return long(mktime(datetime.utcnow().timetuple()))
+    return long(timegm(datetime.utcnow().timetuple()))
 
 def getMilliSeconds():
     """ Gets the time in seconds since the epoch in UTC.
@@ -25,5 +123,5 @@ def getMilliSeconds():
     :returns seconds since the epoch in UTC as a long
     """
     now = datetime.utcnow()
-    return long((mktime(now.timetuple()) + 1e-6*now.microsecond)*1e3)
-    
\ No newline at end of file
+    return long((timegm(now.timetuple()) + 1e-6*now.microsecond)*1e3)
+    
@@ -0,0 +1,80 @@
+from collections import deque
+import threading
+
+from marof.transport import Transport, InProcTransport, LcmTransport
+
+class HybridTransport(Transport):
+    """ Passes messages to subscribers in the same process through a local transport and to 
+    remote peers through LCM. Messages received on LCM are passed to the local subscribers as 
+    well. The copies of its own messages that LCM loops back are recognised by their encoded data
+    and ignored, so messages that remote peers publish on the same channels still reach the local
+    subscribers.
+    
+    :param local: default None, the InProcTransport. If None, one is created.
+    :param remote: default None, the LcmTransport. If None, one is created.
+    """
+    
+    MAX_PENDING_ECHOES = 64 # the sent messages remembered per channel until LCM loops them back
+    
+    def __init__(self, local=None, remote=None):
+        self._local = InProcTransport() if local is None else local
+        self._remote = LcmTransport() if remote is None else remote
+        self._remoteSubscriptions = {} # [LCM subscription, number of local subscribers] by channel
+        self._pendingEchoes = {} # the encoded messages sent and not looped back yet, by channel
+        self._lock = threading.Lock()
+    
+    def publish(self, channel, lcmMsg):
+        self._local.publish(channel, lcmMsg)
+        data = lcmMsg.encode()
+        with self._lock:
+            # LCM loops back only the channels subscribed on it
+            if channel in self._remoteSubscriptions:
+                pending = self._pendingEchoes.get(channel)
+                if pending is None:
+                    pending = deque(maxlen=self.MAX_PENDING_ECHOES)
+                    self._pendingEchoes[channel] = pending
+                pending.append(data)
+        self._remote.lcm.publish(channel, data)
+    
+    def subscribe(self, channel, function):
+        with self._lock:
+            subscription = self._local.subscribe(channel, function)
+            if channel not in self._remoteSubscriptions:
+                remoteSubscription = self._remote.subscribe(channel, self._handleRemote)
+                self._remoteSubscriptions[channel] = [remoteSubscription, 0]
+            self._remoteSubscriptions[channel][1] += 1
+        return (channel, subscription)
+    
+    def unsubscribe(self, subscription):
+        (channel, localSubscription) = subscription
+        with self._lock:
+            self._local.unsubscribe(localSubscription)
+            if channel not in self._remoteSubscriptions:
+                return
+            self._remoteSubscriptions[channel][1] -= 1
+            if self._remoteSubscriptions[channel][1] == 0:
+                self._remote.unsubscribe(self._remoteSubscriptions.pop(channel)[0])
+                self._pendingEchoes.pop(channel, None)
+    
+    @property
+    def local(self):
+        """ The transport to subscribers in the same process. """
+        return self._local
+    
+    @property
+    def remote(self):
+        """ The transport to remote peers. """
+        return self._remote
+    
+    @property
+    def lcm(self):
+        return self._remote.lcm
+    
+    def _handleRemote(self, channel, data):
+        """ Pass a message received on LCM to the local subscribers. """
+        with self._lock:
+            pending = self._pendingEchoes.get(channel)
+            if pending and data in pending:
+                pending.remove(data)
+                return # the loop back of a message published through this transport
+        self._local.publish(channel, data)
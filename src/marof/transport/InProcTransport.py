@@ -0,0 +1,43 @@
+import threading
+
+from marof.transport import Transport
+
+class InProcTransport(Transport):
+    """ Passes messages to subscribers in the same process without encoding them. The subscribers
+    are called on the publishing thread with the message object, so they must not keep or modify
+    it. Channels are matched exactly, they are not regular expressions.
+    """
+    
+    def __init__(self):
+        self._subscribers = {} # subscriber functions by channel
+        self._lock = threading.Lock()
+    
+    def publish(self, channel, lcmMsg):
+        for function in self._subscribers.get(channel, ()):
+            function(channel, lcmMsg)
+    
+    def subscribe(self, channel, function):
+        with self._lock:
+            # Replace the tuple instead of changing it so publish() can iterate without the lock
+            self._subscribers[channel] = self._subscribers.get(channel, ()) + (function,)
+        return (channel, function)
+    
+    def unsubscribe(self, subscription):
+        (channel, function) = subscription
+        with self._lock:
+            functions = list(self._subscribers.get(channel, ()))
+            if function not in functions:
+                return
+            functions.remove(function)
+            if len(functions) > 0:
+                self._subscribers[channel] = tuple(functions)
+            else:
+                del self._subscribers[channel]
+    
+    def hasSubscribers(self, channel):
+        """ Check if a channel has subscribers.
+        
+        :param channel: the channel string
+        :returns: True if the channel has at least one subscriber
+        """
+        return channel in self._subscribers
@@ -0,0 +1,29 @@
+import lcm
+
+from marof.transport import Transport
+
+class LcmTransport(Transport):
+    """ Publishes encoded messages through LCM. Subscriber channels are LCM regular expressions
+    and the subscribers are called with the encoded message when the LCM instance is handled,
+    for example by an LcmDispatcher.
+    
+    :param lc: default None, the LCM instance. If None, one is created when first needed.
+    """
+    
+    def __init__(self, lc=None):
+        self._lcm = lc
+    
+    def publish(self, channel, lcmMsg):
+        self.lcm.publish(channel, lcmMsg.encode())
+    
+    def subscribe(self, channel, function):
+        return self.lcm.subscribe(channel, function)
+    
+    def unsubscribe(self, subscription):
+        self.lcm.unsubscribe(subscription)
+    
+    @property
+    def lcm(self):
+        if self._lcm is None:
+            self._lcm = lcm.LCM()
+        return self._lcm
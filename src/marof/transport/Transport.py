@@ -0,0 +1,41 @@
+import abc
+
+class Transport(object):
+    """ Carries messages between modules. A transport publishes LCM message objects and calls the
+    subscriber functions with the channel and the message data, which is either the encoded
+    message or the message object itself. Subscribers should use marof.decodeMessage() to accept
+    both.
+    """
+    __metaclass__ = abc.ABCMeta
+    
+    @abc.abstractmethod
+    def publish(self, channel, lcmMsg):
+        """ Publish a message on the given channel.
+        
+        :param channel: the channel string
+        :param lcmMsg: the LCM message to publish
+        """
+        return
+    
+    @abc.abstractmethod
+    def subscribe(self, channel, function):
+        """ Subscribe to a channel.
+        
+        :param channel: the channel string
+        :param function: the function to call with (channel, data) for each message
+        :returns: the subscription, to pass to unsubscribe()
+        """
+        return
+    
+    @abc.abstractmethod
+    def unsubscribe(self, subscription):
+        """ Remove a subscription.
+        
+        :param subscription: the subscription returned by subscribe()
+        """
+        return
+    
+    @property
+    def lcm(self):
+        """ The LCM instance used by the transport, or None if it does not use LCM. """
+        return None
@@ -0,0 +1,4 @@
+from Transport import Transport
+from InProcTransport import InProcTransport
+from LcmTransport import LcmTransport
+from HybridTransport import HybridTransport